@@ -0,0 +1,5 @@
+#!/bin/sh
+# Run once, when the data volume is initialized, so the database-replica service can stream from this database
+set -e
+
+echo 'host replication all all scram-sha-256' >> "$PGDATA/pg_hba.conf"
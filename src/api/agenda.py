@@ -0,0 +1,42 @@
+from django.db import connections, router
+
+from api.models import Appointment, HealthCareWorker
+
+
+def get_agenda(health_care_worker_uuid, start, end):
+    """
+    Return the booked and free dates of a health care worker between `start` and `end`, inclusive,
+    or `None` if there is no such worker.
+
+    The days are generated by the database and anti-joined with the appointments through the
+    unique (worker, date) index, so only the two date arrays leave the database. Appointments can only be
+    booked after today, so today and past days are never free.
+    """
+    query = f'''
+        SELECT
+            COALESCE(array_agg(day::date ORDER BY day) FILTER (WHERE appointment.id IS NOT NULL), '{{}}'),
+            COALESCE(array_agg(day::date ORDER BY day) FILTER (WHERE appointment.id IS NULL AND day > CURRENT_DATE), '{{}}')
+        FROM {HealthCareWorker._meta.db_table} AS health_care_worker
+        CROSS JOIN generate_series(%(start)s::date, %(end)s::date, interval '1 day') AS days(day)
+        LEFT JOIN {Appointment._meta.db_table} AS appointment
+            ON appointment.health_care_worker_id = health_care_worker.id
+            AND appointment.date = days.day::date
+        WHERE health_care_worker.uuid = %(uuid)s
+        GROUP BY health_care_worker.id
+    '''
+
+    # Raw SQL skips the database routers, so the database reads go to is picked by hand, e.g. a replica
+    with connections[router.db_for_read(Appointment)].cursor() as cursor:
+        cursor.execute(query, {'start': start, 'end': end, 'uuid': health_care_worker_uuid})
+        row = cursor.fetchone()
+
+    if row is None:
+        return None
+
+    booked, free = row
+    return {
+        'de': start,
+        'ate': end,
+        'ocupadas': booked,
+        'livres': free,
+    }
@@ -0,0 +1,253 @@
+from io import BytesIO
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import URLPattern
+from rest_framework import exceptions, status
+from rest_framework.permissions import AllowAny
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from api import cache, conditional
+from api.models import HealthCareWorker
+from api.parsers import ORJSONParser
+from api.renderers import ORJSONRenderer
+from api.serializers import AppointmentBulkItemSerializer
+from api.serializers.appointment import CONSTRAINT_ERRORS
+from api.serializers.integrity import aconstraint_violations_as_validation_errors
+from api.streaming import aiter_rendered_list
+from api.views import AppointmentsViewSet, HealthCareWorkersViewSet
+
+
+class Fallback(Exception):
+    """
+    Raised by a native handler to let the sync viewset answer the request instead.
+    """
+
+
+class AsyncViewSetAdapter:
+    """
+    Answer plain list, retrieve and create requests of a viewset with Django's async ORM.
+
+    Under ASGI a sync view runs entirely in a worker thread through `sync_to_async`.
+    Here the request is handled on the event loop, reusing the viewset queryset, filters,
+    pagination and serializers, and only the database queries hop to a thread.
+
+    Requests depending on what only the DRF request cycle does, such as authentication,
+    content negotiation or response caching, fall back to the sync viewset,
+    so responses are the same either way.
+    """
+    viewset_class = None
+    renderer = ORJSONRenderer()
+    parser = ORJSONParser()
+    native_actions = ('list', 'retrieve', 'create')
+
+    def __init__(self, sync_view):
+        self.sync_view = sync_view
+        self.fallback_view = sync_to_async(sync_view)
+        self.actions = sync_view.actions
+        self.is_open = (
+            all(permission_class is AllowAny for permission_class in self.viewset_class.permission_classes)
+            and not self.viewset_class.throttle_classes
+        )
+
+    def as_view(self):
+        async def view(request, *args, **kwargs):
+            return await self.dispatch(request, *args, **kwargs)
+
+        # Same introspection attributes as the DRF view, for the URL resolver and schema generation
+        view.csrf_exempt = True
+        view.cls = self.sync_view.cls
+        view.initkwargs = self.sync_view.initkwargs
+        view.actions = self.actions
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        action = self.actions.get(request.method.lower())
+        if action not in self.native_actions or not self.can_handle(request, kwargs):
+            return await self.fallback_view(request, *args, **kwargs)
+
+        viewset = self.get_viewset(request, action, args, kwargs)
+        try:
+            response = await getattr(self, action)(viewset, *args, **kwargs)
+        except Fallback:
+            return await self.fallback_view(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            response = self.get_exception_response(exc)
+
+        response['Allow'] = ', '.join(viewset.allowed_methods)
+        return response
+
+    def can_handle(self, request, kwargs):
+        if not self.is_open or 'format' in kwargs or api_settings.URL_FORMAT_OVERRIDE in request.GET:
+            return False
+
+        # Credentials are left to the DRF authentication classes, including session CSRF checks
+        if 'HTTP_AUTHORIZATION' in request.META or settings.SESSION_COOKIE_NAME in request.COOKIES:
+            return False
+
+        accept = request.META.get('HTTP_ACCEPT', '*/*')
+        if not any(media_type in accept for media_type in ('*/*', 'application/*', self.renderer.media_type)):
+            return False
+
+        # Cached responses are served by CachedResponseMixin
+        return getattr(self.viewset_class, 'cache_namespace', None) is None or cache.get_api_cache() is None
+
+    def get_viewset(self, request, action, args, kwargs):
+        viewset = self.viewset_class(**self.sync_view.initkwargs)
+        viewset.action_map = self.actions
+        viewset.action = action
+        viewset.request = Request(request, parsers=[self.parser])
+        viewset.args = args
+        viewset.kwargs = kwargs
+        viewset.format_kwarg = None
+        return viewset
+
+    def render(self, data, status_code=status.HTTP_200_OK):
+        return HttpResponse(self.renderer.render(data), status=status_code, content_type=self.renderer.media_type)
+
+    def get_exception_response(self, exc):
+        # Same payloads as rest_framework.views.exception_handler
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        return self.render(data, exc.status_code)
+
+    async def list(self, viewset, *args, **kwargs):
+        request = viewset.request
+        compiled = viewset.get_compiled_representation()
+        if compiled is None:
+            raise Fallback
+
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+
+        etag = await conditional.aget_queryset_etag(queryset, conditional.get_variant(request))
+        response = conditional.get_not_modified_response(request, etag, None)
+
+        if response is None:
+            response = await self.get_list_response(viewset, queryset, compiled)
+
+        conditional.set_validators(response, etag, None)
+        return response
+
+    async def get_list_response(self, viewset, queryset, compiled):
+        request = viewset.request
+        paginator = viewset.paginator
+
+        page = None if paginator is None else await paginator.apaginate_queryset(queryset, request, viewset)
+        if page is not None:
+            serializer = viewset.get_serializer(page, many=True)
+            return self.render(paginator.get_paginated_response(serializer.data).data)
+
+        rows = compiled.values_list(queryset)
+
+        if viewset.should_stream(request):
+            # Rows are read after the response is returned, so the database is chosen while handling the request,
+            # from the thread running the queries, as the router checks the transaction of its connection
+            db = await sync_to_async(lambda: rows.db)()
+            content = aiter_rendered_list(
+                rows.using(db),
+                compiled.to_representation_many,
+                self.renderer.render,
+                chunk_size=viewset.stream_chunk_size,
+            )
+            return StreamingHttpResponse(content, content_type=self.renderer.media_type)
+
+        return self.render({
+            'data': compiled.to_representation_many([row async for row in rows]),
+        })
+
+    async def retrieve(self, viewset, *args, **kwargs):
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        lookup_url_kwarg = viewset.lookup_url_kwarg or viewset.lookup_field
+
+        try:
+            instance = await queryset.aget(**{viewset.lookup_field: kwargs[lookup_url_kwarg]})
+        except ObjectDoesNotExist:
+            raise exceptions.NotFound
+
+        etag, last_modified = conditional.get_instance_validators(instance, conditional.get_variant(viewset.request))
+        response = conditional.get_not_modified_response(viewset.request, etag, last_modified)
+        if response is None:
+            response = self.render(viewset.get_serializer(instance).data)
+
+        conditional.set_validators(response, etag, last_modified)
+        return response
+
+    async def create(self, viewset, *args, **kwargs):
+        request = viewset.request
+        if request.content_type.split(';')[0].strip() != self.parser.media_type:
+            raise Fallback
+
+        body = request._request.body
+        data = self.parser.parse(BytesIO(body)) if body else {}
+        validated_data = await self.validate_create(viewset, data)
+        instance = await self.perform_create(viewset, validated_data)
+
+        return self.render(viewset.get_serializer(instance).data, status.HTTP_201_CREATED)
+
+    async def validate_create(self, viewset, data):
+        serializer = viewset.get_serializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+    async def perform_create(self, viewset, validated_data):
+        return await viewset.get_queryset().model.objects.acreate(**validated_data)
+
+
+class HealthCareWorkersAsyncAdapter(AsyncViewSetAdapter):
+    viewset_class = HealthCareWorkersViewSet
+
+
+class AppointmentsAsyncAdapter(AsyncViewSetAdapter):
+    viewset_class = AppointmentsViewSet
+
+    async def validate_create(self, viewset, data):
+        # profissional_uuid is resolved with the async ORM instead of the serializer SlugRelatedField query
+        serializer = AppointmentBulkItemSerializer(data=data, context=viewset.get_serializer_context())
+        if not serializer.is_valid():
+            # Let the sync serializer report every error at once, in its usual format
+            raise Fallback
+
+        validated_data = dict(serializer.validated_data)
+        try:
+            validated_data['health_care_worker'] = await HealthCareWorker.objects.only('uuid').aget(
+                uuid=validated_data.pop('profissional_uuid'),
+            )
+        except HealthCareWorker.DoesNotExist:
+            raise Fallback
+
+        return validated_data
+
+    async def perform_create(self, viewset, validated_data):
+        async with aconstraint_violations_as_validation_errors(CONSTRAINT_ERRORS):
+            return await viewset.get_queryset().model.objects.acreate(**validated_data)
+
+
+ADAPTER_CLASSES = {
+    adapter_class.viewset_class: adapter_class
+    for adapter_class in (HealthCareWorkersAsyncAdapter, AppointmentsAsyncAdapter)
+}
+
+
+def with_async_routes(urlpatterns):
+    """
+    Return `urlpatterns` with the viewset list and detail routes served by their async adapters.
+    """
+    async_urlpatterns = []
+
+    for pattern in urlpatterns:
+        callback = pattern.callback
+        adapter_class = ADAPTER_CLASSES.get(getattr(callback, 'cls', None))
+
+        if adapter_class is not None and set(callback.actions.values()) & set(adapter_class.native_actions):
+            pattern = URLPattern(
+                pattern.pattern,
+                adapter_class(callback).as_view(),
+                pattern.default_args,
+                pattern.name,
+            )
+
+        async_urlpatterns.append(pattern)
+
+    return async_urlpatterns
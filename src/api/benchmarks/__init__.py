@@ -0,0 +1,43 @@
+import time
+from contextlib import contextmanager
+
+from django.db import transaction
+
+
+SUITES = {
+    'asgi': 'api.benchmarks.asgi',
+    'profiles': 'api.benchmarks.profiles',
+    'routes': 'api.benchmarks.routes',
+    'serializers': 'api.benchmarks.serializers',
+    'uuids': 'api.benchmarks.uuids',
+}
+
+
+class Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back():
+    """
+    Run a benchmark inside a transaction that is always rolled back,
+    so seeded rows never reach the database.
+    """
+    try:
+        with transaction.atomic():
+            yield
+            raise Rollback
+    except Rollback:
+        pass
+
+
+def best_of(function, repeat):
+    """
+    Return the fastest wall clock time of `repeat` calls, in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
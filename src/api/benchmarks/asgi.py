@@ -0,0 +1,236 @@
+import asyncio
+import queue
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from itertools import cycle, islice
+from urllib.parse import urlencode
+from wsgiref.util import setup_testing_defaults
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import override_settings
+from django.urls import reverse
+
+from api.models import Appointment, HealthCareWorker
+
+
+SYNC_URLCONF = 'saude_drf.urls'
+ASYNC_URLCONF = 'saude_drf.urls_async'
+PAGE_SIZE = 20
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=50,
+        help='Requests in flight at once, keep it below the database max_connections',
+    )
+    parser.add_argument('--requests', type=int, default=2000, help='Requests sent per deployment')
+
+
+def get_paths(health_care_workers, appointments):
+    """
+    Return the request mix: paginated and filtered listings plus detail lookups.
+    """
+    health_care_worker = health_care_workers[0]
+    appointment = appointments[0]
+
+    return [
+        f"{reverse('api:appointments-list')}?{urlencode({'page_size': PAGE_SIZE})}",
+        f"{reverse('api:health-care-workers-list')}?{urlencode({'page_size': PAGE_SIZE})}",
+        f"{reverse('api:appointments-list')}?{urlencode({'profissional_uuid': health_care_worker.uuid})}",
+        reverse('api:appointments-detail', args=[appointment.uuid]),
+        reverse('api:health-care-workers-detail', args=[health_care_worker.uuid]),
+    ]
+
+
+@contextmanager
+def conn_max_age(seconds):
+    """
+    Set CONN_MAX_AGE of the connections opened meanwhile, as the DATABASE_CONN_MAX_AGE variable would.
+    """
+    settings_dict = connections.settings[DEFAULT_DB_ALIAS]
+    previous = settings_dict['CONN_MAX_AGE']
+    settings_dict['CONN_MAX_AGE'] = seconds
+    try:
+        yield
+    finally:
+        settings_dict['CONN_MAX_AGE'] = previous
+
+
+def summarize(name, timings, seconds, concurrency):
+    timings = sorted(timings)
+    quantiles = statistics.quantiles(timings, n=100)
+
+    return {
+        'name': name,
+        'requests': len(timings),
+        'concurrency': concurrency,
+        'requests_per_second': len(timings) / seconds,
+        'p50_ms': quantiles[49] * 1e3,
+        'p95_ms': quantiles[94] * 1e3,
+    }
+
+
+def get_wsgi_status(handler, path):
+    path, _, query_string = path.partition('?')
+    environ = {'PATH_INFO': path, 'QUERY_STRING': query_string}
+    setup_testing_defaults(environ)
+
+    statuses = []
+    response = handler(environ, lambda status, headers: statuses.append(status))
+    try:
+        b''.join(response)
+    finally:
+        response.close()
+
+    return int(statuses[0].split()[0])
+
+
+def run_wsgi(paths, concurrency):
+    """
+    Serve `paths` through the WSGI handler from `concurrency` threads, like a threaded WSGI server.
+    """
+    handler = WSGIHandler()
+    pending = queue.SimpleQueue()
+    for path in paths:
+        pending.put(path)
+
+    timings = []
+    statuses = set()
+
+    def worker():
+        try:
+            while True:
+                try:
+                    path = pending.get_nowait()
+                except queue.Empty:
+                    return
+
+                start = time.perf_counter()
+                statuses.add(get_wsgi_status(handler, path))
+                timings.append(time.perf_counter() - start)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return timings, time.perf_counter() - start, statuses
+
+
+async def get_asgi_status(handler, path):
+    path, _, query_string = path.partition('?')
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query_string.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'localhost')],
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+    messages = iter([{'type': 'http.request', 'body': b'', 'more_body': False}])
+    statuses = []
+
+    async def receive():
+        try:
+            return next(messages)
+        except StopIteration:
+            # The client stays connected until the response is sent
+            return await asyncio.Future()
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+
+    await handler(scope, receive, send)
+    return statuses[0]
+
+
+def run_asgi(paths, concurrency):
+    """
+    Serve `paths` through the ASGI handler, with at most `concurrency` requests in flight.
+
+    Persistent connections are off, as they should be under ASGI without the connection pool.
+    """
+    handler = ASGIHandler()
+    timings = []
+    statuses = set()
+
+    async def request(semaphore, path):
+        async with semaphore:
+            start = time.perf_counter()
+            statuses.add(await get_asgi_status(handler, path))
+            timings.append(time.perf_counter() - start)
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+        start = time.perf_counter()
+        await asyncio.gather(*(request(semaphore, path) for path in paths))
+        return time.perf_counter() - start
+
+    with conn_max_age(0):
+        seconds = asyncio.run(main())
+
+    return timings, seconds, statuses
+
+
+DEPLOYMENTS = (
+    ('wsgi', SYNC_URLCONF, run_wsgi),
+    ('asgi-sync', SYNC_URLCONF, run_asgi),
+    ('asgi-async', ASYNC_URLCONF, run_asgi),
+)
+
+
+def run(options):
+    # factory_boy is a test dependency, so it is only imported when benchmarking
+    import factory
+
+    from api.tests.models.factories import AppointmentFactory, HealthCareWorkerFactory
+
+    rows = options['rows']
+    concurrency = options['concurrency']
+
+    # Every deployment serves requests from other threads or event loop tasks, which only see
+    # committed rows, so seeded rows are deleted afterwards instead of rolled back
+    health_care_workers = HealthCareWorkerFactory.create_batch(rows)
+    appointments = AppointmentFactory.create_batch(
+        rows,
+        health_care_worker=factory.Iterator(health_care_workers),
+    )
+
+    try:
+        paths = list(islice(cycle(get_paths(health_care_workers, appointments)), options['requests']))
+        results = []
+
+        # The response cache is sync only and would make every deployment measure cache hits
+        for name, urlconf, run_deployment in DEPLOYMENTS:
+            with override_settings(ROOT_URLCONF=urlconf, API_CACHE_ENABLED=False):
+                # Warm up imports, URL resolvers and connections before measuring
+                run_deployment(paths[:concurrency], concurrency)
+                timings, seconds, statuses = run_deployment(paths, concurrency)
+
+            if statuses != {200}:
+                raise AssertionError(f'{name}: unexpected response statuses {sorted(statuses)}')
+
+            results.append(summarize(name, timings, seconds, concurrency))
+
+        return results
+    finally:
+        Appointment.objects.filter(pk__in=[appointment.pk for appointment in appointments]).delete()
+        HealthCareWorker.objects.filter(pk__in=[worker.pk for worker in health_care_workers]).delete()
@@ -0,0 +1,130 @@
+"""
+Compare the startup and request latency of the settings profiles.
+
+Installed apps and middleware are fixed at startup, so every profile is measured in a process of its own,
+running this module with the profile in SETTINGS_PROFILE.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from itertools import cycle, islice
+from pathlib import Path
+
+
+PROFILES = ('full', 'api')
+SRC_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+def add_arguments(parser):
+    # --requests and --repeat are shared with the other suites
+    pass
+
+
+def get_latencies(handler, paths, requests):
+    from api.benchmarks.asgi import get_wsgi_status
+
+    # Warm up lazy imports and the database connection before measuring
+    for path in paths:
+        get_wsgi_status(handler, path)
+
+    timings = []
+    for path in islice(cycle(paths), requests):
+        start = time.perf_counter()
+        status = get_wsgi_status(handler, path)
+        timings.append(time.perf_counter() - start)
+
+        if status != 200:
+            raise AssertionError(f'GET {path} returned {status}')
+
+    return timings
+
+
+def measure(paths, requests):
+    """
+    Measure this process: setup time, loaded modules and sequential request latency.
+
+    The API root runs no queries, so its latency is mostly the per request overhead of the profile.
+    """
+    start = time.perf_counter()
+
+    import django
+    django.setup()
+
+    from django.conf import settings
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.urls import get_resolver, reverse
+
+    handler = WSGIHandler()
+    get_resolver().url_patterns
+    startup_seconds = time.perf_counter() - start
+
+    root_timings = get_latencies(handler, [reverse('api:api-root')], requests)
+    timings = get_latencies(handler, paths, requests)
+
+    return {
+        'startup_ms': startup_seconds * 1e3,
+        'modules': len(sys.modules),
+        'installed_apps': len(settings.INSTALLED_APPS),
+        'middleware': len(settings.MIDDLEWARE),
+        'api_root_p50_us': statistics.median(root_timings) * 1e6,
+        'p50_us': statistics.median(timings) * 1e6,
+    }
+
+
+def measure_profile(profile, paths, requests):
+    completed = subprocess.run(
+        [sys.executable, '-m', __name__, json.dumps(paths), str(requests)],
+        cwd=SRC_DIR,
+        env={**os.environ, 'SETTINGS_PROFILE': profile},
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return json.loads(completed.stdout)
+
+
+def run(options):
+    # factory_boy is a test dependency, so it is only imported when benchmarking
+    import factory
+
+    from api.benchmarks.asgi import get_paths
+    from api.models import Appointment, HealthCareWorker
+    from api.tests.models.factories import AppointmentFactory, HealthCareWorkerFactory
+
+    # The profile processes only see committed rows, so seeded rows are deleted afterwards
+    health_care_workers = HealthCareWorkerFactory.create_batch(options['rows'])
+    appointments = AppointmentFactory.create_batch(
+        options['rows'],
+        health_care_worker=factory.Iterator(health_care_workers),
+    )
+
+    try:
+        paths = get_paths(health_care_workers, appointments)
+        results = []
+
+        for profile in PROFILES:
+            runs = [measure_profile(profile, paths, options['requests']) for _ in range(options['repeat'])]
+            # The fastest run of each measurement, as in best_of
+            result = {key: min(run[key] for run in runs) for key in runs[0]}
+            results.append({'name': profile, **result})
+
+        full, api = results
+        results.append({
+            'name': 'saved',
+            'startup_ms': full['startup_ms'] - api['startup_ms'],
+            'modules': full['modules'] - api['modules'],
+            'api_root_p50_us': full['api_root_p50_us'] - api['api_root_p50_us'],
+            'p50_us': full['p50_us'] - api['p50_us'],
+        })
+        return results
+    finally:
+        Appointment.objects.filter(pk__in=[appointment.pk for appointment in appointments]).delete()
+        HealthCareWorker.objects.filter(pk__in=[worker.pk for worker in health_care_workers]).delete()
+
+
+if __name__ == '__main__':
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'saude_drf.settings')
+    print(json.dumps(measure(json.loads(sys.argv[1]), int(sys.argv[2]))))
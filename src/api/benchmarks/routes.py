@@ -0,0 +1,296 @@
+import json
+import statistics
+import time
+from datetime import date, timedelta
+from itertools import islice
+
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from api import summaries
+from api.benchmarks import rolled_back
+from api.models import Appointment, HealthCareWorker
+
+
+PAGE_SIZE = 20
+SEED_BATCH_SIZE = 5000
+BULK_CREATE_ITEMS = 10
+BATCH_GET_ITEMS = 20
+FIRST_DATE = date(2137, 1, 1)
+
+# Metrics compared with the baseline, those where a higher value is worse
+LATENCY_METRICS = ('p50_ms', 'p99_ms')
+
+
+def add_arguments(parser):
+    # --rows (health care workers) and --requests (per route) are shared with the other suites
+    parser.add_argument(
+        '--appointments-per-worker',
+        type=int,
+        default=10,
+        help='Appointments seeded per health care worker, on consecutive dates',
+    )
+    parser.add_argument('--baseline', help='Flag regressions against the JSON results of a previous run')
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=0.25,
+        help='Latency increase over the baseline flagged as a regression, as a fraction',
+    )
+
+
+def seed(rows, appointments_per_worker):
+    """
+    Bulk insert factory built health care workers and their appointments, `SEED_BATCH_SIZE` at a time.
+    """
+    from api.tests.models.factories import AppointmentFactory, HealthCareWorkerFactory
+
+    health_care_workers = []
+    for offset in range(0, rows, SEED_BATCH_SIZE):
+        health_care_workers += HealthCareWorker.objects.bulk_create(
+            HealthCareWorkerFactory.build_batch(min(SEED_BATCH_SIZE, rows - offset)),
+        )
+
+    appointments = (
+        AppointmentFactory.build(health_care_worker=health_care_worker, date=FIRST_DATE + timedelta(days=day))
+        for health_care_worker in health_care_workers
+        for day in range(appointments_per_worker)
+    )
+    while batch := list(islice(appointments, SEED_BATCH_SIZE)):
+        Appointment.objects.bulk_create(batch)
+    summaries.refresh()
+
+    return health_care_workers
+
+
+def seed_removable(requests):
+    """
+    Bulk insert the health care workers and appointments the destroy routes remove, one per request.
+    """
+    from api.tests.models.factories import AppointmentFactory, HealthCareWorkerFactory
+
+    health_care_workers = HealthCareWorker.objects.bulk_create(HealthCareWorkerFactory.build_batch(requests))
+    appointments = Appointment.objects.bulk_create(
+        AppointmentFactory.build(health_care_worker=health_care_worker, date=FIRST_DATE)
+        for health_care_worker in health_care_workers
+    )
+    summaries.refresh(HealthCareWorker.objects.filter(pk__in=[worker.pk for worker in health_care_workers]))
+    return health_care_workers, appointments
+
+
+def get_health_care_worker_data(number):
+    return {
+        'nome_legal': f'Profissional {number}',
+        'nome_social': '',
+        'pronomes': 'Elu/Delu',
+        'data_de_nascimento': '1990-01-01',
+        'especializacao': 'Clínica Geral',
+    }
+
+
+def get_routes(health_care_workers, appointments_per_worker, requests):
+    """
+    Return (name, method, expected status, request arguments per call) for every route of api/urls.py.
+
+    Each call of a writing route gets its own target or dates, so none of them conflict.
+    """
+    worker, date_worker, updated_worker = health_care_workers[:3]
+    appointment = Appointment.objects.filter(health_care_worker=worker).order_by('date').first()
+    removed_workers, removed_appointments = seed_removable(requests)
+    free_date = FIRST_DATE + timedelta(days=appointments_per_worker)
+
+    def page(url_name, **query):
+        return {'path': reverse(url_name), 'data': {'page_size': PAGE_SIZE, **query}}
+
+    def appointment_data(number):
+        return {
+            'profissional_uuid': str(date_worker.uuid),
+            'data': (free_date + timedelta(days=number)).isoformat(),
+            'info': 'Consulta',
+        }
+
+    def bulk_appointments_data(number):
+        first = number * BULK_CREATE_ITEMS + requests
+        return [appointment_data(first + item) for item in range(BULK_CREATE_ITEMS)]
+
+    def as_json(data):
+        return {'data': json.dumps(data), 'content_type': 'application/json'}
+
+    worker_url = reverse('api:health-care-workers-detail', args=[updated_worker.uuid])
+    appointment_url = reverse('api:appointments-detail', args=[appointment.uuid])
+    batch_get_workers = {'uuids': [str(worker.uuid) for worker in health_care_workers[:BATCH_GET_ITEMS]]}
+    batch_get_appointments = {
+        'uuids': [
+            str(uuid)
+            for uuid in Appointment.objects.order_by('id').values_list('uuid', flat=True)[:BATCH_GET_ITEMS]
+        ],
+    }
+
+    return [
+        ('api-root', 'get', 200, lambda number: {'path': reverse('api:api-root')}),
+        ('health-care-workers-list', 'get', 200, lambda number: page('api:health-care-workers-list')),
+        (
+            'health-care-workers-create', 'post', 201,
+            lambda number: {
+                'path': reverse('api:health-care-workers-list'),
+                **as_json(get_health_care_worker_data(number)),
+            },
+        ),
+        (
+            'health-care-workers-retrieve', 'get', 200,
+            lambda number: {'path': reverse('api:health-care-workers-detail', args=[worker.uuid])},
+        ),
+        (
+            'health-care-workers-batch-get', 'post', 200,
+            lambda number: {
+                'path': reverse('api:health-care-workers-batch-get'),
+                **as_json(batch_get_workers),
+            },
+        ),
+        (
+            'health-care-workers-update', 'put', 200,
+            lambda number: {'path': worker_url, **as_json(get_health_care_worker_data(number))},
+        ),
+        (
+            'health-care-workers-partial-update', 'patch', 200,
+            lambda number: {'path': worker_url, **as_json({'nome_social': f'Nome {number}'})},
+        ),
+        (
+            'health-care-workers-agenda', 'get', 200,
+            lambda number: {
+                'path': reverse('api:health-care-workers-agenda', args=[worker.uuid]),
+                'data': {'de': FIRST_DATE.isoformat(), 'ate': (FIRST_DATE + timedelta(days=90)).isoformat()},
+            },
+        ),
+        ('appointments-list', 'get', 200, lambda number: page('api:appointments-list')),
+        (
+            'appointments-list-by-worker', 'get', 200,
+            lambda number: page('api:appointments-list', profissional_uuid=worker.uuid),
+        ),
+        (
+            'appointments-create', 'post', 201,
+            lambda number: {'path': reverse('api:appointments-list'), **as_json(appointment_data(number))},
+        ),
+        (
+            'appointments-bulk', 'post', 201,
+            lambda number: {'path': reverse('api:appointments-bulk'), **as_json(bulk_appointments_data(number))},
+        ),
+        ('appointments-retrieve', 'get', 200, lambda number: {'path': appointment_url}),
+        (
+            'appointments-batch-get', 'post', 200,
+            lambda number: {'path': reverse('api:appointments-batch-get'), **as_json(batch_get_appointments)},
+        ),
+        (
+            'appointments-update', 'put', 200,
+            lambda number: {
+                'path': appointment_url,
+                **as_json({
+                    'profissional_uuid': str(worker.uuid),
+                    'data': appointment.date.isoformat(),
+                    'info': f'{number}',
+                }),
+            },
+        ),
+        (
+            'appointments-partial-update', 'patch', 200,
+            lambda number: {'path': appointment_url, **as_json({'info': f'{number}'})},
+        ),
+        (
+            'appointments-destroy', 'delete', 204,
+            lambda number: {'path': reverse('api:appointments-detail', args=[removed_appointments[number].uuid])},
+        ),
+        (
+            'health-care-workers-destroy', 'delete', 204,
+            lambda number: {'path': reverse('api:health-care-workers-detail', args=[removed_workers[number].uuid])},
+        ),
+    ]
+
+
+class QueryCounter:
+    """
+    Database execute wrapper counting queries, unlike connection.queries it is not capped.
+    """
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def measure(client, name, method, expected_status, get_arguments, requests):
+    send = getattr(client, method)
+    timings = []
+    queries = []
+    query_counter = QueryCounter()
+
+    with connection.execute_wrapper(query_counter):
+        for number in range(requests):
+            arguments = get_arguments(number)
+            query_count = query_counter.count
+
+            start = time.perf_counter()
+            response = send(**arguments)
+            timings.append(time.perf_counter() - start)
+
+            if response.status_code != expected_status:
+                raise AssertionError(f'{name}: unexpected response status {response.status_code}')
+            queries.append(query_counter.count - query_count)
+
+    quantiles = statistics.quantiles(timings, n=100)
+    return {
+        'name': name,
+        'method': method.upper(),
+        'requests': requests,
+        'requests_per_second': requests / sum(timings),
+        'p50_ms': quantiles[49] * 1e3,
+        'p99_ms': quantiles[98] * 1e3,
+        'queries': max(queries),
+    }
+
+
+def get_regressions(result, baseline, tolerance):
+    """
+    Return what got worse in `result` than in `baseline`: any extra query, or latencies beyond `tolerance`.
+    """
+    regressions = []
+    if result['queries'] > baseline['queries']:
+        regressions.append(f"queries {baseline['queries']} -> {result['queries']}")
+
+    for metric in LATENCY_METRICS:
+        if result[metric] > baseline[metric] * (1 + tolerance):
+            regressions.append(f'{metric} {baseline[metric]:.2f} -> {result[metric]:.2f}')
+
+    return regressions
+
+
+def run(options):
+    rows = options['rows']
+    requests = options['requests']
+    if rows < 3:
+        raise ValueError('--rows must be at least 3')
+
+    baselines = {}
+    if options['baseline']:
+        with open(options['baseline']) as baseline_file:
+            baselines = {result['name']: result for result in json.load(baseline_file)}
+
+    # A single thread and connection serves every request, so seeded and written rows are rolled back.
+    # The response cache would turn repeated reads into cache hits, and DEBUG would log every query
+    with rolled_back(), override_settings(API_CACHE_ENABLED=False, DEBUG=False):
+        health_care_workers = seed(rows, options['appointments_per_worker'])
+        client = Client(HTTP_HOST='localhost')
+        results = []
+
+        for name, method, expected_status, get_arguments in get_routes(
+            health_care_workers,
+            options['appointments_per_worker'],
+            requests,
+        ):
+            result = measure(client, name, method, expected_status, get_arguments, requests)
+            if name in baselines:
+                result['regressions'] = get_regressions(result, baselines[name], options['tolerance'])
+            results.append(result)
+
+    return results
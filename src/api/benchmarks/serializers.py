@@ -0,0 +1,91 @@
+from rest_framework.renderers import JSONRenderer
+
+from api.benchmarks import best_of, rolled_back
+from api.models import Appointment, HealthCareWorker
+from api.renderers import ORJSONRenderer
+from api.serializers import AppointmentSerializer, HealthCareWorkerSerializer
+from api.serializers.compiled import compile_representation
+
+
+def add_arguments(parser):
+    parser.add_argument('--rows', type=int, default=2000, help='Rows seeded per model')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement, the best one is kept')
+
+
+def compare(name, serializer_class, queryset, repeat):
+    compiled = compile_representation(serializer_class())
+    instances = list(queryset)
+    rows = list(compiled.values_list(queryset))
+    renderer = JSONRenderer()
+
+    serializer_output = renderer.render(serializer_class(instances, many=True).data)
+    compiled_output = renderer.render(compiled.to_representation_many(rows))
+    if serializer_output != compiled_output:
+        raise AssertionError(f'{name}: compiled output differs from the serializer output')
+
+    serializer_seconds = best_of(lambda: serializer_class(instances, many=True).data, repeat)
+    compiled_seconds = best_of(lambda: compiled.to_representation_many(rows), repeat)
+
+    # Query, representation and rendering together, as the list endpoint does
+    serializer_end_to_end_seconds = best_of(
+        lambda: renderer.render({'data': serializer_class(queryset.all(), many=True).data}),
+        repeat,
+    )
+    compiled_end_to_end_seconds = best_of(
+        lambda: renderer.render({'data': compiled.to_representation_many(compiled.values_list(queryset.all()))}),
+        repeat,
+    )
+
+    data = {'data': compiled.to_representation_many(rows)}
+    orjson_renderer = ORJSONRenderer()
+    if orjson_renderer.render(data) != renderer.render(data):
+        raise AssertionError(f'{name}: orjson output differs from the JSONRenderer output')
+
+    json_render_seconds = best_of(lambda: renderer.render(data), repeat)
+    orjson_render_seconds = best_of(lambda: orjson_renderer.render(data), repeat)
+
+    return {
+        'name': name,
+        'rows': len(rows),
+        'serializer_us_per_row': serializer_seconds / len(rows) * 1e6,
+        'compiled_us_per_row': compiled_seconds / len(rows) * 1e6,
+        'speedup': serializer_seconds / compiled_seconds,
+        'serializer_end_to_end_ms': serializer_end_to_end_seconds * 1e3,
+        'compiled_end_to_end_ms': compiled_end_to_end_seconds * 1e3,
+        'end_to_end_speedup': serializer_end_to_end_seconds / compiled_end_to_end_seconds,
+        'json_render_ms': json_render_seconds * 1e3,
+        'orjson_render_ms': orjson_render_seconds * 1e3,
+        'render_speedup': json_render_seconds / orjson_render_seconds,
+    }
+
+
+def run(options):
+    # factory_boy is a test dependency, so it is only imported when benchmarking
+    import factory
+
+    from api.tests.models.factories import AppointmentFactory, HealthCareWorkerFactory
+
+    rows = options['rows']
+    repeat = options['repeat']
+
+    with rolled_back():
+        health_care_workers = HealthCareWorkerFactory.create_batch(rows)
+        AppointmentFactory.create_batch(
+            rows,
+            health_care_worker=factory.Iterator(health_care_workers),
+        )
+
+        return [
+            compare(
+                'health_care_workers',
+                HealthCareWorkerSerializer,
+                HealthCareWorkerSerializer.setup_eager_loading(HealthCareWorker.objects.all()),
+                repeat,
+            ),
+            compare(
+                'appointments',
+                AppointmentSerializer,
+                AppointmentSerializer.setup_eager_loading(Appointment.objects.all()),
+                repeat,
+            ),
+        ]
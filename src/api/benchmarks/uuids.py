@@ -0,0 +1,71 @@
+import time
+import uuid
+
+from django.db import connection
+
+from api.benchmarks import rolled_back
+from api.models.base import uuid7
+
+
+GENERATORS = {
+    'uuid4': uuid.uuid4,
+    'uuid7': uuid7,
+}
+BATCH_SIZE = 1000
+TABLE_NAME = 'uuid_benchmark'
+
+
+def add_arguments(parser):
+    # --rows is shared with the other suites, inserts only diverge with a few hundred thousand rows
+    pass
+
+
+def insert(cursor, generator, rows):
+    """
+    Insert `rows` rows keyed by `generator` in batches, as bulk creations do, and return the elapsed seconds.
+    """
+    start = time.perf_counter()
+    for offset in range(0, rows, BATCH_SIZE):
+        uuids = [generator() for _ in range(min(BATCH_SIZE, rows - offset))]
+        cursor.execute(f'INSERT INTO {TABLE_NAME} (uuid) SELECT unnest(%s::uuid[])', [uuids])
+    return time.perf_counter() - start
+
+
+def compare(name, generator, rows):
+    # The table mirrors the IdUuidModel columns, built afresh inside a transaction that is rolled back
+    with rolled_back(), connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE {TABLE_NAME} ('
+            'id bigint GENERATED ALWAYS AS IDENTITY PRIMARY KEY, '
+            'uuid uuid NOT NULL UNIQUE, '
+            'created timestamp with time zone NOT NULL DEFAULT now()'
+            ')'
+        )
+        seconds = insert(cursor, generator, rows)
+
+        cursor.execute(
+            'SELECT pg_relation_size(%s), pg_relation_size(%s)',
+            [f'{TABLE_NAME}_uuid_key', TABLE_NAME],
+        )
+        index_bytes, table_bytes = cursor.fetchone()
+
+    return {
+        'name': name,
+        'rows': rows,
+        'rows_per_second': rows / seconds,
+        'index_kb': index_bytes / 1024,
+        'index_bytes_per_row': index_bytes / rows,
+        'table_kb': table_bytes / 1024,
+    }
+
+
+def run(options):
+    results = [compare(name, generator, options['rows']) for name, generator in GENERATORS.items()]
+
+    random, ordered = results
+    results.append({
+        'name': 'uuid7_vs_uuid4',
+        'throughput_ratio': ordered['rows_per_second'] / random['rows_per_second'],
+        'index_size_ratio': ordered['index_kb'] / random['index_kb'],
+    })
+    return results
@@ -0,0 +1,113 @@
+import hashlib
+import threading
+import uuid
+from collections import Counter
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+HEALTH_CARE_WORKERS_CACHE_NAMESPACE = 'health-care-workers'
+
+HIT = 'hit'
+MISS = 'miss'
+
+
+def get_api_cache():
+    """
+    Return the cache for API responses, or `None` if response caching is disabled.
+    """
+    if not settings.API_CACHE_ENABLED:
+        return None
+
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def get_detail_key(namespace, lookup_value):
+    return f'{namespace}:detail:{lookup_value}'
+
+
+def get_list_generation_key(namespace):
+    return f'{namespace}:list-generation'
+
+
+def get_list_generation(cache, namespace):
+    """
+    Return the token shared by the current list entries of a namespace.
+
+    A random token is used instead of a counter so that list entries cached before an
+    eviction of the generation itself are never reused.
+    """
+    key = get_list_generation_key(namespace)
+    generation = cache.get(key)
+
+    if generation is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        generation = cache.get(key)
+
+    return generation
+
+
+def get_list_key(cache, namespace, request):
+    # Filters and pages are part of the key, regardless of the order they were given in.
+    # So is the host, which paginated responses link to.
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    digest = hashlib.sha1(f'{request.get_host()}?{query}'.encode()).hexdigest()
+    return f'{namespace}:list:{get_list_generation(cache, namespace)}:{digest}'
+
+
+def invalidate(namespace, lookup_value):
+    """
+    Drop the detail entry of an instance and every list entry of its namespace.
+    """
+    cache = get_api_cache()
+    if cache is None:
+        return
+
+    cache.delete(get_detail_key(namespace, lookup_value))
+    cache.set(get_list_generation_key(namespace), uuid.uuid4().hex, timeout=None)
+
+
+def invalidate_lists(namespace):
+    """
+    Drop every list entry of a namespace, for rows written without signals, e.g. by COPY.
+    """
+    cache = get_api_cache()
+    if cache is None:
+        return
+
+    cache.set(get_list_generation_key(namespace), uuid.uuid4().hex, timeout=None)
+
+
+class CacheStats:
+    """
+    Hit and miss counters of this process, per namespace.
+    """
+    def __init__(self):
+        self._counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, namespace, outcome):
+        with self._lock:
+            self._counter[namespace, outcome] += 1
+
+    def snapshot(self):
+        with self._lock:
+            counter = self._counter.copy()
+
+        namespaces = sorted({namespace for namespace, _ in counter})
+        return {
+            namespace: {
+                'hits': counter[namespace, HIT],
+                'misses': counter[namespace, MISS],
+            }
+            for namespace in namespaces
+        }
+
+    def reset(self):
+        with self._lock:
+            self._counter.clear()
+
+
+stats = CacheStats()
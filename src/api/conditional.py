@@ -0,0 +1,76 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag, urlencode
+
+
+VALIDATOR_AGGREGATES = {
+    'last_modified': Max('modified'),
+    'count': Count('*'),
+}
+
+
+def get_weak_etag(version, variant=''):
+    # Weak, as the same data may be rendered differently
+    return f'W/{quote_etag(f"{version}-{variant}" if variant else version)}'
+
+
+def get_variant(request):
+    """
+    Return a digest of the query string, as pages, `?fields=`, `?omit=` and streaming change the representation.
+
+    Empty without parameters, so the ETags of plain requests do not depend on it.
+    """
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    return hashlib.sha256(query.encode()).hexdigest()[:16] if query else ''
+
+
+def get_strong_etag(content):
+    # Strong, as it is computed from the exact bytes served
+    return quote_etag(hashlib.sha256(content).hexdigest())
+
+
+def get_queryset_etag(queryset, variant=''):
+    """
+    Return the ETag of a listing without reading its rows.
+
+    The latest `modified` catches creations and updates, and the count catches deletions.
+    Listings have no Last-Modified, as a deletion leaves the latest `modified` as it was.
+    """
+    return get_aggregates_etag(queryset.aggregate(**VALIDATOR_AGGREGATES), variant)
+
+
+async def aget_queryset_etag(queryset, variant=''):
+    return get_aggregates_etag(await queryset.aaggregate(**VALIDATOR_AGGREGATES), variant)
+
+
+def get_aggregates_etag(aggregates, variant=''):
+    last_modified = aggregates['last_modified']
+
+    if last_modified is None:
+        return get_weak_etag('0', variant)
+
+    return get_weak_etag(f'{aggregates["count"]}-{last_modified.timestamp()}', variant)
+
+
+def get_instance_validators(instance, variant=''):
+    return get_weak_etag(str(instance.modified.timestamp()), variant), int(instance.modified.timestamp())
+
+
+def get_response_validators(response):
+    return response.get('ETag'), parse_http_date_safe(response.get('Last-Modified', ''))
+
+
+def get_not_modified_response(request, etag, last_modified):
+    """
+    Return a 304 (or 412) response if the request preconditions say the client is up to date.
+    """
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def set_validators(response, etag, last_modified):
+    if etag is not None:
+        response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
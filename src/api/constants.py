@@ -1,15 +1,38 @@
+AGENDA_MAX_DAYS = 366
+AGENDA_MAX_DAYS_ERROR_MESSAGE = (
+    "O intervalo da agenda pode ter no máximo {max_days} dias"
+)
+AGENDA_RANGE_ERROR_MESSAGE = (
+    "A data de início deve ser anterior ou igual à data de fim"
+)
 APPOINTMENT_DATE_CONSTRAINT_NAME = (
     "appointment_date_must_be_in_the_future"
 )
 APPOINTMENT_DATE_ERROR_MESSAGE = (
     "Consulta só pode ser agendada para uma data posterior a hoje"
 )
+APPOINTMENT_DATE_ID_INDEX_NAME = (
+    "appointment_date_id_idx"
+)
+APPOINTMENT_MODIFIED_INDEX_NAME = (
+    "appointment_modified_idx"
+)
+BATCH_GET_MAX_LENGTH = 1000
+HEALTH_CARE_WORKER_MODIFIED_INDEX_NAME = (
+    "hcw_modified_idx"
+)
+HEALTH_CARE_WORKER_SPECIALIZATION_INDEX_NAME = (
+    "hcw_specialization_idx"
+)
 UNIQUE_APPOINTMENT_DATE_HEALTH_CARE_WORKER_CONSTRAINT_NAME = (
     "unique_appointment_date_health_care_worker"
 )
 UNIQUE_APPOINTMENT_DATE_HEALTH_CARE_WORKER_ERROR_MESSAGE = (
     "Consulta já existente para a combinação de data e profissional"
 )
+UNKNOWN_FIELDS_ERROR_MESSAGE = (
+    "Campos desconhecidos: {field_names}"
+)
 
 
 # From https://en.wikipedia.org/wiki/Health_professional
@@ -3,8 +3,18 @@ from django_filters import rest_framework as filters
 from api.models import Appointment
 
 
+class UUIDInFilter(filters.BaseInFilter, filters.UUIDFilter):
+    pass
+
+
 class AppointmentsFilterSet(filters.FilterSet):
+    # Worker filters go through the unique uuid index and then the unique (worker, date) index,
+    # date ranges alone through the (date, id) index
     profissional_uuid = filters.UUIDFilter(field_name='health_care_worker__uuid')
+    profissional_uuid__in = UUIDInFilter(field_name='health_care_worker__uuid', lookup_expr='in')
+    especializacao = filters.CharFilter(field_name='health_care_worker__specialization')
+    data_inicio = filters.DateFilter(field_name='date', lookup_expr='gte')
+    data_fim = filters.DateFilter(field_name='date', lookup_expr='lte')
 
     class Meta:
         model = Appointment
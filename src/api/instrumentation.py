@@ -0,0 +1,270 @@
+"""
+Per request query counts and timings, reported as `Server-Timing` headers and aggregated per route
+into Prometheus metrics served by `metrics_view`.
+
+A request is timed in four phases, in seconds:
+
+- `db`: executing SQL queries, counted by an execute wrapper installed on every new connection
+- `serializer`: building the output data, by `TimedSerializerMixin` and the compiled representations
+- `render`: encoding the output, by `ORJSONRenderer`
+- `total`: the whole request as seen by `InstrumentationMiddleware`, the first middleware
+
+The current request is tracked with a context variable, which asgiref copies into the threads running
+sync code under ASGI, so sync and async views are timed alike. Queries run while serializing, e.g. by a
+lazy queryset, are only counted as `db`. Streaming responses are rendered after the middleware returns,
+so their rendering is not timed.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.http import HttpResponse
+
+from api import cache
+from saude_drf.db.backends.postgresql_pool.base import get_pool_stats
+
+
+DB = 'db'
+SERIALIZER = 'serializer'
+RENDER = 'render'
+TOTAL = 'total'
+PHASES = (DB, SERIALIZER, RENDER, TOTAL)
+
+# Upper bounds of the request duration histogram, in seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# psycopg_pool statistics describing the pool right now, the others are counters
+POOL_GAUGES = {'pool_min', 'pool_max', 'pool_size', 'pool_available', 'requests_waiting'}
+
+_request_timings = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    __slots__ = ('queries', 'db', 'serializer', 'render', 'total', 'phase')
+
+    def __init__(self):
+        self.queries = 0
+        self.db = self.serializer = self.render = self.total = 0.0
+        # The phase being timed by `timed`, nested phases are part of it
+        self.phase = None
+
+
+@contextmanager
+def timed(phase):
+    """
+    Add the time spent in the block to `phase` of the current request, minus its queries.
+    """
+    timings = _request_timings.get()
+    if timings is None or timings.phase is not None:
+        yield
+        return
+
+    timings.phase = phase
+    db = timings.db
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start - (timings.db - db)
+        setattr(timings, phase, getattr(timings, phase) + elapsed)
+        timings.phase = None
+
+
+def record_query(execute, sql, params, many, context):
+    timings = _request_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db += time.perf_counter() - start
+        timings.queries += 1
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    # Connected to `connection_created`. Execute wrappers are kept across reconnections,
+    # and inserted first, as `execute_wrapper()` removes the last one when it exits
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def get_server_timing(timings):
+    return ', '.join([
+        f'{DB};dur={timings.db * 1e3:.3f};desc="{timings.queries} queries"',
+        f'{SERIALIZER};dur={timings.serializer * 1e3:.3f}',
+        f'{RENDER};dur={timings.render * 1e3:.3f}',
+        f'{TOTAL};dur={timings.total * 1e3:.3f}',
+    ])
+
+
+class RouteMetrics:
+    """
+    Request, query and timing totals of this process, per route name.
+    """
+    def __init__(self):
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def record(self, route, timings):
+        bucket = bisect.bisect_left(DURATION_BUCKETS, timings.total)
+
+        with self._lock:
+            metrics = self._routes.get(route)
+            if metrics is None:
+                metrics = self._routes[route] = {
+                    'requests': 0,
+                    'queries': 0,
+                    **{phase: 0.0 for phase in PHASES},
+                    'buckets': [0] * (len(DURATION_BUCKETS) + 1),
+                }
+
+            metrics['requests'] += 1
+            metrics['queries'] += timings.queries
+            for phase in PHASES:
+                metrics[phase] += getattr(timings, phase)
+            metrics['buckets'][bucket] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                route: {**metrics, 'buckets': list(metrics['buckets'])}
+                for route, metrics in sorted(self._routes.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+route_metrics = RouteMetrics()
+
+
+class InstrumentationMiddleware:
+    """
+    Time each request, add its `Server-Timing` header and record it under its route name.
+
+    Requests not resolved to a route, e.g. 404s, only get the header.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        timings = RequestTimings()
+        token = _request_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            timings.total = time.perf_counter() - start
+            _request_timings.reset(token)
+
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _request_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            timings.total = time.perf_counter() - start
+            _request_timings.reset(token)
+
+        return self.finish(request, response, timings)
+
+    def finish(self, request, response, timings):
+        response['Server-Timing'] = get_server_timing(timings)
+
+        resolver_match = request.resolver_match
+        if resolver_match is not None:
+            route_metrics.record(resolver_match.view_name, timings)
+
+        return response
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_sample(name, labels, value):
+    label_pairs = ','.join(f'{label}="{escape_label(label_value)}"' for label, label_value in labels.items())
+    return f'{name}{{{label_pairs}}} {value}'
+
+
+def render_prometheus():
+    """
+    Return the metrics of this process in the Prometheus text exposition format.
+    """
+    lines = []
+
+    def add_family(name, metric_type, help_text, samples):
+        # samples are (name suffix, labels, value) tuples
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        lines.extend(format_sample(f'{name}{suffix}', labels, value) for suffix, labels, value in samples)
+
+    routes = route_metrics.snapshot()
+
+    add_family(
+        'api_requests_total', 'counter', 'Requests served, per route.',
+        [('', {'route': route}, metrics['requests']) for route, metrics in routes.items()],
+    )
+    add_family(
+        'api_db_queries_total', 'counter', 'SQL queries run by requests, per route.',
+        [('', {'route': route}, metrics['queries']) for route, metrics in routes.items()],
+    )
+    for phase in (DB, SERIALIZER, RENDER):
+        add_family(
+            f'api_{phase}_seconds_total', 'counter', f'Seconds spent in the {phase} phase of requests, per route.',
+            [('', {'route': route}, metrics[phase]) for route, metrics in routes.items()],
+        )
+
+    duration_samples = []
+    for route, metrics in routes.items():
+        cumulative = 0
+        for upper_bound, count in zip((*DURATION_BUCKETS, '+Inf'), metrics['buckets']):
+            cumulative += count
+            duration_samples.append(('_bucket', {'route': route, 'le': upper_bound}, cumulative))
+        duration_samples.append(('_sum', {'route': route}, metrics[TOTAL]))
+        duration_samples.append(('_count', {'route': route}, metrics['requests']))
+    add_family('api_request_duration_seconds', 'histogram', 'Request durations, per route.', duration_samples)
+
+    add_family(
+        'api_cache_requests_total', 'counter', 'Response cache lookups, per namespace and outcome.',
+        [
+            ('', {'namespace': namespace, 'outcome': outcome}, counters[key])
+            for namespace, counters in cache.stats.snapshot().items()
+            for outcome, key in ((cache.HIT, 'hits'), (cache.MISS, 'misses'))
+        ],
+    )
+
+    # Empty unless databases use the pool backend, as pools are only opened by it
+    pool_stats = get_pool_stats()
+    for stat in sorted({stat for stats in pool_stats.values() for stat in stats}):
+        samples = [('', {'alias': alias}, stats[stat]) for alias, stats in pool_stats.items() if stat in stats]
+        name = f"api_database_pool_{stat.removeprefix('pool_')}"
+        if stat in POOL_GAUGES:
+            add_family(name, 'gauge', f'psycopg_pool {stat} statistic.', samples)
+        else:
+            add_family(f'{name}_total', 'counter', f'psycopg_pool {stat} statistic.', samples)
+
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    return HttpResponse(render_prometheus(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,32 @@
+import json
+from importlib import import_module
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmarks import SUITES
+
+
+class Command(BaseCommand):
+    help = 'Run a benchmark suite against the configured database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('suite', choices=sorted(SUITES))
+        parser.add_argument('--output', help='Also write the results as JSON to this path')
+
+        for module_path in SUITES.values():
+            import_module(module_path).add_arguments(parser)
+
+    def handle(self, *args, suite, output, **options):
+        results = import_module(SUITES[suite]).run(options)
+
+        for result in results:
+            self.stdout.write(json.dumps(result))
+
+        if output:
+            with open(output, 'w') as output_file:
+                json.dump(results, output_file, indent=2)
+
+        # Set by suites compared with a --baseline
+        regressed = [result['name'] for result in results if result.get('regressions')]
+        if regressed:
+            raise CommandError(f'Regressions against the baseline: {", ".join(regressed)}')
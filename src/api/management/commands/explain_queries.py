@@ -0,0 +1,185 @@
+import json
+import time
+from datetime import date, timedelta
+from urllib.parse import urlencode
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.constants import AGENDA_MAX_DAYS
+from api.models import Appointment, HealthCareWorker
+from saude_drf.db.replicas import PIN_COOKIE
+
+
+DEFAULT_MIN_ROWS = 10000
+EXPLAINED_PAGE_SIZE = 100
+AGENDA_SAMPLE_START = date(2137, 1, 1)
+PIN_SECONDS = 3600
+
+
+def get_explained_requests():
+    """
+    Return (route name, path) pairs exercising the queries each viewset runs.
+
+    Listings are requested paginated, as a full listing is meant to read the whole table.
+    Sample lookups come from the first rows, routes needing them are skipped on an empty database.
+    """
+    page = {'page_size': EXPLAINED_PAGE_SIZE}
+    appointment = Appointment.objects.select_related('health_care_worker').order_by('id').first()
+    health_care_worker = HealthCareWorker.objects.order_by('id').first()
+
+    requests = [
+        ('api:health-care-workers-list', reverse('api:health-care-workers-list'), page),
+        ('api:appointments-list', reverse('api:appointments-list'), page),
+    ]
+
+    if health_care_worker is not None:
+        requests.append((
+            'api:health-care-workers-detail',
+            reverse('api:health-care-workers-detail', args=[health_care_worker.uuid]),
+            {},
+        ))
+        requests.append((
+            'api:health-care-workers-agenda',
+            reverse('api:health-care-workers-agenda', args=[health_care_worker.uuid]),
+            {'de': AGENDA_SAMPLE_START, 'ate': AGENDA_SAMPLE_START + timedelta(days=AGENDA_MAX_DAYS - 1)},
+        ))
+
+    if appointment is not None:
+        requests += [
+            (
+                'api:appointments-list',
+                reverse('api:appointments-list'),
+                {**page, 'profissional_uuid': appointment.health_care_worker.uuid},
+            ),
+            (
+                'api:appointments-list',
+                reverse('api:appointments-list'),
+                {
+                    **page,
+                    'profissional_uuid__in': appointment.health_care_worker.uuid,
+                    'data_inicio': appointment.date,
+                    'data_fim': appointment.date,
+                },
+            ),
+            (
+                'api:appointments-list',
+                reverse('api:appointments-list'),
+                {**page, 'especializacao': appointment.health_care_worker.specialization},
+            ),
+            (
+                'api:appointments-list',
+                reverse('api:appointments-list'),
+                {**page, 'data_inicio': appointment.date},
+            ),
+            (
+                'api:appointments-detail',
+                reverse('api:appointments-detail', args=[appointment.uuid]),
+                {},
+            ),
+        ]
+
+    return [
+        (route_name, f'{path}?{urlencode(query)}' if query else path)
+        for route_name, path, query in requests
+    ]
+
+
+def iter_plan_nodes(plan):
+    yield plan
+    for subplan in plan.get('Plans', ()):
+        yield from iter_plan_nodes(subplan)
+
+
+def describe_scan(node):
+    description = f"{node['Node Type']} on {node['Relation Name']}"
+    if 'Index Name' in node:
+        description += f" using {node['Index Name']}"
+    return description
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the queries run by the API viewsets and fail on sequential scans of large tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-rows',
+            type=int,
+            default=DEFAULT_MIN_ROWS,
+            help='Sequential scans fail on tables estimated to have at least this many rows',
+        )
+        parser.add_argument(
+            '--disable-seqscan',
+            action='store_true',
+            help=(
+                'Plan with enable_seqscan off, so a sequential scan is only chosen when no index can be used. '
+                'Combined with --min-rows 0 this also checks a small database'
+            ),
+        )
+
+    def handle(self, *args, min_rows, disable_seqscan, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('EXPLAIN plans are only checked on PostgreSQL')
+
+        client = Client(HTTP_HOST='localhost')
+        # Reads are pinned to the primary, whose queries are captured and explained, see saude_drf.db.replicas
+        client.cookies[PIN_COOKIE] = f'{time.time() + PIN_SECONDS}'
+        failures = []
+
+        for route_name, path in get_explained_requests():
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(path)
+
+            if response.status_code != 200:
+                raise CommandError(f'GET {path} returned {response.status_code}')
+
+            self.stdout.write(f'{route_name} GET {path}')
+
+            for query in context.captured_queries:
+                sql = query['sql']
+                if not sql.lstrip().upper().startswith('SELECT'):
+                    continue
+
+                for node in self.explain(sql, disable_seqscan):
+                    if 'Relation Name' not in node:
+                        continue
+
+                    scan = describe_scan(node)
+                    rows = self.get_estimated_rows(node['Relation Name'])
+                    if node['Node Type'] == 'Seq Scan' and rows >= min_rows:
+                        failures.append(f'{route_name}: {scan} (~{rows} rows)\n  {sql}')
+                        self.stdout.write(self.style.ERROR(f'  {scan}'))
+                    else:
+                        self.stdout.write(f'  {scan}')
+
+        if failures:
+            raise CommandError('Sequential scans on large tables:\n' + '\n'.join(failures))
+
+        self.stdout.write(self.style.SUCCESS('No sequential scans on large tables'))
+
+    def explain(self, sql, disable_seqscan):
+        with connection.cursor() as cursor:
+            if disable_seqscan:
+                cursor.execute('SET enable_seqscan = off')
+            try:
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+                [[plans]] = cursor.fetchall()
+            finally:
+                if disable_seqscan:
+                    cursor.execute('RESET enable_seqscan')
+
+        if isinstance(plans, str):
+            plans = json.loads(plans)
+
+        return iter_plan_nodes(plans[0]['Plan'])
+
+    def get_estimated_rows(self, table_name):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples FROM pg_class WHERE oid = to_regclass(%s)', [table_name])
+            row = cursor.fetchone()
+
+        # reltuples is -1 until the table is first vacuumed or analyzed
+        return max(int(row[0]), 0) if row else 0
@@ -0,0 +1,22 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.schema import generate_schema, write_schema
+
+
+class Command(BaseCommand):
+    help = 'Generate the OpenAPI schema served by /schema/, at build or deploy time'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            type=Path,
+            help='Where to write the schema, API_SCHEMA_PATH by default',
+        )
+
+    def handle(self, *args, path, **options):
+        path = path or Path(settings.API_SCHEMA_PATH)
+        write_schema(path, generate_schema())
+        self.stdout.write(self.style.SUCCESS(f'Schema written to {path}'))
@@ -0,0 +1,73 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api import partitions
+
+
+class Command(BaseCommand):
+    help = (
+        'Create the monthly partitions of the appointments table ahead of time and detach those of past months, '
+        'meant to run monthly'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--convert',
+            action='store_true',
+            help='Partition the appointments table first, if it is a regular one. The table is locked meanwhile',
+        )
+        parser.add_argument(
+            '--revert',
+            action='store_true',
+            help='Turn the appointments table back into a regular one, with the rows of its attached partitions',
+        )
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=partitions.MONTHS_AHEAD,
+            help='Months after the current one to create partitions for',
+        )
+        parser.add_argument(
+            '--detach-before',
+            type=date.fromisoformat,
+            help='Detach the partitions of the months before this date (AAAA-MM-DD), kept as archive tables',
+        )
+        parser.add_argument(
+            '--drop',
+            action='store_true',
+            help='Drop the detached partitions instead of keeping them',
+        )
+
+    def handle(self, *args, convert, revert, months_ahead, detach_before, drop, **options):
+        current_month = timezone.localdate().replace(day=1)
+        if detach_before is not None and detach_before > current_month:
+            raise CommandError('Only partitions of past months can be detached')
+        if drop and detach_before is None:
+            raise CommandError('--drop requires --detach-before')
+
+        if revert:
+            with transaction.atomic():
+                if partitions.is_partitioned(connection):
+                    partitions.unpartition(connection)
+                    self.stdout.write(f'Unpartitioned {partitions.TABLE}')
+            self.stdout.write(self.style.SUCCESS('The appointments table is a regular one'))
+            return
+
+        with transaction.atomic():
+            if not partitions.is_partitioned(connection):
+                if not convert:
+                    raise CommandError('The appointments table is not partitioned, use --convert')
+                partitions.partition(connection)
+                self.stdout.write(f'Partitioned {partitions.TABLE}')
+
+            for name in partitions.create_partitions(connection, months_ahead):
+                self.stdout.write(f'Created partition {name}')
+
+            if detach_before is not None:
+                for name in partitions.detach_partitions(connection, detach_before, drop):
+                    self.stdout.write(f'{"Dropped" if drop else "Detached"} partition {name}')
+
+        self.stdout.write(self.style.SUCCESS('Appointment partitions are up to date'))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from api import summaries
+from api.models import HealthCareWorker
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the appointment summaries of health care workers whose next appointment date has passed, '
+        'meant to run daily'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            dest='refresh_all',
+            help='Recompute every summary, e.g. after appointments were written without the API',
+        )
+
+    def handle(self, *args, refresh_all, **options):
+        today = timezone.localdate()
+        health_care_workers = HealthCareWorker.objects.all()
+        if not refresh_all:
+            health_care_workers = health_care_workers.filter(next_appointment_date__lt=today)
+
+        with transaction.atomic():
+            # Before refreshing, as refreshed summaries no longer match the filter
+            summaries.invalidate_cache(health_care_workers.values('pk'))
+            count = summaries.refresh(health_care_workers, today)
+
+        self.stdout.write(self.style.SUCCESS(f'Refreshed {count} appointment summaries'))
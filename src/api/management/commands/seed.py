@@ -0,0 +1,182 @@
+import random
+import time
+from datetime import timedelta
+from functools import partial
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api import cache, summaries
+from api.constants import HEALTH_PRACTITIONERS_AND_PROFESSIONALS, PRONOUNS
+from api.models import Appointment, HealthCareWorker
+from api.models.base import uuid7
+
+
+DEFAULT_BATCH_SIZE = 100000
+MIN_AGE_DAYS = 21 * 365
+MAX_AGE_DAYS = 80 * 365
+APPOINTMENT_INFOS = (
+    'Primeira consulta',
+    'Consulta de rotina',
+    'Retorno',
+    'Avaliação de exames',
+    'Acompanhamento',
+)
+
+HEALTH_CARE_WORKER_FIELDS = (
+    'id',
+    'uuid',
+    'created',
+    'modified',
+    'legal_name',
+    'preferred_name',
+    'pronouns',
+    'date_of_birth',
+    'specialization',
+    'upcoming_appointments',
+    'next_appointment_date',
+)
+APPOINTMENT_FIELDS = (
+    'uuid',
+    'created',
+    'modified',
+    'health_care_worker',
+    'date',
+    'info',
+)
+
+
+def copy_rows(model, fields, rows):
+    """
+    Load `rows`, tuples of `fields` values, into the table of `model` with a single COPY.
+    """
+    quote_name = connection.ops.quote_name
+    columns = ', '.join(quote_name(model._meta.get_field(field).column) for field in fields)
+
+    with connection.cursor() as cursor:
+        with cursor.copy(f'COPY {quote_name(model._meta.db_table)} ({columns}) FROM STDIN') as copy:
+            for row in rows:
+                copy.write_row(row)
+
+
+def allocate_ids(model, count):
+    """
+    Draw `count` values from the primary key sequence of `model`, as inserts without an id would.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)',
+            [model._meta.db_table, model._meta.pk.column, count],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def generate_health_care_workers(ids, rng, now):
+    today = now.date()
+    pronouns = rng.choices(PRONOUNS, k=len(ids))
+    specializations = rng.choices(HEALTH_PRACTITIONERS_AND_PROFESSIONALS, k=len(ids))
+
+    for id_, pronoun, specialization in zip(ids, pronouns, specializations):
+        yield (
+            id_,
+            uuid7(),
+            now,
+            now,
+            f'Profissional {id_}',
+            f'Prof. {id_}' if rng.random() < 0.5 else '',
+            pronoun,
+            today - timedelta(days=rng.randint(MIN_AGE_DAYS, MAX_AGE_DAYS)),
+            specialization,
+            # Recomputed once the appointments are loaded
+            0,
+            None,
+        )
+
+
+def generate_appointments(health_care_worker_ids, appointments_per_worker, days, rng, now):
+    # The check constraint requires dates after now, so the first one is tomorrow
+    tomorrow = now.date() + timedelta(days=1)
+    dates = [tomorrow + timedelta(days=day) for day in range(days)]
+
+    for health_care_worker_id in health_care_worker_ids:
+        # Distinct dates per worker, as (health_care_worker, date) is unique
+        for date in rng.sample(dates, appointments_per_worker):
+            yield (uuid7(), now, now, health_care_worker_id, date, rng.choice(APPOINTMENT_INFOS))
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = 'Seed health care workers and appointments for load tests, loaded with COPY'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1000, help='Health care workers to create')
+        parser.add_argument(
+            '--appointments-per-worker',
+            type=int,
+            default=100,
+            help='Appointments per health care worker, each on a distinct date',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=5 * 365,
+            help='Appointments are spread over this many days, starting tomorrow',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Rows loaded per COPY, each batch is committed on its own',
+        )
+        parser.add_argument('--random-seed', type=int, help='Seed for reproducible names, dates and choices')
+
+    def handle(self, *args, workers, appointments_per_worker, days, batch_size, random_seed, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Rows are loaded with COPY, which needs PostgreSQL')
+        if appointments_per_worker > days:
+            raise CommandError(f'{appointments_per_worker} distinct dates per worker do not fit in {days} days')
+
+        rng = random.Random(random_seed)
+        now = timezone.now()
+        start = time.perf_counter()
+
+        health_care_worker_ids = []
+        for batch in batched(range(workers), batch_size):
+            with transaction.atomic():
+                ids = allocate_ids(HealthCareWorker, len(batch))
+                copy_rows(HealthCareWorker, HEALTH_CARE_WORKER_FIELDS, generate_health_care_workers(ids, rng, now))
+            health_care_worker_ids += ids
+
+        appointments = generate_appointments(health_care_worker_ids, appointments_per_worker, days, rng, now)
+        appointment_count = 0
+        for rows in batched(appointments, batch_size):
+            with transaction.atomic():
+                copy_rows(Appointment, APPOINTMENT_FIELDS, rows)
+            appointment_count += len(rows)
+            self.stdout.write(f'{appointment_count} appointments loaded')
+
+        # COPY sends no signals, and the planner statistics would still describe the tables before loading
+        if health_care_worker_ids:
+            summaries.refresh(
+                HealthCareWorker.objects.filter(id__range=(health_care_worker_ids[0], health_care_worker_ids[-1])),
+            )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'ANALYZE {connection.ops.quote_name(HealthCareWorker._meta.db_table)}, '
+                f'{connection.ops.quote_name(Appointment._meta.db_table)}'
+            )
+        transaction.on_commit(partial(cache.invalidate_lists, cache.HEALTH_CARE_WORKERS_CACHE_NAMESPACE))
+
+        seconds = time.perf_counter() - start
+        rows = len(health_care_worker_ids) + appointment_count
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(health_care_worker_ids)} health care workers and {appointment_count} appointments '
+            f'in {seconds:.1f}s ({rows / seconds:.0f} rows/s)'
+        ))
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:43
+
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    # Indexes are built concurrently so writes to api_appointment are not blocked meanwhile
+    atomic = False
+
+    dependencies = [
+        ('api', '0003_add_appointment_date_id_index'),
+    ]
+
+    operations = [
+        RemoveIndexConcurrently(
+            model_name='appointment',
+            name='appointment_date_id_idx',
+        ),
+        AddIndexConcurrently(
+            model_name='appointment',
+            index=models.Index(fields=['date', 'id'], include=('uuid', 'health_care_worker'), name='appointment_date_id_idx'),
+        ),
+        # AlterField would also drop and revalidate the foreign key constraint, only the index has to go
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='appointment',
+                    name='health_care_worker',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='appointments', to='api.healthcareworker'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    sql='DROP INDEX CONCURRENTLY IF EXISTS "api_appointment_health_care_worker_id_e019e49b";',
+                    reverse_sql=(
+                        'CREATE INDEX CONCURRENTLY IF NOT EXISTS "api_appointment_health_care_worker_id_e019e49b" '
+                        'ON "api_appointment" ("health_care_worker_id");'
+                    ),
+                ),
+            ],
+        ),
+    ]
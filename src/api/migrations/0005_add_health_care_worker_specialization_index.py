@@ -0,0 +1,20 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:46
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('api', '0004_tune_appointment_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='healthcareworker',
+            index=models.Index(fields=['specialization'], name='hcw_specialization_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:50
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('api', '0005_add_health_care_worker_specialization_index'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='appointment',
+            index=models.Index(fields=['modified'], name='appointment_modified_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='healthcareworker',
+            index=models.Index(fields=['modified'], name='hcw_modified_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:14
+
+import api.models.base
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Indexes are rebuilt concurrently so writes are not blocked meanwhile
+    atomic = False
+
+    dependencies = [
+        ('api', '0006_add_modified_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='appointment',
+            name='uuid',
+            field=models.UUIDField(default=api.models.base.uuid7, editable=False, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='healthcareworker',
+            name='uuid',
+            field=models.UUIDField(default=api.models.base.uuid7, editable=False, unique=True),
+        ),
+        # Existing UUIDs are kept, as they are the public identifiers of the resources.
+        # Rebuilding the indexes compacts the pages left half empty by random UUIDv4 inserts,
+        # new UUIDv7 values are then appended to the right edge of the index
+        migrations.RunSQL(
+            sql='REINDEX INDEX CONCURRENTLY "api_appointment_uuid_key";',
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.RunSQL(
+            sql='REINDEX INDEX CONCURRENTLY "api_healthcareworker_uuid_key";',
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
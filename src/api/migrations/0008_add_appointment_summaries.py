@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_use_uuid7'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='healthcareworker',
+            name='next_appointment_date',
+            field=models.DateField(null=True),
+        ),
+        migrations.AddField(
+            model_name='healthcareworker',
+            name='upcoming_appointments',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        # Summaries of the existing appointments, from one aggregate instead of a subquery per health care worker
+        migrations.RunSQL(
+            sql='''
+                UPDATE api_healthcareworker
+                SET upcoming_appointments = summary.upcoming_appointments,
+                    next_appointment_date = summary.next_appointment_date
+                FROM (
+                    SELECT health_care_worker_id, COUNT(*) AS upcoming_appointments, MIN(date) AS next_appointment_date
+                    FROM api_appointment
+                    WHERE date >= CURRENT_DATE
+                    GROUP BY health_care_worker_id
+                ) AS summary
+                WHERE api_healthcareworker.id = summary.health_care_worker_id
+            ''',
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
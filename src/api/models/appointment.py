@@ -4,6 +4,8 @@ from django.db import models
 from django.db.models.functions import Now
 
 from api.constants import (
+    APPOINTMENT_DATE_ID_INDEX_NAME,
+    APPOINTMENT_MODIFIED_INDEX_NAME,
     APPOINTMENT_DATE_CONSTRAINT_NAME,
     UNIQUE_APPOINTMENT_DATE_HEALTH_CARE_WORKER_CONSTRAINT_NAME,
 )
@@ -12,12 +14,42 @@ from .health_care_worker import HealthCareWorker
 
 
 class Appointment(BaseModel):
-    health_care_worker = models.ForeignKey(HealthCareWorker, related_name='appointments', on_delete=models.CASCADE)
+    # No standalone index: the unique (health_care_worker, date) constraint already leads with this column
+    health_care_worker = models.ForeignKey(
+        HealthCareWorker,
+        related_name='appointments',
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
     date = models.DateField()
     info = models.TextField()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets api.signals tell when a save moves the appointment to another health care worker or date
+        instance._loaded_summary_key = (
+            instance.__dict__.get('health_care_worker_id'),
+            instance.__dict__.get('date'),
+        )
+        return instance
+
     class Meta:
         ordering = ['date']
+        indexes = [
+            # Backs the default ordering and the (date, id) keyset pagination,
+            # covering the list projection apart from `info`
+            models.Index(
+                fields=["date", "id"],
+                include=["uuid", "health_care_worker"],
+                name=APPOINTMENT_DATE_ID_INDEX_NAME,
+            ),
+            # Lets the Max('modified') and Count() behind list ETags read the index only
+            models.Index(
+                fields=["modified"],
+                name=APPOINTMENT_MODIFIED_INDEX_NAME,
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["health_care_worker", "date"],
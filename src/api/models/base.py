@@ -1,17 +1,67 @@
+import os
+import threading
+import time
 import uuid
 
 from django.db import models
 from model_utils.models import TimeStampedModel
 
 
+_uuid7_lock = threading.Lock()
+_uuid7_last_timestamp_ms = None
+_uuid7_last_counter = 0
+
+
+def _get_uuid7_counter_and_tail():
+    rand = int.from_bytes(os.urandom(10))
+    # The counter most significant bit is left unset, leaving room for it to be incremented
+    return (rand >> 32) & 0x1ff_ffff_ffff, rand & 0xffff_ffff
+
+
+def uuid7():
+    """
+    Return a time-ordered UUID version 7, as in RFC 9562 and the `uuid.uuid7` of Python 3.14.
+
+    The 48 bit Unix timestamp in milliseconds comes first, followed by a 42 bit counter,
+    randomly seeded on each new millisecond, and 32 random bits.
+    UUIDs from the same process are strictly increasing, even within a millisecond
+    or when the clock goes backwards.
+    """
+    global _uuid7_last_timestamp_ms, _uuid7_last_counter
+
+    with _uuid7_lock:
+        timestamp_ms = time.time_ns() // 1_000_000
+        if _uuid7_last_timestamp_ms is None or timestamp_ms > _uuid7_last_timestamp_ms:
+            counter, tail = _get_uuid7_counter_and_tail()
+        else:
+            timestamp_ms = _uuid7_last_timestamp_ms
+            counter = _uuid7_last_counter + 1
+            if counter > 0x3ff_ffff_ffff:
+                timestamp_ms += 1
+                counter, tail = _get_uuid7_counter_and_tail()
+            else:
+                tail = int.from_bytes(os.urandom(4))
+
+        _uuid7_last_timestamp_ms = timestamp_ms
+        _uuid7_last_counter = counter
+
+    value = (timestamp_ms & 0xffff_ffff_ffff) << 80
+    value |= 0x7 << 76  # version
+    value |= (counter >> 30) << 64
+    value |= 0b10 << 62  # variant
+    value |= (counter & 0x3fff_ffff) << 32
+    value |= tail
+    return uuid.UUID(int=value)
+
+
 # Based on https://buildkite.com/blog/goodbye-integers-hello-uuids
-# as UUIDv7 is not available yet
+# UUIDv7 keeps inserts at the right edge of the uuid index, where random UUIDv4 split pages all over it
 # ( source: https://github.com/python/cpython/issues/89083 )
 class IdUuidModel(models.Model):
     id = models.AutoField(primary_key=True)
     uuid = models.UUIDField(
         unique=True,
-        default=uuid.uuid4,
+        default=uuid7,
         editable=False,
     )
 
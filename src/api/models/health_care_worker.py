@@ -2,6 +2,10 @@ import uuid
 
 from django.db import models
 
+from api.constants import (
+    HEALTH_CARE_WORKER_MODIFIED_INDEX_NAME,
+    HEALTH_CARE_WORKER_SPECIALIZATION_INDEX_NAME,
+)
 from .base import BaseModel
 
 
@@ -13,3 +17,21 @@ class HealthCareWorker(BaseModel):
     date_of_birth = models.DateField()
 
     specialization = models.CharField(max_length=255)
+
+    # Summary of the appointments from today on, maintained by api.summaries
+    upcoming_appointments = models.PositiveIntegerField(default=0)
+    next_appointment_date = models.DateField(null=True)
+
+    class Meta:
+        indexes = [
+            # Backs the especializacao appointment filter
+            models.Index(
+                fields=["specialization"],
+                name=HEALTH_CARE_WORKER_SPECIALIZATION_INDEX_NAME,
+            ),
+            # Lets the Max('modified') and Count() behind list ETags read the index only
+            models.Index(
+                fields=["modified"],
+                name=HEALTH_CARE_WORKER_MODIFIED_INDEX_NAME,
+            ),
+        ]
@@ -0,0 +1,216 @@
+from base64 import b64decode, b64encode
+from urllib import parse
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from django.utils.encoding import force_str
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opt-in keyset (seek) pagination over a unique composite ordering.
+
+    A page is only produced when the client sends ``cursor`` or ``page_size``,
+    so listing without them keeps returning every row.
+    Pages are fetched with a ``WHERE (keys) > (position)`` seek instead of ``OFFSET``,
+    which keeps deep pages as cheap as the first one when ``ordering`` is indexed.
+
+    Based on https://use-the-index-luke.com/no-offset
+    """
+    cursor_query_param = 'cursor'
+    cursor_query_description = _('The pagination cursor value.')
+    page_size_query_param = 'page_size'
+    page_size_query_description = _('Number of results to return per page.')
+    page_size = 100
+    max_page_size = 1000
+    invalid_cursor_message = _('Invalid cursor')
+
+    # Ascending model field names - the last one must be unique
+    ordering = ('id',)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.get_page_queryset(queryset, request)
+        if page_queryset is None:
+            return None
+
+        return self.set_page(list(page_queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.get_page_queryset(queryset, request)
+        if page_queryset is None:
+            return None
+
+        return self.set_page([instance async for instance in page_queryset])
+
+    def get_page_queryset(self, queryset, request):
+        query_params = request.query_params
+        if self.cursor_query_param not in query_params and self.page_size_query_param not in query_params:
+            return None
+
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request, queryset.model)
+
+        reverse, position = self.cursor or (False, None)
+
+        if reverse:
+            queryset = queryset.order_by(*(f'-{field_name}' for field_name in self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if position is not None:
+            queryset = queryset.filter(self.build_seek_condition(position, reverse))
+
+        # We always fetch an extra item in order to determine if there is another page
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        reverse, position = self.cursor or (False, None)
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = bool(self.page)
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None and bool(self.page)
+
+        return self.page
+
+    def build_seek_condition(self, position, reverse):
+        """
+        Expand ``(k1, ..., kn) > (v1, ..., vn)`` into a ``Q`` that starts with
+        an inclusive range on the leading key, so it can drive an index range scan.
+        """
+        lookup, inclusive_lookup = ('lt', 'lte') if reverse else ('gt', 'gte')
+        pairs = list(zip(self.ordering, position))
+
+        field_name, value = pairs[-1]
+        condition = Q(**{f'{field_name}__{lookup}': value})
+        for field_name, value in reversed(pairs[:-1]):
+            condition = Q(**{f'{field_name}__{lookup}': value}) | (Q(**{field_name: value}) & condition)
+
+        leading_field_name, leading_value = pairs[0]
+        if len(pairs) > 1:
+            condition = Q(**{f'{leading_field_name}__{inclusive_lookup}': leading_value}) & condition
+
+        return condition
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            querystring = b64decode(encoded.encode('ascii')).decode('ascii')
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+
+            reverse = bool(int(tokens.get('r', ['0'])[0]))
+
+            raw_position = tokens['p']
+            if len(raw_position) != len(self.ordering):
+                raise ValueError
+
+            position = tuple(
+                model._meta.get_field(field_name).to_python(raw_value)
+                for field_name, raw_value in zip(self.ordering, raw_position)
+            )
+        except (TypeError, ValueError, KeyError, UnicodeError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return reverse, position
+
+    def encode_cursor(self, reverse, position):
+        tokens = {
+            'p': [str(value) for value in position],
+        }
+        if reverse:
+            tokens['r'] = '1'
+
+        querystring = parse.urlencode(tokens, doseq=True)
+        encoded = b64encode(querystring.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_position_from_instance(self, instance):
+        return tuple(getattr(instance, field_name) for field_name in self.ordering)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(False, self.get_position_from_instance(self.page[-1]))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(True, self.get_position_from_instance(self.page[0]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'data': data,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['data'],
+            'properties': {
+                'data': schema,
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                },
+                'previous': {
+                    'type': 'string',
+                    'nullable': True,
+                },
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': force_str(self.cursor_query_description),
+                'schema': {
+                    'type': 'string',
+                },
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': force_str(self.page_size_query_description),
+                'schema': {
+                    'type': 'integer',
+                },
+            },
+        ]
+
+
+class AppointmentsPagination(KeysetPagination):
+    ordering = ('date', 'id')
+
+
+class HealthCareWorkersPagination(KeysetPagination):
+    ordering = ('id',)
@@ -0,0 +1,36 @@
+import codecs
+from io import BytesIO
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from api.renderers import ORJSONRenderer
+
+try:
+    import orjson
+except ImportError:  # Optional, see the "speedups" extra
+    orjson = None
+
+
+class ORJSONParser(JSONParser):
+    """
+    `JSONParser` decoding UTF-8 bodies with orjson.
+
+    Bodies orjson rejects, such as integers beyond 64 bits, lone surrogates or invalid JSON,
+    are parsed again by `JSONParser`, for the same data or the same error message.
+    Without orjson installed, this is `JSONParser`.
+    """
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        if orjson is None or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        content = stream.read()
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return super().parse(BytesIO(content), media_type, parser_context)
@@ -0,0 +1,408 @@
+"""
+Optional monthly range partitioning of the appointments table by `date`, done explicitly
+with the `partition_appointments` command, as migrations give every environment the same schema.
+
+Appointments can only be booked for later dates, so partitions of past months are only ever read.
+Queries filtered by date only scan the partitions of their range, and old months can be detached
+and kept as standalone archive tables, or dropped, without deleting rows from a live table.
+
+A default partition takes dates without a monthly partition yet, and `create_partition` moves them
+to their month. PostgreSQL requires unique constraints to include the partition key, so the primary key
+and the `uuid` unique constraint become (id, date) and (uuid, date). The identity column keeps ids unique,
+and `uuid` is kept unique across partitions by `UUID_TABLE`, see `create_uuid_table`.
+The (health_care_worker, date) constraint is kept as it is.
+"""
+import re
+from datetime import date
+
+from django.utils import timezone
+
+from api.models import Appointment
+
+
+TABLE = Appointment._meta.db_table
+PARTITION_KEY = Appointment._meta.get_field('date').column
+DEFAULT_PARTITION = f'{TABLE}_default'
+UUID_COLUMN = Appointment._meta.get_field('uuid').column
+# Holds the uuid of every appointment of a partitioned table, as its primary key
+UUID_TABLE = f'{TABLE}_uuid'
+UUID_TRIGGER = f'{TABLE}_uuid_sync'
+MONTHS_AHEAD = 12
+
+BOUND_PATTERN = re.compile(r"FROM \('(?P<start>[\d-]+)'\) TO \('(?P<end>[\d-]+)'\)")
+
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def get_partition_name(month):
+    return f'{TABLE}_p{month:%Y_%m}'
+
+
+def is_partitioned(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)', [TABLE])
+        row = cursor.fetchone()
+
+    return row is not None and row[0] == 'p'
+
+
+def get_partitions(connection):
+    """
+    Return (name, first day, first day after) of the monthly partitions, in date order.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            '''
+            SELECT partition.relname, pg_get_expr(partition.relpartbound, partition.oid)
+            FROM pg_inherits
+            JOIN pg_class partition ON partition.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = to_regclass(%s)
+            ''',
+            [TABLE],
+        )
+        rows = cursor.fetchall()
+
+    partitions = []
+    for name, bound in rows:
+        match = BOUND_PATTERN.search(bound)
+        if match is not None:
+            partitions.append((name, date.fromisoformat(match['start']), date.fromisoformat(match['end'])))
+
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def get_constraints(cursor, table):
+    """
+    Return (name, type, columns, definition) of the constraints of `table`, apart from NOT NULL ones.
+    """
+    cursor.execute(
+        '''
+        SELECT
+            constraint_.conname,
+            constraint_.contype,
+            ARRAY(
+                SELECT attribute.attname
+                FROM unnest(constraint_.conkey) WITH ORDINALITY AS key (number, position)
+                JOIN pg_attribute attribute
+                    ON attribute.attrelid = constraint_.conrelid AND attribute.attnum = key.number
+                ORDER BY key.position
+            ),
+            pg_get_constraintdef(constraint_.oid)
+        FROM pg_constraint constraint_
+        WHERE constraint_.conrelid = to_regclass(%s) AND constraint_.contype IN ('c', 'f', 'p', 'u')
+        ORDER BY constraint_.contype DESC, constraint_.conname
+        ''',
+        [table],
+    )
+    # Constraints are copied as NOT VALID where needed, see get_constraint_definition
+    return [
+        (name, constraint_type, columns, definition.removesuffix(' NOT VALID'))
+        for name, constraint_type, columns, definition in cursor.fetchall()
+    ]
+
+
+def get_index_definitions(cursor, table):
+    """
+    Return the definitions of the indexes of `table` that do not back a constraint.
+    """
+    cursor.execute(
+        '''
+        SELECT pg_get_indexdef(index_.indexrelid)
+        FROM pg_index index_
+        WHERE index_.indrelid = to_regclass(%s)
+            AND NOT EXISTS (SELECT FROM pg_constraint WHERE pg_constraint.conindid = index_.indexrelid)
+        ORDER BY index_.indexrelid::regclass::text
+        ''',
+        [table],
+    )
+    # Indexes of a partitioned table are defined ON ONLY it, but created for its partitions too
+    return [definition.replace(' ON ONLY ', ' ON ') for definition, in cursor.fetchall()]
+
+
+def get_constraint_definition(connection, constraint_type, columns, definition, partitioned):
+    quote_name = connection.ops.quote_name
+
+    if constraint_type in ('p', 'u'):
+        unique_columns = {field.column for field in Appointment._meta.local_fields if field.unique}
+        if partitioned and PARTITION_KEY not in columns:
+            columns = [*columns, PARTITION_KEY]
+        elif not partitioned and len(columns) == 2 and columns[0] in unique_columns and columns[1] == PARTITION_KEY:
+            columns = columns[:1]
+
+        keyword = 'PRIMARY KEY' if constraint_type == 'p' else 'UNIQUE'
+        return f'{keyword} ({", ".join(quote_name(column) for column in columns)})'
+
+    if constraint_type == 'c':
+        # Past appointments are bound to fail the check of future dates, which only applies to new rows
+        return f'{definition} NOT VALID'
+
+    return definition
+
+
+def rename_partition_indexes(connection, cursor, partition_name):
+    """
+    Name the indexes of a partition after those of the table, e.g. `<index>_p2137_01`.
+
+    Renaming the index of a unique constraint renames the constraint too, so violations still name the
+    constraint of the table, see api.serializers.integrity, and plans the index of the table.
+    """
+    quote_name = connection.ops.quote_name
+    suffix = partition_name.removeprefix(f'{TABLE}_')
+
+    cursor.execute(
+        '''
+        SELECT partition_index.relname, parent_index.relname
+        FROM pg_index
+        JOIN pg_class partition_index ON partition_index.oid = pg_index.indexrelid
+        JOIN pg_inherits ON pg_inherits.inhrelid = pg_index.indexrelid
+        JOIN pg_class parent_index ON parent_index.oid = pg_inherits.inhparent
+        WHERE pg_index.indrelid = to_regclass(%s)
+        ''',
+        [partition_name],
+    )
+    for name, parent_name in cursor.fetchall():
+        cursor.execute(f'ALTER INDEX {quote_name(name)} RENAME TO {quote_name(f"{parent_name}_{suffix}")}')
+
+
+def create_uuid_table(connection, cursor):
+    """
+    Keep `uuid` unique across the partitions, with a table of every uuid in use maintained by a trigger.
+
+    A duplicate uuid in any partition is then a unique violation of `UUID_TABLE`, enforced by the database
+    as the unique constraint of a regular table would. Rows moved to another partition by an update are
+    deleted and inserted again, which the trigger follows in that order.
+    """
+    quote_name = connection.ops.quote_name
+    column = quote_name(UUID_COLUMN)
+
+    cursor.execute(f'CREATE TABLE {quote_name(UUID_TABLE)} ({column} uuid PRIMARY KEY)')
+    cursor.execute(f'INSERT INTO {quote_name(UUID_TABLE)} ({column}) SELECT {column} FROM {quote_name(TABLE)}')
+    cursor.execute(
+        f'''
+        CREATE FUNCTION {quote_name(UUID_TRIGGER)}() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND OLD.{column} IS DISTINCT FROM NEW.{column}) THEN
+                DELETE FROM {quote_name(UUID_TABLE)} WHERE {column} = OLD.{column};
+            END IF;
+            IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND OLD.{column} IS DISTINCT FROM NEW.{column}) THEN
+                INSERT INTO {quote_name(UUID_TABLE)} ({column}) VALUES (NEW.{column});
+            END IF;
+            RETURN NULL;
+        END
+        $$
+        '''
+    )
+    cursor.execute(
+        f'CREATE TRIGGER {quote_name(UUID_TRIGGER)} AFTER INSERT OR UPDATE OF {column} OR DELETE '
+        f'ON {quote_name(TABLE)} FOR EACH ROW EXECUTE FUNCTION {quote_name(UUID_TRIGGER)}()'
+    )
+
+
+def drop_uuid_table(connection, cursor):
+    quote_name = connection.ops.quote_name
+    cursor.execute(f'DROP TABLE IF EXISTS {quote_name(UUID_TABLE)}')
+    cursor.execute(f'DROP FUNCTION IF EXISTS {quote_name(UUID_TRIGGER)}()')
+
+
+def check_deferred_constraints(cursor):
+    # Django creates foreign keys as deferred, and tables with pending checks cannot be altered, so they run now
+    cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+    cursor.execute('SET CONSTRAINTS ALL DEFERRED')
+
+
+def rebuild_table(connection, partitioned):
+    """
+    Replace the appointments table with a partitioned one or back, keeping its rows, constraints and indexes.
+
+    The table is locked meanwhile, as every row is copied.
+    """
+    quote_name = connection.ops.quote_name
+    new_table = f'{TABLE}_new'
+
+    with connection.cursor() as cursor:
+        check_deferred_constraints(cursor)
+        cursor.execute(f'LOCK TABLE {quote_name(TABLE)} IN ACCESS EXCLUSIVE MODE')
+        constraints = get_constraints(cursor, TABLE)
+        index_definitions = get_index_definitions(cursor, TABLE)
+        cursor.execute(
+            '''
+            SELECT attname FROM pg_attribute
+            WHERE attrelid = to_regclass(%s) AND attnum > 0 AND NOT attisdropped
+            ORDER BY attnum
+            ''',
+            [TABLE],
+        )
+        columns = ', '.join(quote_name(column) for column, in cursor.fetchall())
+
+        cursor.execute(
+            f'CREATE TABLE {quote_name(new_table)} '
+            f'(LIKE {quote_name(TABLE)} INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING STORAGE)'
+            + (f' PARTITION BY RANGE ({quote_name(PARTITION_KEY)})' if partitioned else '')
+        )
+
+        if partitioned:
+            cursor.execute(
+                f'SELECT DISTINCT date_trunc(%s, {quote_name(PARTITION_KEY)})::date FROM {quote_name(TABLE)}',
+                ['month'],
+            )
+            current_month = timezone.localdate().replace(day=1)
+            months = {month for month, in cursor.fetchall()}
+            months.update(add_months(current_month, number) for number in range(MONTHS_AHEAD + 1))
+
+            cursor.execute(
+                f'CREATE TABLE {quote_name(DEFAULT_PARTITION)} PARTITION OF {quote_name(new_table)} DEFAULT'
+            )
+            for month in sorted(months):
+                cursor.execute(
+                    f'CREATE TABLE {quote_name(get_partition_name(month))} PARTITION OF {quote_name(new_table)} '
+                    f'FOR VALUES FROM (%s) TO (%s)',
+                    [month, add_months(month, 1)],
+                )
+
+        cursor.execute(
+            f'INSERT INTO {quote_name(new_table)} ({columns}) SELECT {columns} FROM {quote_name(TABLE)}'
+        )
+        cursor.execute(
+            f'''
+            SELECT setval(pg_get_serial_sequence(%s, %s), COALESCE(MAX("id"), 1), MAX("id") IS NOT NULL)
+            FROM {quote_name(new_table)}
+            ''',
+            [new_table, 'id'],
+        )
+        cursor.execute(f'DROP TABLE {quote_name(TABLE)}')
+        cursor.execute(f'ALTER TABLE {quote_name(new_table)} RENAME TO {quote_name(TABLE)}')
+        cursor.execute(
+            f'ALTER SEQUENCE {quote_name(f"{new_table}_id_seq")} RENAME TO {quote_name(f"{TABLE}_id_seq")}'
+        )
+
+        for name, constraint_type, constraint_columns, definition in constraints:
+            definition = get_constraint_definition(
+                connection,
+                constraint_type,
+                constraint_columns,
+                definition,
+                partitioned,
+            )
+            cursor.execute(f'ALTER TABLE {quote_name(TABLE)} ADD CONSTRAINT {quote_name(name)} {definition}')
+
+        for definition in index_definitions:
+            cursor.execute(definition)
+
+        if partitioned:
+            for name in [DEFAULT_PARTITION, *(get_partition_name(month) for month in months)]:
+                rename_partition_indexes(connection, cursor, name)
+            create_uuid_table(connection, cursor)
+        else:
+            # Its trigger went with the partitioned table
+            drop_uuid_table(connection, cursor)
+
+
+def partition(connection):
+    """
+    Partition the appointments table by month, from the first month with appointments to `MONTHS_AHEAD` from now.
+    """
+    rebuild_table(connection, partitioned=True)
+
+
+def unpartition(connection):
+    """
+    Turn the appointments table back into a regular one, with the rows of its attached partitions.
+    """
+    rebuild_table(connection, partitioned=False)
+
+
+def create_partition(connection, month):
+    """
+    Create the partition of `month`, moving its appointments out of the default partition.
+
+    The rows are copied into a standalone table that is then attached, as the check of future dates
+    would reject the past appointments of the month if they were inserted through the partitioned table.
+    """
+    quote_name = connection.ops.quote_name
+    name = get_partition_name(month)
+    bounds = [month, add_months(month, 1)]
+
+    with connection.cursor() as cursor:
+        check_deferred_constraints(cursor)
+        constraints = get_constraints(cursor, TABLE)
+
+        cursor.execute(f'ALTER TABLE {quote_name(TABLE)} DETACH PARTITION {quote_name(DEFAULT_PARTITION)}')
+        cursor.execute(f'CREATE TABLE {quote_name(name)} (LIKE {quote_name(TABLE)} INCLUDING DEFAULTS)')
+        for constraint_name, constraint_type, _, definition in constraints:
+            if constraint_type == 'c':
+                cursor.execute(
+                    f'ALTER TABLE {quote_name(name)} '
+                    f'ADD CONSTRAINT {quote_name(constraint_name)} {definition} NOT VALID'
+                )
+
+        moved_rows = f'{quote_name(PARTITION_KEY)} >= %s AND {quote_name(PARTITION_KEY)} < %s'
+        cursor.execute(
+            f'INSERT INTO {quote_name(name)} SELECT * FROM {quote_name(DEFAULT_PARTITION)} WHERE {moved_rows}',
+            bounds,
+        )
+        cursor.execute(f'DELETE FROM {quote_name(DEFAULT_PARTITION)} WHERE {moved_rows}', bounds)
+
+        cursor.execute(
+            f'ALTER TABLE {quote_name(TABLE)} ATTACH PARTITION {quote_name(name)} FOR VALUES FROM (%s) TO (%s)',
+            bounds,
+        )
+        cursor.execute(f'ALTER TABLE {quote_name(TABLE)} ATTACH PARTITION {quote_name(DEFAULT_PARTITION)} DEFAULT')
+        rename_partition_indexes(connection, cursor, name)
+
+
+def create_partitions(connection, months_ahead=MONTHS_AHEAD, today=None):
+    """
+    Create the missing partitions from the current month to `months_ahead` from it.
+
+    Return the names of the created partitions.
+    """
+    current_month = (today or timezone.localdate()).replace(day=1)
+    existing = {start for _, start, _ in get_partitions(connection)}
+    created = []
+
+    for number in range(months_ahead + 1):
+        month = add_months(current_month, number)
+        if month not in existing:
+            create_partition(connection, month)
+            created.append(get_partition_name(month))
+
+    return created
+
+
+def detach_partitions(connection, before, drop=False):
+    """
+    Detach the partitions of the months before `before`, keeping them as archive tables unless `drop` is set.
+
+    Archive tables lose their foreign keys, so that health care workers can still be deleted,
+    and keep their uuids in `UUID_TABLE`, so they stay unique. Those of dropped partitions are freed.
+    Return the names of the detached partitions.
+    """
+    quote_name = connection.ops.quote_name
+    detached = []
+
+    with connection.cursor() as cursor:
+        check_deferred_constraints(cursor)
+        for name, _, end in get_partitions(connection):
+            if end > before:
+                break
+
+            cursor.execute(f'ALTER TABLE {quote_name(TABLE)} DETACH PARTITION {quote_name(name)}')
+            if drop:
+                column = quote_name(UUID_COLUMN)
+                cursor.execute(
+                    f'DELETE FROM {quote_name(UUID_TABLE)} WHERE {column} IN (SELECT {column} FROM {quote_name(name)})'
+                )
+                cursor.execute(f'DROP TABLE {quote_name(name)}')
+            else:
+                for constraint_name, constraint_type, _, _ in get_constraints(cursor, name):
+                    if constraint_type == 'f':
+                        cursor.execute(
+                            f'ALTER TABLE {quote_name(name)} DROP CONSTRAINT {quote_name(constraint_name)}'
+                        )
+
+            detached.append(name)
+
+    return detached
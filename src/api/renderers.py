@@ -0,0 +1,51 @@
+from rest_framework.renderers import JSONRenderer
+
+from api import instrumentation
+
+try:
+    import orjson
+except ImportError:  # Optional, see the "speedups" extra
+    orjson = None
+
+
+# Passthrough datetimes are encoded by the DRF encoder, which truncates microseconds and writes UTC as Z
+ORJSON_OPTIONS = None if orjson is None else orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    `JSONRenderer` encoding with orjson, which handles UUIDs, dates, dicts and lists natively.
+
+    The output is byte for byte the same as `JSONRenderer` for the API responses, which hold no floats.
+    Indented or non compact output, escaped non ASCII characters and data orjson refuses, such as
+    integers beyond 64 bits, are rendered by `JSONRenderer` instead, and values orjson does not know
+    are converted by the DRF encoder. Floats are the exception: orjson writes exponents as `1e16`
+    instead of `1e+16` and NaN as `null` instead of failing.
+    Without orjson installed, this is `JSONRenderer`.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with instrumentation.timed(instrumentation.RENDER):
+            return self._render(data, accepted_media_type, renderer_context)
+
+    def _render(self, data, accepted_media_type, renderer_context):
+        if (
+            orjson is None
+            or data is None
+            or not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same escaping as JSONRenderer, for JSON that is a strict JavaScript subset
+        if LINE_SEPARATOR in ret or PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(LINE_SEPARATOR, b'\\u2028').replace(PARAGRAPH_SEPARATOR, b'\\u2029')
+        return ret
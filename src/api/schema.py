@@ -0,0 +1,138 @@
+import os
+import threading
+from pathlib import Path
+
+import yaml
+from django.conf import settings
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from drf_spectacular.renderers import OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerSplitView
+
+from api import conditional
+
+
+_artifacts = {}
+_artifacts_lock = threading.Lock()
+
+
+def generate_schema():
+    """
+    Return the OpenAPI schema of the API as YAML, the same output as the `spectacular` command.
+    """
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return OpenApiYamlRenderer().render(schema, renderer_context={})
+
+
+def write_schema(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Written aside and renamed, so concurrent readers never see a partial file
+    temporary_path = path.with_name(f'.{path.name}.{os.getpid()}')
+    temporary_path.write_bytes(content)
+    temporary_path.replace(path)
+
+
+class SchemaArtifact:
+    """
+    A generated schema, kept in memory with each of its renderings and their strong ETags.
+    """
+    def __init__(self, content):
+        self.content = content
+        self.schema = yaml.safe_load(content)
+        self.renderings = {}
+
+    def get_rendering(self, renderer):
+        """
+        Return the (content, ETag) pair of the schema rendered by `renderer`.
+        """
+        rendering = self.renderings.get(type(renderer))
+        if rendering is None:
+            if isinstance(renderer, OpenApiYamlRenderer):
+                content = self.content
+            else:
+                content = renderer.render(self.schema, renderer_context={})
+
+            rendering = self.renderings[type(renderer)] = (content, conditional.get_strong_etag(content))
+
+        return rendering
+
+
+def get_schema_artifact():
+    """
+    Return the schema artifact at `settings.API_SCHEMA_PATH`, generating it if the file is missing.
+
+    The file is only read once per process.
+    """
+    path = Path(settings.API_SCHEMA_PATH)
+    artifact = _artifacts.get(path)
+    if artifact is not None:
+        return artifact
+
+    with _artifacts_lock:
+        artifact = _artifacts.get(path)
+        if artifact is not None:
+            return artifact
+
+        try:
+            content = path.read_bytes()
+        except FileNotFoundError:
+            content = generate_schema()
+            try:
+                write_schema(path, content)
+            except OSError:
+                # e.g. a read-only filesystem, the schema is still served from memory
+                pass
+
+        artifact = _artifacts[path] = SchemaArtifact(content)
+
+    return artifact
+
+
+class SchemaArtifactView(SpectacularAPIView):
+    # Serves the schema artifact instead of introspecting every viewset on each request.
+    # Translated (?lang=) and versioned (?version=) schemas are still generated per request
+    def _get_schema_response(self, request):
+        if request.GET.get('lang') or request.GET.get('version') or self.api_version or request.version:
+            return super()._get_schema_response(request)
+
+        renderer = request.accepted_renderer
+        content, etag = get_schema_artifact().get_rendering(renderer)
+
+        response = conditional.get_not_modified_response(request, etag, None)
+        if response is None:
+            # Same Content-Type as a DRF Response rendered by `renderer`
+            content_type = request.accepted_media_type
+            if renderer.charset:
+                content_type = f'{content_type}; charset={renderer.charset}'
+
+            response = HttpResponse(content, content_type=content_type)
+            response['Content-Disposition'] = f'inline; filename="{self._get_filename(request, None)}"'
+
+        conditional.set_validators(response, etag, None)
+        return response
+
+
+class SchemaArtifactSwaggerView(SpectacularSwaggerSplitView):
+    # The Swagger UI page is the same on every request, so it is rendered once.
+    # Its script, carrying the CSRF token, is served apart and still rendered per request
+    page = None
+
+    @extend_schema(exclude=True)
+    def get(self, request, *args, **kwargs):
+        if request.GET:
+            return super().get(request, *args, **kwargs)
+
+        page = type(self).page
+        if page is None:
+            page_response = super().get(request, *args, **kwargs)
+            content = render_to_string(page_response.template_name, page_response.data).encode()
+            page = type(self).page = (content, conditional.get_strong_etag(content))
+
+        content, etag = page
+        response = conditional.get_not_modified_response(request, etag, None) or HttpResponse(content)
+        conditional.set_validators(response, etag, None)
+        return response
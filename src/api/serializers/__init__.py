@@ -1,2 +1,5 @@
-from .appointment import AppointmentSerializer
+from .agenda import AgendaQuerySerializer, AgendaSerializer
+from .appointment import AppointmentSerializer, OptimisticAppointmentSerializer
+from .appointment_bulk import AppointmentBulkItemSerializer
+from .batch_get import AppointmentBatchGetSerializer, BatchGetSerializer, HealthCareWorkerBatchGetSerializer
 from .health_care_worker import HealthCareWorkerSerializer
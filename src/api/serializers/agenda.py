@@ -0,0 +1,28 @@
+from rest_framework import serializers
+
+from api.constants import AGENDA_MAX_DAYS, AGENDA_MAX_DAYS_ERROR_MESSAGE, AGENDA_RANGE_ERROR_MESSAGE
+from .instrumented import TimedSerializerMixin
+
+
+class AgendaQuerySerializer(serializers.Serializer):
+    de = serializers.DateField()
+    ate = serializers.DateField()
+
+    def validate(self, data):
+        if data['de'] > data['ate']:
+            raise serializers.ValidationError(AGENDA_RANGE_ERROR_MESSAGE)
+
+        if (data['ate'] - data['de']).days >= AGENDA_MAX_DAYS:
+            raise serializers.ValidationError(AGENDA_MAX_DAYS_ERROR_MESSAGE.format(max_days=AGENDA_MAX_DAYS))
+
+        return data
+
+
+class AgendaSerializer(TimedSerializerMixin, serializers.Serializer):
+    """
+    Booked and free dates of a health care worker between `de` and `ate`, inclusive.
+    """
+    de = serializers.DateField()
+    ate = serializers.DateField()
+    ocupadas = serializers.ListField(child=serializers.DateField())
+    livres = serializers.ListField(child=serializers.DateField())
@@ -1,13 +1,20 @@
 from datetime import UTC, datetime
 
+from drf_spectacular.utils import extend_schema_serializer
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 from rest_framework.validators import UniqueTogetherValidator
 
 from api.constants import (
+    APPOINTMENT_DATE_CONSTRAINT_NAME,
     APPOINTMENT_DATE_ERROR_MESSAGE,
+    UNIQUE_APPOINTMENT_DATE_HEALTH_CARE_WORKER_CONSTRAINT_NAME,
     UNIQUE_APPOINTMENT_DATE_HEALTH_CARE_WORKER_ERROR_MESSAGE,
 )
 from api.models import Appointment, HealthCareWorker
+from .instrumented import TimedListSerializer, TimedSerializerMixin
+from .integrity import constraint_violations_as_validation_errors
+from .sparse import SparseFieldsetSerializerMixin
 
 
 def build_field_name_mapping() -> tuple[dict[str, str], dict[str, str]]:
@@ -33,12 +40,26 @@ MODEL_TO_SERIALIZER, SERIALIZER_TO_MODEL = build_field_name_mapping()
 del build_field_name_mapping
 
 
+# Same payloads as the serializer validations, for violations caught by the database
+CONSTRAINT_ERRORS = {
+    UNIQUE_APPOINTMENT_DATE_HEALTH_CARE_WORKER_CONSTRAINT_NAME: {
+        api_settings.NON_FIELD_ERRORS_KEY: [UNIQUE_APPOINTMENT_DATE_HEALTH_CARE_WORKER_ERROR_MESSAGE],
+    },
+    APPOINTMENT_DATE_CONSTRAINT_NAME: {
+        'data': [APPOINTMENT_DATE_ERROR_MESSAGE],
+    },
+}
+
+
 class StringSlugRelatedField(serializers.SlugRelatedField):
     def to_representation(self, obj):
         return str(getattr(obj, self.slug_field))
 
 
-class AppointmentSerializer(serializers.ModelSerializer):
+class AppointmentSerializer(TimedSerializerMixin, SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    """
+    Appointment of a health care worker, referred to by `profissional_uuid`.
+    """
     profissional_uuid = StringSlugRelatedField(
         slug_field='uuid',
         queryset=HealthCareWorker.objects.all(),
@@ -48,6 +69,27 @@ class AppointmentSerializer(serializers.ModelSerializer):
     data = serializers.DateField(source='date')
     info = serializers.CharField()
 
+    @staticmethod
+    def setup_eager_loading(queryset, field_names=None):
+        # Only the columns of the serializer fields in `field_names`, all of them by default.
+        # profissional_uuid is read from the joined row instead of one query per appointment,
+        # date by the keyset pagination and modified by the conditional responses of the views
+        if field_names is None:
+            field_names = [*MODEL_TO_SERIALIZER.values(), 'profissional_uuid']
+
+        only = [SERIALIZER_TO_MODEL[field_name] for field_name in field_names if field_name in SERIALIZER_TO_MODEL]
+
+        if 'profissional_uuid' not in field_names:
+            return queryset.select_related(None).only(*only, 'date', 'modified')
+
+        return queryset.select_related('health_care_worker').only(
+            *only,
+            'date',
+            'modified',
+            'health_care_worker',
+            'health_care_worker__uuid',
+        )
+
     def validate_data(self, value):
         if value <= datetime.now(UTC).date():
             raise serializers.ValidationError(APPOINTMENT_DATE_ERROR_MESSAGE)
@@ -67,6 +109,7 @@ class AppointmentSerializer(serializers.ModelSerializer):
         read_only_fields = [
             'uuid',
         ]
+        list_serializer_class = TimedListSerializer
         validators = [
             UniqueTogetherValidator(
                 queryset=Appointment.objects.all(),
@@ -74,3 +117,23 @@ class AppointmentSerializer(serializers.ModelSerializer):
                 message=UNIQUE_APPOINTMENT_DATE_HEALTH_CARE_WORKER_ERROR_MESSAGE,
             )
         ]
+
+
+@extend_schema_serializer(component_name='Appointment')
+class OptimisticAppointmentSerializer(AppointmentSerializer):
+    """
+    Appointment serializer letting the database enforce the (worker, date) uniqueness.
+
+    Instead of the `UniqueTogetherValidator` query before every write, the row is written
+    directly and a constraint violation is reported with the same 400 payload.
+    """
+    class Meta(AppointmentSerializer.Meta):
+        validators = []
+
+    def create(self, validated_data):
+        with constraint_violations_as_validation_errors(CONSTRAINT_ERRORS):
+            return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        with constraint_violations_as_validation_errors(CONSTRAINT_ERRORS):
+            return super().update(instance, validated_data)
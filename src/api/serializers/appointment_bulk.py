@@ -0,0 +1,134 @@
+from django.db import transaction
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from api import summaries
+from api.constants import UNIQUE_APPOINTMENT_DATE_HEALTH_CARE_WORKER_ERROR_MESSAGE
+from api.models import Appointment, HealthCareWorker
+from .appointment import AppointmentSerializer, CONSTRAINT_ERRORS
+from .integrity import constraint_violations_as_validation_errors
+
+
+class AppointmentBulkCreateSerializer(serializers.ListSerializer):
+    """
+    Validate and create a batch of appointments with set-based queries.
+
+    Every item is validated on its own first, without touching the database.
+    Then all `profissional_uuid`s are resolved with one query and all (worker, date)
+    conflicts, both with existing rows and inside the batch, are checked with another one.
+    Errors are reported per item, in the same order and format as a single creation.
+    """
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            self.fail_for_batch('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail_for_batch('empty')
+        if self.max_length is not None and len(data) > self.max_length:
+            self.fail_for_batch('max_length', max_length=self.max_length)
+
+        items = []
+        errors = []
+        for item in data:
+            try:
+                items.append(self.child.run_validation(item))
+                errors.append({})
+            except serializers.ValidationError as exc:
+                items.append(None)
+                errors.append(exc.detail)
+
+        self.resolve_health_care_workers(items, errors)
+        self.check_conflicts(items, errors)
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+        return items
+
+    def fail_for_batch(self, key, **kwargs):
+        # Same shape as the errors raised by ListSerializer.to_internal_value
+        message = self.error_messages[key].format(**kwargs)
+        raise serializers.ValidationError({
+            api_settings.NON_FIELD_ERRORS_KEY: [message],
+        }, code=key)
+
+    def resolve_health_care_workers(self, items, errors):
+        health_care_worker_uuids = {
+            item['profissional_uuid']
+            for item in items
+            if item is not None
+        }
+        health_care_workers = HealthCareWorker.objects.only('uuid').in_bulk(
+            health_care_worker_uuids,
+            field_name='uuid',
+        )
+
+        does_not_exist_message = serializers.SlugRelatedField.default_error_messages['does_not_exist']
+        for index, item in enumerate(items):
+            if item is None:
+                continue
+
+            health_care_worker_uuid = item.pop('profissional_uuid')
+            try:
+                item['health_care_worker'] = health_care_workers[health_care_worker_uuid]
+            except KeyError:
+                items[index] = None
+                errors[index] = {
+                    'profissional_uuid': [
+                        does_not_exist_message.format(slug_name='uuid', value=str(health_care_worker_uuid)),
+                    ],
+                }
+
+    def check_conflicts(self, items, errors):
+        health_care_worker_ids = {item['health_care_worker'].id for item in items if item is not None}
+        dates = {item['date'] for item in items if item is not None}
+
+        # A superset of the conflicting pairs, fetched through the unique (worker, date) index
+        taken = set(
+            Appointment.objects
+            .filter(health_care_worker_id__in=health_care_worker_ids, date__in=dates)
+            .values_list('health_care_worker_id', 'date')
+        )
+
+        for index, item in enumerate(items):
+            if item is None:
+                continue
+
+            key = (item['health_care_worker'].id, item['date'])
+            if key in taken:
+                items[index] = None
+                errors[index] = {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        UNIQUE_APPOINTMENT_DATE_HEALTH_CARE_WORKER_ERROR_MESSAGE,
+                    ],
+                }
+            else:
+                taken.add(key)
+
+    def create(self, validated_data):
+        # bulk_create inserts every batch in a single transaction, and rows written
+        # concurrently after the conflict check are still caught by the database
+        with constraint_violations_as_validation_errors(CONSTRAINT_ERRORS), transaction.atomic(savepoint=False):
+            appointments = Appointment.objects.bulk_create(
+                Appointment(**item)
+                for item in validated_data
+            )
+
+            # bulk_create sends no signals, so the summaries of the batch are recomputed at once
+            health_care_worker_ids = {appointment.health_care_worker_id for appointment in appointments}
+            summaries.refresh(HealthCareWorker.objects.filter(pk__in=health_care_worker_ids))
+            summaries.invalidate_cache(health_care_worker_ids)
+
+        return appointments
+
+
+class AppointmentBulkItemSerializer(AppointmentSerializer):
+    """
+    Appointment of a bulk creation, validated together with the others of the batch.
+    """
+    # Resolved for the whole batch by AppointmentBulkCreateSerializer instead of one query per item
+    profissional_uuid = serializers.UUIDField()
+
+    class Meta(AppointmentSerializer.Meta):
+        # Uniqueness is checked for the whole batch by AppointmentBulkCreateSerializer
+        validators = []
+        list_serializer_class = AppointmentBulkCreateSerializer
@@ -0,0 +1,24 @@
+from rest_framework import serializers
+
+from api.constants import BATCH_GET_MAX_LENGTH
+from .appointment import OptimisticAppointmentSerializer
+from .health_care_worker import HealthCareWorkerSerializer
+
+
+class BatchGetSerializer(serializers.Serializer):
+    uuids = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False,
+        max_length=BATCH_GET_MAX_LENGTH,
+    )
+
+
+# Responses of the batch-get actions, only used to describe them in the schema
+class HealthCareWorkerBatchGetSerializer(serializers.Serializer):
+    data = HealthCareWorkerSerializer(many=True)
+    nao_encontrados = serializers.ListField(child=serializers.UUIDField())
+
+
+class AppointmentBatchGetSerializer(serializers.Serializer):
+    data = OptimisticAppointmentSerializer(many=True)
+    nao_encontrados = serializers.ListField(child=serializers.UUIDField())
@@ -0,0 +1,174 @@
+from datetime import date
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connection, models
+from django.db.models.functions import Cast
+from rest_framework import serializers
+from rest_framework.settings import ISO_8601, api_settings
+
+from api import instrumentation
+
+
+class NotCompilableError(Exception):
+    pass
+
+
+def get_lookup(field):
+    """
+    Translate a serializer field `source` into a `values_list()` lookup.
+    """
+    if field.source == '*':
+        raise NotCompilableError(f'Field {field.field_name!r} reads the whole instance')
+
+    lookup = '__'.join(field.source_attrs)
+
+    if isinstance(field, serializers.SlugRelatedField):
+        lookup = f'{lookup}__{field.slug_field}'
+    elif isinstance(field, serializers.RelatedField):
+        raise NotCompilableError(f'Field {field.field_name!r} is a relation without a slug')
+
+    return lookup
+
+
+def get_model_field(model, lookup):
+    *relation_names, field_name = lookup.split('__')
+
+    try:
+        for relation_name in relation_names:
+            model = model._meta.get_field(relation_name).related_model
+
+        return model._meta.get_field(field_name)
+    except (AttributeError, FieldDoesNotExist):
+        raise NotCompilableError(f'Lookup {lookup!r} is not a model field')
+
+
+def is_represented_as_text(field):
+    field_class = type(field)
+
+    if isinstance(field, serializers.SlugRelatedField):
+        # StringSlugRelatedField and similar relations represent the slug as text
+        return field_class.to_representation is not serializers.SlugRelatedField.to_representation
+
+    if field_class.to_representation is serializers.UUIDField.to_representation:
+        return field.uuid_format == 'hex_verbose'
+
+    return field_class.to_representation is serializers.CharField.to_representation
+
+
+def plan_field(field, lookup, model):
+    """
+    Return the `values_list()` expression and the converter producing `field.to_representation` output.
+
+    A `None` converter means the database value is already the representation.
+    Only untouched DRF implementations are specialized, anything else falls back to the field itself.
+    """
+    model_field = get_model_field(model, lookup)
+
+    if is_represented_as_text(field):
+        if isinstance(model_field, models.UUIDField) and connection.vendor == 'postgresql':
+            # PostgreSQL renders uuid as text in the same canonical form as str(uuid.UUID)
+            return Cast(lookup, output_field=models.TextField()), None
+        if isinstance(model_field, (models.CharField, models.TextField)):
+            return lookup, None
+        return lookup, str
+
+    if isinstance(field, serializers.SlugRelatedField):
+        return lookup, None
+
+    if type(field).to_representation is serializers.DateField.to_representation:
+        output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+        if output_format is not None and output_format.lower() == ISO_8601:
+            return lookup, date.isoformat
+
+    return lookup, field.to_representation
+
+
+def build_row_function(field_names, converters):
+    """
+    Return the function building an output dict from a row.
+
+    The dict is zipped from the field names and the row, and only the values with a converter are replaced.
+    """
+    converted = [
+        (field_name, converter)
+        for field_name, converter in zip(field_names, converters)
+        if converter is not None
+    ]
+
+    def to_representation(row):
+        data = dict(zip(field_names, row))
+        for field_name, converter in converted:
+            value = data[field_name]
+            if value is not None:
+                data[field_name] = converter(value)
+        return data
+
+    return to_representation
+
+
+class CompiledRepresentation:
+    """
+    Read path turning `values_list()` rows into the dicts a serializer would output.
+
+    `ModelSerializer.to_representation` resolves every field and its `source` for every row.
+    Here that work is done once per field set, leaving a dict and the converted values per row.
+    """
+    def __init__(self, fields, model):
+        field_names = []
+        lookups = []
+        expressions = []
+        converters = []
+
+        for field in fields:
+            if field.write_only:
+                continue
+
+            lookup = get_lookup(field)
+            expression, converter = plan_field(field, lookup, model)
+            field_names.append(field.field_name)
+            lookups.append(lookup)
+            expressions.append(expression)
+            converters.append(converter)
+
+        if not field_names:
+            raise NotCompilableError('There are no readable fields')
+
+        self.field_names = tuple(field_names)
+        self.lookups = tuple(lookups)
+        self.expressions = tuple(expressions)
+        self.converters = tuple(converters)
+        self.to_representation = build_row_function(self.field_names, self.converters)
+
+    def to_representation_many(self, rows):
+        to_representation = self.to_representation
+        with instrumentation.timed(instrumentation.SERIALIZER):
+            return [to_representation(row) for row in rows]
+
+    def values_list(self, queryset):
+        return queryset.values_list(*self.expressions)
+
+
+_compiled_representations = {}
+
+
+def compile_representation(serializer):
+    """
+    Return the compiled read path for a model serializer instance, or `None` if it can't be compiled.
+
+    Results are cached per serializer class and set of field names.
+    """
+    fields = serializer.fields
+    key = (type(serializer), tuple(fields))
+
+    try:
+        return _compiled_representations[key]
+    except KeyError:
+        pass
+
+    try:
+        compiled = CompiledRepresentation(fields.values(), serializer.Meta.model)
+    except NotCompilableError:
+        compiled = None
+
+    _compiled_representations[key] = compiled
+    return compiled
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 
 from api.models import HealthCareWorker
+from .instrumented import TimedListSerializer, TimedSerializerMixin
+from .sparse import SparseFieldsetSerializerMixin
 
 
 def build_field_name_mapping() -> tuple[dict[str, str], dict[str, str]]:
@@ -29,7 +31,17 @@ MODEL_TO_SERIALIZER, SERIALIZER_TO_MODEL = build_field_name_mapping()
 del build_field_name_mapping
 
 
-class HealthCareWorkerSerializer(serializers.ModelSerializer):
+# Fields only returned when asked for, see HealthCareWorkerSerializer.optional_fields
+OPTIONAL_SERIALIZER_TO_MODEL = {
+    'total_consultas': 'upcoming_appointments',
+    'proxima_consulta': 'next_appointment_date',
+}
+
+
+class HealthCareWorkerSerializer(TimedSerializerMixin, SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    """
+    Health care worker, with the summary of its appointments as optional fields.
+    """
     nome_legal = serializers.CharField(source='legal_name')
     nome_social = serializers.CharField(source='preferred_name', allow_blank=True)
     pronomes = serializers.CharField(source='pronouns')
@@ -38,6 +50,31 @@ class HealthCareWorkerSerializer(serializers.ModelSerializer):
 
     especializacao = serializers.CharField(source='specialization')
 
+    # Appointments from today on, see api.summaries, only returned when asked for with `?fields=`
+    total_consultas = serializers.IntegerField(
+        source='upcoming_appointments',
+        read_only=True,
+        help_text='Somente com ?fields=total_consultas',
+    )
+    proxima_consulta = serializers.DateField(
+        source='next_appointment_date',
+        read_only=True,
+        allow_null=True,
+        help_text='Somente com ?fields=proxima_consulta',
+    )
+
+    optional_fields = ('total_consultas', 'proxima_consulta')
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, field_names=None):
+        # Only the columns of the serializer fields in `field_names`, the default ones by default,
+        # and modified, read by the conditional responses of the views
+        if field_names is None:
+            field_names = cls.get_default_field_names()
+
+        lookups = SERIALIZER_TO_MODEL | OPTIONAL_SERIALIZER_TO_MODEL
+        return queryset.only(*(lookups[field_name] for field_name in field_names), 'modified')
+
     class Meta:
         model = HealthCareWorker
         fields = [
@@ -47,10 +84,15 @@ class HealthCareWorkerSerializer(serializers.ModelSerializer):
             'pronomes',
             'data_de_nascimento',
             'especializacao',
+            'total_consultas',
+            'proxima_consulta',
             # 'id',  # we only use id internally - all external interactions use uuid
             # 'created',  # timestamp internal metadata
             # 'modified',  # timestamp internal metadata
         ]
         read_only_fields = [
             'uuid',
+            'total_consultas',
+            'proxima_consulta',
         ]
+        list_serializer_class = TimedListSerializer
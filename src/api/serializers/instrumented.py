@@ -0,0 +1,27 @@
+from rest_framework import serializers
+
+from api import instrumentation
+
+
+class TimedListSerializer(serializers.ListSerializer):
+    """
+    Time `data` as the serializer phase of the current request, see api.instrumentation.
+
+    Only `data` is timed, which is read once per response, so many=True adds no per item overhead.
+    """
+    @property
+    def data(self):
+        with instrumentation.timed(instrumentation.SERIALIZER):
+            return super().data
+
+
+class TimedSerializerMixin:
+    """
+    Time `data` as the serializer phase of the current request, see api.instrumentation.
+
+    Set `list_serializer_class = TimedListSerializer` in Meta for many=True serializers.
+    """
+    @property
+    def data(self):
+        with instrumentation.timed(instrumentation.SERIALIZER):
+            return super().data
@@ -0,0 +1,72 @@
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+
+
+def get_violated_constraint_name(exc, constraint_names):
+    """
+    Return which of `constraint_names` an `IntegrityError` was raised for, if any.
+    """
+    diag = getattr(exc.__cause__, 'diag', None)
+    constraint_name = getattr(diag, 'constraint_name', None)
+
+    if constraint_name in constraint_names:
+        return constraint_name
+
+    # Partitions name their unique constraints after those of the partitioned table, see api.partitions
+    for name in constraint_names:
+        if constraint_name is not None and constraint_name.startswith(f'{name}_'):
+            return name
+
+    # Backends without diagnostics (e.g. SQLite) only name some constraints in the message
+    message = str(exc)
+    for constraint_name in constraint_names:
+        if constraint_name in message:
+            return constraint_name
+
+    return None
+
+
+@contextmanager
+def constraint_violations_as_validation_errors(errors_by_constraint_name, using=None):
+    """
+    Turn database constraint violations into validation errors.
+
+    This allows writing optimistically, letting the database enforce a constraint
+    instead of checking it with an extra query, which could also race with concurrent writes.
+
+    A savepoint is only created when already inside a transaction, so the surrounding
+    transaction survives the violation. In autocommit mode the failed statement is its own
+    transaction and no extra round trip is needed.
+    """
+    connection = transaction.get_connection(using)
+    savepoint = transaction.atomic(using=using) if connection.in_atomic_block else nullcontext()
+
+    try:
+        with savepoint:
+            yield
+    except IntegrityError as exc:
+        raise_as_validation_error(exc, errors_by_constraint_name)
+
+
+@asynccontextmanager
+async def aconstraint_violations_as_validation_errors(errors_by_constraint_name):
+    """
+    Async counterpart of `constraint_violations_as_validation_errors`.
+
+    Django has no async transactions, so the async ORM runs in autocommit mode
+    and the failed statement never needs a savepoint.
+    """
+    try:
+        yield
+    except IntegrityError as exc:
+        raise_as_validation_error(exc, errors_by_constraint_name)
+
+
+def raise_as_validation_error(exc, errors_by_constraint_name):
+    constraint_name = get_violated_constraint_name(exc, errors_by_constraint_name)
+    if constraint_name is None:
+        raise exc
+
+    raise serializers.ValidationError(errors_by_constraint_name[constraint_name]) from exc
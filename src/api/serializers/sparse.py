@@ -0,0 +1,19 @@
+class SparseFieldsetSerializerMixin:
+    """
+    Leave out every field not named in `fields`, as asked with `?fields=` and `?omit=`, see api.views.EagerLoadingMixin.
+
+    The compiled read path of api.serializers.compiled is planned per set of fields, so it narrows along.
+    Fields in `optional_fields` are only returned by the views when asked for, see `get_default_field_names`.
+    """
+    optional_fields = ()
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+    @classmethod
+    def get_default_field_names(cls):
+        return [field_name for field_name in cls.Meta.fields if field_name not in cls.optional_fields]
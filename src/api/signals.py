@@ -0,0 +1,53 @@
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api import summaries
+from api.cache import HEALTH_CARE_WORKERS_CACHE_NAMESPACE, invalidate
+from api.instrumentation import install_query_recorder
+from api.models import Appointment, HealthCareWorker
+
+
+@receiver(post_save, sender=HealthCareWorker)
+@receiver(post_delete, sender=HealthCareWorker)
+def invalidate_health_care_worker_cache(sender, instance, **kwargs):
+    # After commit, so a concurrent request can't cache the previous state again meanwhile
+    transaction.on_commit(
+        partial(invalidate, HEALTH_CARE_WORKERS_CACHE_NAMESPACE, instance.uuid),
+        using=kwargs.get('using'),
+    )
+
+
+# Deletions are counted by AppointmentsViewSet.perform_destroy, as a post_delete receiver would keep Django
+# from deleting the appointments of a deleted health care worker in bulk
+@receiver(post_save, sender=Appointment)
+def update_appointment_summary(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    previous_key = getattr(instance, '_loaded_summary_key', None)
+    key = instance._loaded_summary_key = (instance.health_care_worker_id, instance.date)
+    health_care_worker_ids = {instance.health_care_worker_id}
+
+    if created:
+        summaries.add_appointments(instance.health_care_worker_id, [instance.date])
+    elif previous_key is None or None in previous_key:
+        # Not loaded with both fields, so its previous state is unknown
+        summaries.refresh(HealthCareWorker.objects.filter(pk=instance.health_care_worker_id))
+    elif previous_key != key:
+        previous_health_care_worker_id, previous_date = previous_key
+        summaries.remove_appointment(previous_health_care_worker_id, previous_date)
+        summaries.add_appointments(instance.health_care_worker_id, [instance.date])
+        health_care_worker_ids.add(previous_health_care_worker_id)
+    else:
+        return
+
+    summaries.invalidate_cache(health_care_worker_ids)
+
+
+if settings.API_INSTRUMENTATION:
+    connection_created.connect(install_query_recorder, dispatch_uid='api.instrumentation')
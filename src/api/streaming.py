@@ -0,0 +1,66 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def iter_rendered_list(queryset, serialize, render, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield the `{"data": [...]}` envelope for a queryset, one rendered chunk at a time.
+
+    Rows are read through a server-side cursor and each chunk is serialized and rendered on its own,
+    so memory usage is bound by `chunk_size` instead of the queryset size.
+    The concatenated output is the same as rendering `{"data": serialize(queryset)}` at once.
+    """
+    opening, closing = render({'data': []}).split(b'[]')
+    yield opening + b'['
+
+    separator = b''
+    chunk = []
+    for instance in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(instance)
+        if len(chunk) < chunk_size:
+            continue
+
+        yield separator + render(serialize(chunk))[1:-1]
+        separator = b','
+        chunk = []
+
+    if chunk:
+        yield separator + render(serialize(chunk))[1:-1]
+
+    yield b']' + closing
+
+
+def aiter_rendered_list(queryset, serialize, render, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Async counterpart of `iter_rendered_list`, stepped with `aiter_sync`.
+
+    Each chunk is read, serialized and rendered off the event loop, rather than read with `aiterator()`,
+    which on Django 4.2 runs the query of `values_list()` querysets in the event loop thread.
+    """
+    return aiter_sync(iter_rendered_list(queryset, serialize, render, chunk_size=chunk_size))
+
+
+async def aiter_sync(iterator):
+    """
+    Consume a sync iterator from async code without loading it into memory.
+
+    Django's ASGI handler would otherwise call `list()` on sync streaming content.
+    Every step runs in the same thread-sensitive executor, so the database cursor
+    behind the iterator is always used from the thread that opened it.
+    """
+    sentinel = object()
+    next_item = sync_to_async(next, thread_sensitive=True)
+
+    while (item := await next_item(iterator, sentinel)) is not sentinel:
+        yield item
+
+
+def streaming_json_response(request, content):
+    if isinstance(request, ASGIRequest):
+        content = aiter_sync(iter(content))
+
+    return StreamingHttpResponse(content, content_type='application/json')
@@ -0,0 +1,124 @@
+"""
+Appointment summaries of health care workers: how many appointments they have from today on and the date
+of the next one, kept in `HealthCareWorker.upcoming_appointments` and `HealthCareWorker.next_appointment_date`
+so that listing health care workers needs no aggregate over appointments.
+
+Summaries are updated incrementally as appointments are written, by api.signals on save, by
+`AppointmentsViewSet.perform_destroy` and by the bulk creation, and recomputed from the appointments by
+`refresh`. Appointments become past without any write as days go by, so a summary whose next appointment
+date has passed is recomputed by the next incremental update, and the `refresh_appointment_summaries`
+command recomputes the others, meant to run daily.
+
+Every update sets `modified`, which the conditional responses of health care workers are derived from.
+"""
+from django.db import transaction
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from api import cache
+from api.models import Appointment, HealthCareWorker
+
+
+def get_summary_expressions(today):
+    """
+    Return the expressions recomputing the summary fields of each health care worker from its appointments.
+
+    Both subqueries read the unique (health_care_worker, date) index only.
+    """
+    upcoming = Appointment.objects.filter(health_care_worker=OuterRef('pk'), date__gte=today).order_by()
+
+    return {
+        'upcoming_appointments': Coalesce(
+            Subquery(upcoming.values('health_care_worker').annotate(count=Count('pk')).values('count')),
+            0,
+        ),
+        'next_appointment_date': Subquery(upcoming.order_by('date').values('date')[:1]),
+    }
+
+
+def add_appointments(health_care_worker_id, dates, today=None):
+    """
+    Count new appointments of a health care worker in its summary.
+    """
+    today = today or timezone.localdate()
+    dates = [date for date in dates if date >= today]
+    if not dates:
+        return
+
+    first_date = min(dates)
+    summary = get_summary_expressions(today)
+    outdated = Q(next_appointment_date__lt=today)
+
+    HealthCareWorker.objects.filter(pk=health_care_worker_id).update(
+        upcoming_appointments=Case(
+            When(outdated, then=summary['upcoming_appointments']),
+            default=F('upcoming_appointments') + len(dates),
+        ),
+        next_appointment_date=Case(
+            When(outdated, then=summary['next_appointment_date']),
+            When(
+                Q(next_appointment_date__isnull=True) | Q(next_appointment_date__gt=first_date),
+                then=Value(first_date),
+            ),
+            default=F('next_appointment_date'),
+        ),
+        modified=timezone.now(),
+    )
+
+
+def remove_appointment(health_care_worker_id, date, today=None):
+    """
+    Discount a deleted appointment of a health care worker from its summary.
+
+    Only the removal of the next appointment looks for the one after it. A count already at zero means the
+    summary missed appointments written without the API, so it is recomputed rather than going negative.
+    """
+    today = today or timezone.localdate()
+    if date < today:
+        return
+
+    summary = get_summary_expressions(today)
+    outdated = Q(next_appointment_date__lt=today) | Q(upcoming_appointments=0)
+
+    HealthCareWorker.objects.filter(pk=health_care_worker_id).update(
+        upcoming_appointments=Case(
+            When(outdated, then=summary['upcoming_appointments']),
+            default=F('upcoming_appointments') - 1,
+        ),
+        next_appointment_date=Case(
+            When(outdated | Q(next_appointment_date=date), then=summary['next_appointment_date']),
+            default=F('next_appointment_date'),
+        ),
+        modified=timezone.now(),
+    )
+
+
+def refresh(queryset=None, today=None):
+    """
+    Recompute the summaries of the health care workers in `queryset`, all of them by default.
+
+    Return how many were updated.
+    """
+    if queryset is None:
+        queryset = HealthCareWorker.objects.all()
+
+    return queryset.update(**get_summary_expressions(today or timezone.localdate()), modified=timezone.now())
+
+
+def invalidate_cache(health_care_worker_ids):
+    """
+    Drop the cached responses of health care workers whose summary changed, once the transaction commits.
+    """
+    if cache.get_api_cache() is None:
+        return
+
+    health_care_worker_uuids = list(
+        HealthCareWorker.objects.filter(pk__in=health_care_worker_ids).values_list('uuid', flat=True),
+    )
+
+    def invalidate():
+        for health_care_worker_uuid in health_care_worker_uuids:
+            cache.invalidate(cache.HEALTH_CARE_WORKERS_CACHE_NAMESPACE, health_care_worker_uuid)
+
+    transaction.on_commit(invalidate)
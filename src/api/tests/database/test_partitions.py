@@ -0,0 +1,170 @@
+from datetime import date
+
+from django.db import IntegrityError, connection, transaction
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from api import partitions
+from api.constants import UNIQUE_APPOINTMENT_DATE_HEALTH_CARE_WORKER_ERROR_MESSAGE
+from api.models import Appointment
+from api.tests.models.factories import AppointmentFactory, HealthCareWorkerFactory
+
+
+MONTH = date(2137, 1, 1)
+
+
+class AppointmentPartitionsTestCase(APITestCase):
+    def setUp(self):
+        self.health_care_worker = HealthCareWorkerFactory()
+        self.appointment = AppointmentFactory(health_care_worker=self.health_care_worker, date=date(2137, 1, 15))
+        self.other_appointment = AppointmentFactory(health_care_worker=self.health_care_worker, date=date(2137, 2, 15))
+
+        # Partitioned with the appointments above, tests run in a transaction that undoes it
+        partitions.partition(connection)
+
+    def count_rows(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM {connection.ops.quote_name(table)}')
+            return cursor.fetchone()[0]
+
+    def get_foreign_keys(self, table):
+        with connection.cursor() as cursor:
+            return [
+                name
+                for name, constraint_type, _, _ in partitions.get_constraints(cursor, table)
+                if constraint_type == 'f'
+            ]
+
+    def test_partition(self):
+        self.assertTrue(partitions.is_partitioned(connection))
+        self.assertEqual(
+            set(Appointment.objects.values_list('pk', 'uuid')),
+            {(self.appointment.pk, self.appointment.uuid), (self.other_appointment.pk, self.other_appointment.uuid)},
+        )
+
+        current_month = partitions.get_partitions(connection)[0][1]
+        self.assertEqual(current_month, timezone.localdate().replace(day=1))
+        self.assertEqual(
+            [name for name, _, _ in partitions.get_partitions(connection)],
+            [
+                partitions.get_partition_name(partitions.add_months(current_month, number))
+                for number in range(partitions.MONTHS_AHEAD + 1)
+            ]
+            + [partitions.get_partition_name(MONTH), partitions.get_partition_name(date(2137, 2, 1))],
+        )
+
+        # The identity column goes on after the copied rows
+        appointment = AppointmentFactory(health_care_worker=self.health_care_worker, date=date(2137, 3, 15))
+        self.assertGreater(appointment.pk, self.other_appointment.pk)
+
+    def test_create_partition_moves_rows_out_of_the_default_partition(self):
+        appointment = AppointmentFactory(health_care_worker=self.health_care_worker, date=date(2137, 3, 15))
+        self.assertEqual(self.count_rows(partitions.DEFAULT_PARTITION), 1)
+
+        partitions.create_partition(connection, date(2137, 3, 1))
+
+        self.assertEqual(self.count_rows(partitions.DEFAULT_PARTITION), 0)
+        self.assertEqual(self.count_rows('api_appointment_p2137_03'), 1)
+        self.assertEqual(Appointment.objects.get(date=date(2137, 3, 15)), appointment)
+
+    def test_create_partitions(self):
+        today = date(2137, 1, 20)
+
+        self.assertEqual(
+            partitions.create_partitions(connection, months_ahead=3, today=today),
+            ['api_appointment_p2137_03', 'api_appointment_p2137_04'],
+        )
+        self.assertEqual(partitions.create_partitions(connection, months_ahead=3, today=today), [])
+
+    def test_date_filters_only_scan_the_partitions_of_their_range(self):
+        plan = Appointment.objects.filter(date__gte=MONTH, date__lt=date(2137, 2, 1)).explain()
+
+        self.assertIn('api_appointment_p2137_01', plan)
+        self.assertNotIn('api_appointment_p2137_02', plan)
+        self.assertNotIn(partitions.DEFAULT_PARTITION, plan)
+
+    def test_partitions_name_indexes_after_the_table(self):
+        with connection.cursor() as cursor:
+            constraint_names = [name for name, _, _, _ in partitions.get_constraints(cursor, 'api_appointment_p2137_01')]
+
+        self.assertIn('unique_appointment_date_health_care_worker_p2137_01', constraint_names)
+        self.assertIn('api_appointment_pkey_p2137_01', constraint_names)
+
+    def test_unique_violations_are_validation_errors(self):
+        response = self.client.post(
+            reverse('api:appointments-list'),
+            {
+                'profissional_uuid': str(self.health_care_worker.uuid),
+                'data': self.appointment.date.isoformat(),
+                'info': 'Conflito',
+            },
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'non_field_errors': [UNIQUE_APPOINTMENT_DATE_HEALTH_CARE_WORKER_ERROR_MESSAGE]})
+
+    def assertUuidTaken(self, uuid, date_):
+        with self.assertRaisesMessage(IntegrityError, f'{partitions.UUID_TABLE}_pkey'), transaction.atomic():
+            AppointmentFactory(health_care_worker=self.health_care_worker, uuid=uuid, date=date_)
+
+    def test_uuids_stay_unique_across_partitions(self):
+        self.assertEqual(self.count_rows(partitions.UUID_TABLE), 2)
+
+        # Unlike (uuid, date), a uuid in use is taken in every month
+        self.assertUuidTaken(self.appointment.uuid, date(2137, 3, 15))
+        self.assertUuidTaken(self.appointment.uuid, date(2137, 1, 16))
+
+    def test_uuids_follow_rows_between_partitions(self):
+        self.appointment.date = date(2137, 2, 20)
+        self.appointment.save()
+        self.assertEqual(self.count_rows('api_appointment_p2137_02'), 2)
+        self.assertUuidTaken(self.appointment.uuid, date(2137, 1, 15))
+
+        self.other_appointment.delete()
+        appointment = AppointmentFactory(
+            health_care_worker=self.health_care_worker,
+            uuid=self.other_appointment.uuid,
+            date=date(2137, 3, 15),
+        )
+        self.assertEqual(Appointment.objects.get(uuid=self.other_appointment.uuid), appointment)
+        self.assertEqual(self.count_rows(partitions.UUID_TABLE), 2)
+
+    def test_detach_partitions(self):
+        detached = partitions.detach_partitions(connection, date(2137, 2, 1))
+
+        self.assertEqual(detached[-1], 'api_appointment_p2137_01')
+        self.assertNotIn('api_appointment_p2137_02', detached)
+        self.assertEqual(list(Appointment.objects.all()), [self.other_appointment])
+
+        # Kept as an archive table, without foreign keys
+        self.assertEqual(self.count_rows('api_appointment_p2137_01'), 1)
+        self.assertEqual(self.get_foreign_keys('api_appointment_p2137_01'), [])
+        self.assertUuidTaken(self.appointment.uuid, date(2137, 3, 15))
+
+    def test_detach_and_drop_partitions(self):
+        partitions.detach_partitions(connection, date(2137, 2, 1), drop=True)
+
+        self.assertNotIn('api_appointment_p2137_01', connection.introspection.table_names())
+        self.assertEqual(list(Appointment.objects.all()), [self.other_appointment])
+        # Free again
+        AppointmentFactory(
+            health_care_worker=self.health_care_worker,
+            uuid=self.appointment.uuid,
+            date=date(2137, 3, 15),
+        )
+
+    def test_unpartition(self):
+        partitions.unpartition(connection)
+
+        self.assertFalse(partitions.is_partitioned(connection))
+        self.assertEqual(Appointment.objects.count(), 2)
+        self.assertNotIn(partitions.DEFAULT_PARTITION, connection.introspection.table_names())
+        self.assertNotIn(partitions.UUID_TABLE, connection.introspection.table_names())
+
+        with connection.cursor() as cursor:
+            constraints = {name: columns for name, _, columns, _ in partitions.get_constraints(cursor, partitions.TABLE)}
+        self.assertEqual(constraints['api_appointment_pkey'], ['id'])
+        self.assertEqual(constraints['api_appointment_uuid_key'], ['uuid'])
+        self.assertEqual(len(self.get_foreign_keys(partitions.TABLE)), 1)
@@ -0,0 +1,66 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db import OperationalError, connection
+from django.test import TestCase
+
+from saude_drf.db.backends.postgresql_pool.base import DatabaseWrapper, get_pool_stats
+
+
+POOL_ALIAS = 'pooled'
+
+
+class PoolBackendTestCase(TestCase):
+    # The pooled connections are separate from the default one and its test transaction
+    def get_wrapper(self, **pool_options):
+        settings_dict = {
+            **connection.settings_dict,
+            'ENGINE': 'saude_drf.db.backends.postgresql_pool',
+            'CONN_MAX_AGE': 0,
+            'OPTIONS': {**connection.settings_dict['OPTIONS'], 'pool': {'min_size': 0, **pool_options}},
+        }
+        wrapper = DatabaseWrapper(settings_dict, alias=POOL_ALIAS)
+        self.addCleanup(wrapper.close_pool)
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def get_backend_pid(self, wrapper):
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT pg_backend_pid()')
+            return cursor.fetchone()[0]
+
+    def test_closed_connection_is_reused(self):
+        wrapper = self.get_wrapper(max_size=1)
+
+        backend_pid = self.get_backend_pid(wrapper)
+        wrapper.close()
+
+        self.assertEqual(self.get_backend_pid(wrapper), backend_pid)
+        stats = get_pool_stats()[POOL_ALIAS]
+        self.assertEqual(stats['pool_max'], 1)
+        self.assertEqual(stats['connections_num'], 1)
+
+    def test_connections_are_bound_by_max_size(self):
+        wrapper = self.get_wrapper(max_size=1, timeout=0.1)
+        other_wrapper = self.get_wrapper()
+        self.get_backend_pid(wrapper)
+
+        with self.assertRaises(OperationalError):
+            self.get_backend_pid(other_wrapper)
+
+        wrapper.close()
+        self.get_backend_pid(other_wrapper)
+
+    def test_open_transaction_is_rolled_back_on_close(self):
+        wrapper = self.get_wrapper(max_size=1)
+        wrapper.set_autocommit(False)
+        with wrapper.cursor() as cursor:
+            cursor.execute('CREATE TEMPORARY TABLE pooled_rollback (id int)')
+        with self.assertLogs('psycopg.pool', 'WARNING'):
+            wrapper.close()
+
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT to_regclass('pooled_rollback')")
+            self.assertIsNone(cursor.fetchone()[0])
+
+    def test_fail_for_persistent_connections(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, 'CONN_MAX_AGE = 0'):
+            DatabaseWrapper({**connection.settings_dict, 'CONN_MAX_AGE': 600}, alias=POOL_ALIAS)
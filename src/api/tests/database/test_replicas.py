@@ -0,0 +1,206 @@
+import time
+from unittest import mock, skipUnless
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections, router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.models import Appointment, HealthCareWorker
+from api.tests.models.factories import AppointmentFactory
+from saude_drf.db.replicas import PIN_COOKIE, ReplicaMiddleware, ReplicaRouter
+
+
+REPLICAS = ['replica0', 'replica1']
+# A database of its own added by saude_drf.test_settings
+REPLICA_TEST_ALIAS = 'replica_test'
+
+
+@override_settings(
+    DATABASE_REPLICAS=REPLICAS,
+    DATABASE_ROUTERS=['saude_drf.db.replicas.ReplicaRouter'],
+    DATABASE_REPLICA_PIN_SECONDS=5,
+)
+class ReplicaRoutingTestCase(TestCase):
+    def setUp(self):
+        self.request_factory = RequestFactory()
+        # Tests run in a transaction, whose reads always stay on the primary
+        patcher = mock.patch.object(connection, 'in_atomic_block', False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_read_aliases(self, request):
+        read_aliases = []
+
+        def get_response(request):
+            read_aliases.append(router.db_for_read(Appointment))
+            read_aliases.append(router.db_for_read(HealthCareWorker))
+            return HttpResponse()
+
+        response = ReplicaMiddleware(get_response)(request)
+        return read_aliases, response
+
+    def test_safe_requests_read_from_a_replica(self):
+        for method in ('get', 'head', 'options'):
+            with self.subTest(method=method):
+                read_aliases, response = self.get_read_aliases(getattr(self.request_factory, method)('/api/'))
+
+                self.assertIn(read_aliases[0], REPLICAS)
+                # The same replica for the whole request
+                self.assertEqual(read_aliases[1], read_aliases[0])
+                self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_writes_pin_the_primary(self):
+        for method in ('post', 'put', 'patch', 'delete'):
+            with self.subTest(method=method):
+                read_aliases, response = self.get_read_aliases(getattr(self.request_factory, method)('/api/'))
+
+                self.assertEqual(read_aliases, [DEFAULT_DB_ALIAS, DEFAULT_DB_ALIAS])
+                cookie = response.cookies[PIN_COOKIE]
+                self.assertEqual(cookie['max-age'], 5)
+                self.assertAlmostEqual(float(cookie.value), time.time() + 5, delta=1)
+
+    def test_pinned_clients_read_from_the_primary(self):
+        for cookie, expected_aliases in (
+            (f'{time.time() + 5}', [DEFAULT_DB_ALIAS]),
+            (f'{time.time() - 5}', REPLICAS),
+            ('invalid', REPLICAS),
+        ):
+            with self.subTest(cookie=cookie):
+                request = self.request_factory.get('/api/')
+                request.COOKIES[PIN_COOKIE] = cookie
+
+                read_aliases, response = self.get_read_aliases(request)
+
+                self.assertIn(read_aliases[0], expected_aliases)
+
+    async def test_async_requests(self):
+        async def get_response(request):
+            return HttpResponse(router.db_for_read(Appointment))
+
+        middleware = ReplicaMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+
+        response = await middleware(self.request_factory.get('/api/'))
+        self.assertIn(response.content.decode(), REPLICAS)
+
+        response = await middleware(self.request_factory.post('/api/'))
+        self.assertEqual(response.content.decode(), DEFAULT_DB_ALIAS)
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+    def test_primary_outside_of_requests_and_transactions(self):
+        self.assertEqual(router.db_for_read(Appointment), DEFAULT_DB_ALIAS)
+        self.assertEqual(router.db_for_write(Appointment), DEFAULT_DB_ALIAS)
+
+        def get_response(request):
+            with mock.patch.object(connection, 'in_atomic_block', True):
+                return HttpResponse(router.db_for_read(Appointment))
+
+        response = ReplicaMiddleware(get_response)(self.request_factory.get('/api/'))
+        self.assertEqual(response.content.decode(), DEFAULT_DB_ALIAS)
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS)
+class ReplicaRouterTestCase(SimpleTestCase):
+    def test_replicas_are_not_migrated(self):
+        self.assertIsNone(ReplicaRouter().allow_migrate(DEFAULT_DB_ALIAS, 'api'))
+        for alias in REPLICAS:
+            self.assertFalse(ReplicaRouter().allow_migrate(alias, 'api'))
+
+
+@skipUnless(REPLICA_TEST_ALIAS in settings.DATABASES, 'The replica test database comes with saude_drf.test_settings')
+@override_settings(
+    DATABASE_REPLICAS=[REPLICA_TEST_ALIAS],
+    DATABASE_ROUTERS=['saude_drf.db.replicas.ReplicaRouter'],
+    MIDDLEWARE=['saude_drf.db.replicas.ReplicaMiddleware', *settings.MIDDLEWARE],
+)
+class ReplicaDatabaseTestCase(TransactionTestCase):
+    # Replication to the replica test database is done by hand.
+    # Only configured aliases, as the databases of skipped tests are set up too
+    databases = {DEFAULT_DB_ALIAS, REPLICA_TEST_ALIAS} & settings.DATABASES.keys()
+
+    def setUp(self):
+        self.appointment = AppointmentFactory(info='Consulta')
+        self.replicate()
+
+    def replicate(self):
+        # Without signals, which would write to the primary
+        HealthCareWorker.objects.using(REPLICA_TEST_ALIAS).bulk_create([self.appointment.health_care_worker])
+        Appointment.objects.using(REPLICA_TEST_ALIAS).bulk_create([self.appointment])
+
+    def test_reads_go_to_the_replica(self):
+        Appointment.objects.filter(pk=self.appointment.pk).update(info='Ainda não replicada')
+
+        with CaptureQueriesContext(connection) as primary_queries:
+            response = self.client.get(reverse('api:appointments-detail', args=[self.appointment.uuid]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['info'], 'Consulta')
+        self.assertEqual(len(primary_queries), 0)
+
+    def test_clients_read_their_writes(self):
+        url = reverse('api:appointments-detail', args=[self.appointment.uuid])
+
+        response = self.client.patch(url, {'info': 'Retorno'}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+        # The writer has the pin cookie, others read the replica that has not caught up yet
+        self.assertEqual(self.client.get(url).json()['info'], 'Retorno')
+        self.assertEqual(self.client_class().get(url).json()['info'], 'Consulta')
+
+    def test_agenda_reads_go_to_the_replica(self):
+        url = reverse('api:health-care-workers-agenda', args=[self.appointment.health_care_worker.uuid])
+        data = {'de': self.appointment.date.isoformat(), 'ate': self.appointment.date.isoformat()}
+        Appointment.objects.filter(pk=self.appointment.pk).delete()
+
+        with CaptureQueriesContext(connection) as primary_queries, \
+                CaptureQueriesContext(connections[REPLICA_TEST_ALIAS]) as replica_queries:
+            response = self.client.get(url, data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['ocupadas'], [self.appointment.date.isoformat()])
+        self.assertEqual(len(primary_queries), 0)
+        self.assertGreater(len(replica_queries), 0)
+
+        # Pinned clients read the agenda from the primary
+        self.client.cookies[PIN_COOKIE] = f'{time.time() + 5}'
+        response = self.client.get(url, data)
+        self.assertEqual(response.json()['ocupadas'], [])
+
+
+@skipUnless(settings.DATABASE_REPLICAS, 'Reads are only routed with DATABASE_REPLICA_URLS set')
+class ReplicaReadsTestCase(TransactionTestCase):
+    # The replicas are test mirrors of the default database, whose rows must be committed to be seen by them
+    databases = '__all__'
+
+    def setUp(self):
+        self.appointment = AppointmentFactory()
+
+    def test_reads_your_writes(self):
+        replica = connections[settings.DATABASE_REPLICAS[0]]
+
+        with mock.patch('saude_drf.db.replicas.random.choice', return_value=replica.alias), \
+                CaptureQueriesContext(connection) as primary_queries, \
+                CaptureQueriesContext(replica) as replica_queries:
+            response = self.client.get(reverse('api:appointments-list'))
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(primary_queries), 0)
+            self.assertGreater(len(replica_queries), 0)
+
+            response = self.client.patch(
+                reverse('api:appointments-detail', args=[self.appointment.uuid]),
+                {'info': 'Retorno'},
+                content_type='application/json',
+            )
+            self.assertEqual(response.status_code, 200)
+            replica_query_count = len(replica_queries)
+
+            # The client has the pin cookie now
+            response = self.client.get(reverse('api:appointments-detail', args=[self.appointment.uuid]))
+
+            self.assertEqual(response.json()['info'], 'Retorno')
+            self.assertEqual(len(replica_queries), replica_query_count)
@@ -0,0 +1,45 @@
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from api.constants import APPOINTMENT_DATE_ID_INDEX_NAME
+from api.tests.models.factories import AppointmentFactory
+
+
+class ExplainQueriesCommandTestCase(TestCase):
+    def setUp(self):
+        AppointmentFactory.create_batch(3)
+
+    def call_command(self, **options):
+        stdout = StringIO()
+        call_command('explain_queries', min_rows=0, stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def test_every_query_can_use_an_index(self):
+        output = self.call_command(disable_seqscan=True)
+
+        # Or its partitions, see api.partitions
+        self.assertRegex(output, rf'Index Scan on api_appointment(_\w+)? using {APPOINTMENT_DATE_ID_INDEX_NAME}')
+        self.assertNotIn('Seq Scan', output)
+
+    def test_sequential_scan_fails(self):
+        # Scanning a handful of rows is cheaper than using an index, and no table is too small with min_rows=0
+        with self.assertRaisesMessage(CommandError, 'Seq Scan on api_'):
+            self.call_command()
+
+    @override_settings(
+        DATABASE_REPLICAS=['replica0'],
+        DATABASE_ROUTERS=['saude_drf.db.replicas.ReplicaRouter'],
+        MIDDLEWARE=['saude_drf.db.replicas.ReplicaMiddleware', *settings.MIDDLEWARE],
+    )
+    def test_reads_stay_on_the_primary_with_replicas(self):
+        # Tests run in a transaction, whose reads always stay on the primary.
+        # replica0 is not configured, so a read routed to it would fail
+        with mock.patch.object(connection, 'in_atomic_block', False):
+            output = self.call_command(disable_seqscan=True)
+
+        self.assertRegex(output, rf'Index Scan on api_appointment(_\w+)? using {APPOINTMENT_DATE_ID_INDEX_NAME}')
@@ -0,0 +1,81 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from api import partitions
+
+
+class PartitionAppointmentsCommandTestCase(TestCase):
+    def setUp(self):
+        self.current_month = timezone.localdate().replace(day=1)
+
+    def call_command(self, *args):
+        stdout = StringIO()
+        call_command('partition_appointments', *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_regular_table_requires_convert(self):
+        with self.assertRaisesMessage(CommandError, 'The appointments table is not partitioned'):
+            self.call_command()
+
+        self.assertFalse(partitions.is_partitioned(connection))
+
+    def test_convert(self):
+        output = self.call_command('--convert', '--months-ahead', str(partitions.MONTHS_AHEAD + 1))
+
+        self.assertTrue(partitions.is_partitioned(connection))
+        self.assertIn('Partitioned api_appointment', output)
+        month = partitions.add_months(self.current_month, partitions.MONTHS_AHEAD + 1)
+        self.assertIn(f'Created partition {partitions.get_partition_name(month)}', output)
+        self.assertIn('Appointment partitions are up to date', output)
+
+        self.assertNotIn('Created partition', self.call_command('--months-ahead', str(partitions.MONTHS_AHEAD + 1)))
+
+    def test_revert(self):
+        partitions.partition(connection)
+
+        output = self.call_command('--revert')
+
+        self.assertFalse(partitions.is_partitioned(connection))
+        self.assertIn('Unpartitioned api_appointment', output)
+        self.assertNotIn('Unpartitioned', self.call_command('--revert'))
+
+    def test_detach_before(self):
+        partitions.partition(connection)
+        later_month = partitions.add_months(self.current_month, 2)
+
+        # Months only become past as time goes by
+        with mock.patch('django.utils.timezone.localdate', return_value=later_month):
+            output = self.call_command('--detach-before', later_month.isoformat())
+
+        self.assertIn(f'Detached partition {partitions.get_partition_name(self.current_month)}', output)
+        self.assertIn(
+            f'Detached partition {partitions.get_partition_name(partitions.add_months(self.current_month, 1))}',
+            output,
+        )
+        self.assertEqual(partitions.get_partitions(connection)[0][1], later_month)
+        self.assertIn(partitions.get_partition_name(self.current_month), connection.introspection.table_names())
+
+    def test_detach_before_and_drop(self):
+        partitions.partition(connection)
+        later_month = partitions.add_months(self.current_month, 1)
+
+        with mock.patch('django.utils.timezone.localdate', return_value=later_month):
+            output = self.call_command('--detach-before', later_month.isoformat(), '--drop')
+
+        self.assertIn(f'Dropped partition {partitions.get_partition_name(self.current_month)}', output)
+        self.assertNotIn(partitions.get_partition_name(self.current_month), connection.introspection.table_names())
+
+    def test_invalid_options(self):
+        partitions.partition(connection)
+        next_month = partitions.add_months(self.current_month, 1)
+
+        with self.assertRaisesMessage(CommandError, 'Only partitions of past months can be detached'):
+            self.call_command('--detach-before', next_month.isoformat())
+
+        with self.assertRaisesMessage(CommandError, '--drop requires --detach-before'):
+            self.call_command('--drop')
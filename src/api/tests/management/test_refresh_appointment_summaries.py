@@ -0,0 +1,50 @@
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from api.models import HealthCareWorker
+from api.tests.models.factories import AppointmentFactory, HealthCareWorkerFactory
+
+
+FIRST_DATE = date(2137, 1, 1)
+
+
+class RefreshAppointmentSummariesCommandTestCase(TestCase):
+    def setUp(self):
+        self.health_care_worker, self.other_health_care_worker = HealthCareWorkerFactory.create_batch(2)
+        for health_care_worker, days in (
+            (self.health_care_worker, 10),
+            (self.health_care_worker, 20),
+            (self.other_health_care_worker, 30),
+        ):
+            AppointmentFactory(health_care_worker=health_care_worker, date=FIRST_DATE + timedelta(days=days))
+
+    def call_command(self, *args):
+        stdout = StringIO()
+        call_command('refresh_appointment_summaries', *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_refresh_outdated_summaries(self):
+        self.assertIn('Refreshed 0 appointment summaries', self.call_command())
+
+        with mock.patch('django.utils.timezone.localdate', return_value=FIRST_DATE + timedelta(days=15)):
+            output = self.call_command()
+
+        self.assertIn('Refreshed 1 appointment summaries', output)
+        self.health_care_worker.refresh_from_db()
+        self.assertEqual(self.health_care_worker.upcoming_appointments, 1)
+        self.assertEqual(self.health_care_worker.next_appointment_date, FIRST_DATE + timedelta(days=20))
+
+    def test_refresh_all(self):
+        HealthCareWorker.objects.update(upcoming_appointments=0, next_appointment_date=None)
+
+        output = self.call_command('--all')
+
+        self.assertIn('Refreshed 2 appointment summaries', output)
+        self.assertEqual(
+            list(HealthCareWorker.objects.order_by('id').values_list('upcoming_appointments', 'next_appointment_date')),
+            [(2, FIRST_DATE + timedelta(days=10)), (1, FIRST_DATE + timedelta(days=30))],
+        )
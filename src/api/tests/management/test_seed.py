@@ -0,0 +1,83 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db.models import Count
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api import cache
+from api.constants import HEALTH_PRACTITIONERS_AND_PROFESSIONALS, PRONOUNS
+from api.models import Appointment, HealthCareWorker
+from api.tests.models.factories import HealthCareWorkerFactory
+
+
+class SeedCommandTestCase(TestCase):
+    def call_command(self, **options):
+        stdout = StringIO()
+        call_command('seed', stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def test_seed(self):
+        existing_health_care_worker = HealthCareWorkerFactory()
+
+        output = self.call_command(workers=5, appointments_per_worker=7, days=10, batch_size=3, random_seed=1)
+
+        self.assertIn('Seeded 5 health care workers and 35 appointments', output)
+
+        health_care_workers = HealthCareWorker.objects.exclude(pk=existing_health_care_worker.pk)
+        self.assertEqual(health_care_workers.count(), 5)
+        self.assertTrue(all(worker.id > existing_health_care_worker.id for worker in health_care_workers))
+        self.assertLessEqual(set(health_care_workers.values_list('pronouns', flat=True)), set(PRONOUNS))
+        self.assertLessEqual(
+            set(health_care_workers.values_list('specialization', flat=True)),
+            set(HEALTH_PRACTITIONERS_AND_PROFESSIONALS),
+        )
+        self.assertEqual({worker.uuid.version for worker in health_care_workers}, {7})
+
+        self.assertEqual(
+            set(
+                Appointment.objects.values('health_care_worker')
+                .annotate(count=Count('date', distinct=True))
+                .values_list('health_care_worker', 'count')
+            ),
+            {(worker.id, 7) for worker in health_care_workers},
+        )
+        self.assertEqual(set(health_care_workers.values_list('upcoming_appointments', flat=True)), {7})
+        for worker in health_care_workers:
+            self.assertEqual(worker.next_appointment_date, min(worker.appointments.values_list('date', flat=True)))
+
+        tomorrow = timezone.now().date() + timedelta(days=1)
+        for appointment_date in Appointment.objects.values_list('date', flat=True):
+            self.assertGreaterEqual(appointment_date, tomorrow)
+            self.assertLess(appointment_date, tomorrow + timedelta(days=10))
+
+        # New rows get ids after the seeded ones
+        self.assertGreater(HealthCareWorkerFactory().id, max(worker.id for worker in health_care_workers))
+
+    def test_seed_is_reproducible(self):
+        def get_seeded_data():
+            self.call_command(workers=2, appointments_per_worker=3, days=30, random_seed=42)
+            data = (
+                list(HealthCareWorker.objects.order_by('id').values_list('pronouns', 'specialization', 'date_of_birth')),
+                list(Appointment.objects.order_by('id').values_list('date', 'info')),
+            )
+            HealthCareWorker.objects.all().delete()
+            return data
+
+        self.assertEqual(get_seeded_data(), get_seeded_data())
+
+    def test_dates_must_fit(self):
+        with self.assertRaisesMessage(CommandError, '11 distinct dates per worker do not fit in 10 days'):
+            self.call_command(workers=1, appointments_per_worker=11, days=10)
+
+    @override_settings(API_CACHE_ENABLED=True)
+    def test_list_cache_is_invalidated(self):
+        api_cache = cache.get_api_cache()
+        namespace = cache.HEALTH_CARE_WORKERS_CACHE_NAMESPACE
+        generation = cache.get_list_generation(api_cache, namespace)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.call_command(workers=1, appointments_per_worker=1)
+
+        self.assertNotEqual(cache.get_list_generation(api_cache, namespace), generation)
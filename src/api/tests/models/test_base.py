@@ -0,0 +1,68 @@
+import time
+import uuid
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from api.models.base import uuid7
+from api.tests.models.factories import AppointmentFactory, HealthCareWorkerFactory
+
+
+TIMESTAMP_MS = 1_792_000_000_000
+
+
+class UUID7TestCase(SimpleTestCase):
+    def setUp(self):
+        # Forget the UUIDs generated so far, so mocked clocks are not behind them
+        for name, value in (('_uuid7_last_timestamp_ms', None), ('_uuid7_last_counter', 0)):
+            state_patch = mock.patch(f'api.models.base.{name}', value)
+            state_patch.start()
+            self.addCleanup(state_patch.stop)
+
+    def test_uuid7_layout(self):
+        before_ms = time.time_ns() // 1_000_000
+        value = uuid7()
+        after_ms = time.time_ns() // 1_000_000
+
+        self.assertEqual(value.version, 7)
+        self.assertEqual(value.variant, uuid.RFC_4122)
+        self.assertGreaterEqual(value.int >> 80, before_ms)
+        self.assertLessEqual(value.int >> 80, after_ms)
+
+    def test_uuid7_is_strictly_increasing_within_a_millisecond(self):
+        with mock.patch('api.models.base.time.time_ns', return_value=TIMESTAMP_MS * 1_000_000):
+            values = [uuid7() for _ in range(1000)]
+
+        self.assertEqual(values, sorted(set(values)))
+        self.assertEqual({value.int >> 80 for value in values}, {TIMESTAMP_MS})
+
+    def test_uuid7_is_strictly_increasing_when_the_clock_goes_backwards(self):
+        with mock.patch('api.models.base.time.time_ns', return_value=TIMESTAMP_MS * 1_000_000):
+            first = uuid7()
+        with mock.patch('api.models.base.time.time_ns', return_value=(TIMESTAMP_MS - 1000) * 1_000_000):
+            second = uuid7()
+
+        self.assertLess(first, second)
+        self.assertEqual(second.int >> 80, TIMESTAMP_MS)
+
+    def test_uuid7_counter_overflow_advances_the_timestamp(self):
+        with (
+            mock.patch('api.models.base.time.time_ns', return_value=TIMESTAMP_MS * 1_000_000),
+            mock.patch('api.models.base._uuid7_last_timestamp_ms', TIMESTAMP_MS),
+            mock.patch('api.models.base._uuid7_last_counter', 0x3ff_ffff_ffff),
+        ):
+            value = uuid7()
+
+        self.assertEqual(value.int >> 80, TIMESTAMP_MS + 1)
+        self.assertEqual(value.version, 7)
+
+
+class IdUuidModelTestCase(TestCase):
+    def test_uuids_follow_creation_order(self):
+        health_care_workers = HealthCareWorkerFactory.create_batch(3)
+        appointments = AppointmentFactory.create_batch(3, health_care_worker=health_care_workers[0])
+
+        for instances in (health_care_workers, appointments):
+            with self.subTest(model=type(instances[0]).__name__):
+                self.assertEqual([instance.uuid.version for instance in instances], [7, 7, 7])
+                self.assertEqual(sorted(instances, key=lambda instance: instance.uuid), instances)
@@ -0,0 +1,246 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Min
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api import summaries
+from api.cache import get_api_cache
+from api.models import Appointment, HealthCareWorker
+from api.tests.models.factories import AppointmentFactory, HealthCareWorkerFactory
+
+
+FIRST_DATE = date(2137, 1, 1)
+SUMMARY_FIELDS = 'total_consultas,proxima_consulta'
+
+
+class AppointmentSummariesTestCase(APITestCase):
+    def setUp(self):
+        self.health_care_worker, self.other_health_care_worker = HealthCareWorkerFactory.create_batch(2)
+        # Responses are cached with API_CACHE_ENABLED set, and invalidated once transactions commit
+        caches[settings.API_CACHE_ALIAS].clear()
+        self.addCleanup(caches[settings.API_CACHE_ALIAS].clear)
+
+    def assertSummary(self, health_care_worker, upcoming_appointments, next_appointment_date):
+        health_care_worker.refresh_from_db()
+        self.assertEqual(
+            (health_care_worker.upcoming_appointments, health_care_worker.next_appointment_date),
+            (upcoming_appointments, next_appointment_date),
+        )
+
+        # The same as aggregating the appointments
+        aggregate = health_care_worker.appointments.aggregate(count=Count('pk'), next=Min('date'))
+        self.assertEqual((aggregate['count'], aggregate['next']), (upcoming_appointments, next_appointment_date))
+
+    def create_appointment(self, days, health_care_worker=None):
+        return AppointmentFactory(
+            health_care_worker=health_care_worker or self.health_care_worker,
+            date=FIRST_DATE + timedelta(days=days),
+        )
+
+    def test_create(self):
+        self.assertSummary(self.health_care_worker, 0, None)
+
+        self.create_appointment(10)
+        self.assertSummary(self.health_care_worker, 1, FIRST_DATE + timedelta(days=10))
+
+        self.create_appointment(20)
+        self.assertSummary(self.health_care_worker, 2, FIRST_DATE + timedelta(days=10))
+
+        self.create_appointment(5)
+        self.assertSummary(self.health_care_worker, 3, FIRST_DATE + timedelta(days=5))
+        self.assertSummary(self.other_health_care_worker, 0, None)
+
+    def test_update(self):
+        appointment = self.create_appointment(10)
+        self.create_appointment(20)
+
+        appointment = Appointment.objects.get(pk=appointment.pk)
+        appointment.date = FIRST_DATE + timedelta(days=30)
+        appointment.save()
+        self.assertSummary(self.health_care_worker, 2, FIRST_DATE + timedelta(days=20))
+
+        appointment.health_care_worker = self.other_health_care_worker
+        appointment.save()
+        self.assertSummary(self.health_care_worker, 1, FIRST_DATE + timedelta(days=20))
+        self.assertSummary(self.other_health_care_worker, 1, FIRST_DATE + timedelta(days=30))
+
+        # Saves that keep the health care worker and date leave the summaries alone
+        appointment.info = 'Retorno'
+        with self.assertNumQueries(1):
+            appointment.save()
+
+    def test_update_of_an_instance_not_loaded_from_the_database(self):
+        appointment = self.create_appointment(10)
+
+        Appointment(
+            pk=appointment.pk,
+            uuid=appointment.uuid,
+            health_care_worker=self.health_care_worker,
+            date=FIRST_DATE + timedelta(days=15),
+            info='Retorno',
+        ).save()
+
+        self.assertSummary(self.health_care_worker, 1, FIRST_DATE + timedelta(days=15))
+
+    def test_destroy(self):
+        first_appointment = self.create_appointment(10)
+        second_appointment = self.create_appointment(20)
+        self.create_appointment(30)
+
+        response = self.client.delete(reverse('api:appointments-detail', args=[second_appointment.uuid]))
+        self.assertEqual(response.status_code, 204)
+        self.assertSummary(self.health_care_worker, 2, FIRST_DATE + timedelta(days=10))
+
+        response = self.client.delete(reverse('api:appointments-detail', args=[first_appointment.uuid]))
+        self.assertEqual(response.status_code, 204)
+        self.assertSummary(self.health_care_worker, 1, FIRST_DATE + timedelta(days=30))
+
+    def test_destroy_of_an_appointment_missing_from_the_summary(self):
+        appointment = self.create_appointment(10)
+        self.create_appointment(20)
+        # As after appointments written without the API
+        HealthCareWorker.objects.update(upcoming_appointments=0, next_appointment_date=None)
+
+        response = self.client.delete(reverse('api:appointments-detail', args=[appointment.uuid]))
+
+        self.assertEqual(response.status_code, 204)
+        self.assertSummary(self.health_care_worker, 1, FIRST_DATE + timedelta(days=20))
+
+    def test_bulk_create(self):
+        self.create_appointment(10)
+
+        response = self.client.post(
+            reverse('api:appointments-bulk'),
+            [
+                {
+                    'profissional_uuid': str(health_care_worker.uuid),
+                    'data': (FIRST_DATE + timedelta(days=days)).isoformat(),
+                    'info': 'Consulta',
+                }
+                for health_care_worker, days in (
+                    (self.health_care_worker, 5),
+                    (self.health_care_worker, 15),
+                    (self.other_health_care_worker, 15),
+                )
+            ],
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertSummary(self.health_care_worker, 3, FIRST_DATE + timedelta(days=5))
+        self.assertSummary(self.other_health_care_worker, 1, FIRST_DATE + timedelta(days=15))
+
+    def test_past_appointments_are_not_upcoming(self):
+        self.create_appointment(10)
+        self.create_appointment(20)
+
+        # The database only takes future dates, so the days go by instead
+        with mock.patch('api.summaries.timezone.localdate', return_value=FIRST_DATE + timedelta(days=15)):
+            summaries.refresh()
+            self.health_care_worker.refresh_from_db()
+            self.assertEqual(self.health_care_worker.upcoming_appointments, 1)
+            self.assertEqual(self.health_care_worker.next_appointment_date, FIRST_DATE + timedelta(days=20))
+
+        with mock.patch('api.summaries.timezone.localdate', return_value=FIRST_DATE + timedelta(days=25)):
+            # The summary has an outdated next appointment, so it is recomputed
+            self.create_appointment(40)
+            self.health_care_worker.refresh_from_db()
+            self.assertEqual(self.health_care_worker.upcoming_appointments, 1)
+            self.assertEqual(self.health_care_worker.next_appointment_date, FIRST_DATE + timedelta(days=40))
+
+    def test_responses(self):
+        url = reverse('api:health-care-workers-detail', args=[self.health_care_worker.uuid])
+        self.assertNotIn('total_consultas', self.client.get(url).json())
+
+        # Only returned when asked for
+        response = self.client.get(url, {'fields': SUMMARY_FIELDS})
+        self.assertEqual(response.json()['total_consultas'], 0)
+        self.assertIsNone(response.json()['proxima_consulta'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_appointment(10)
+
+        # Summaries set modified, so conditional requests get the new summary too
+        response = self.client.get(url, {'fields': SUMMARY_FIELDS}, HTTP_IF_NONE_MATCH=response.headers['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(reverse('api:health-care-workers-list'), {'fields': SUMMARY_FIELDS})
+        data = {item['uuid']: item for item in response.json()['data']}
+        self.assertEqual(data[str(self.health_care_worker.uuid)]['total_consultas'], 1)
+        self.assertEqual(data[str(self.health_care_worker.uuid)]['proxima_consulta'], '2137-01-11')
+
+    @override_settings(API_CACHE_ENABLED=True)
+    def test_cached_responses_are_invalidated(self):
+        url = reverse('api:health-care-workers-list')
+        self.client.get(url, {'fields': SUMMARY_FIELDS})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_appointment(10)
+
+        response = self.client.get(url, {'fields': SUMMARY_FIELDS})
+        self.assertEqual(response.headers['X-Cache'], 'MISS')
+        data = {item['uuid']: item for item in response.json()['data']}
+        self.assertEqual(data[str(self.health_care_worker.uuid)]['total_consultas'], 1)
+
+    def test_refresh(self):
+        self.create_appointment(10)
+        HealthCareWorker.objects.update(upcoming_appointments=5, next_appointment_date=None)
+
+        self.assertEqual(summaries.refresh(), 2)
+
+        self.assertSummary(self.health_care_worker, 1, FIRST_DATE + timedelta(days=10))
+        self.assertSummary(self.other_health_care_worker, 0, None)
+
+
+@override_settings(API_CACHE_ENABLED=True)
+class AppointmentSummariesCacheTestCase(APITestCase):
+    def setUp(self):
+        self.health_care_worker, self.other_health_care_worker = HealthCareWorkerFactory.create_batch(2)
+        self.appointment = AppointmentFactory(health_care_worker=self.health_care_worker, date=FIRST_DATE)
+        get_api_cache().clear()
+        self.addCleanup(get_api_cache().clear)
+
+    def get_summaries(self):
+        # Detail responses with sparse fieldsets are not cached, listings are
+        response = self.client.get(reverse('api:health-care-workers-list'), {'fields': SUMMARY_FIELDS})
+        totals = {item['uuid']: item['total_consultas'] for item in response.json()['data']}
+        return (
+            response.headers['X-Cache'],
+            totals[str(self.health_care_worker.uuid)],
+            totals[str(self.other_health_care_worker.uuid)],
+        )
+
+    def test_writes_invalidate_the_cached_summaries(self):
+        appointment_url = reverse('api:appointments-detail', args=[self.appointment.uuid])
+        self.assertEqual(self.get_summaries(), ('MISS', 1, 0))
+        self.assertEqual(self.get_summaries(), ('HIT', 1, 0))
+
+        # Moved to another health care worker, both summaries change
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                appointment_url,
+                {'profissional_uuid': str(self.other_health_care_worker.uuid)},
+                format='json',
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_summaries(), ('MISS', 0, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('api:appointments-bulk'),
+                [{'profissional_uuid': str(self.health_care_worker.uuid), 'data': '2137-02-01', 'info': 'Lote'}],
+                format='json',
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.get_summaries(), ('MISS', 1, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(appointment_url)
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.get_summaries(), ('MISS', 1, 0))
+        self.assertEqual(self.get_summaries(), ('HIT', 1, 0))
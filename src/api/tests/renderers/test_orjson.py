@@ -0,0 +1,140 @@
+import uuid
+from collections import OrderedDict
+from datetime import UTC, date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from api.parsers import ORJSONParser
+from api.renderers import ORJSONRenderer
+from api.tests.models.factories import AppointmentFactory, HealthCareWorkerFactory
+from api.tests.views.test_appointments_viewset import get_streaming_content
+
+
+GOLDEN_DATA = [
+    None,
+    [],
+    {},
+    {'uuid': uuid.UUID('01234567-89ab-cdef-0123-456789abcdef')},
+    {'date': date(2137, 1, 1), 'time': time(12, 30, 15, 123456)},
+    {'datetime': datetime(2137, 1, 1, 12, 30, 15, 123456, tzinfo=UTC)},
+    {'datetime': datetime(2137, 1, 1, 12, 30, 15, tzinfo=timezone(timedelta(hours=-3)))},
+    {'naive_datetime': datetime(2137, 1, 1, 12, 30)},
+    {'timedelta': timedelta(days=1, seconds=1)},
+    {'decimal': Decimal('1.10')},
+    {'nested': OrderedDict(a=ReturnList([ReturnDict(b=(1, 2), serializer=None)], serializer=None))},
+    {'errors': [ErrorDetail('Campo obrigatório.', code='required')]},
+    {'lazy': gettext_lazy('This field is required.')},
+    {'unicode': 'Informação, ✓, 🩺, \u2028 and \u2029, "quoted" \\ and \n'},
+    {1: 'int key', True: 'bool key', None: 'null key'},
+    {'big': 2 ** 64, 'negative': -2 ** 63, 'bool': False},
+    {'bytes': b'bytes', 'set': {1}},
+]
+
+
+class ORJSONRendererTestCase(TestCase):
+    def assertSameRendering(self, data, accepted_media_type=None):
+        self.assertEqual(
+            ORJSONRenderer().render(data, accepted_media_type),
+            JSONRenderer().render(data, accepted_media_type),
+        )
+
+    def test_golden_data(self):
+        for data in GOLDEN_DATA:
+            with self.subTest(data=data):
+                self.assertSameRendering(data)
+
+    def test_indented(self):
+        self.assertSameRendering(GOLDEN_DATA[5], 'application/json; indent=4')
+
+    def test_without_orjson(self):
+        with mock.patch('api.renderers.orjson', None):
+            for data in GOLDEN_DATA:
+                with self.subTest(data=data):
+                    self.assertSameRendering(data)
+
+    # The DRF views, whatever API_ASYNC_VIEWS says, as only they negotiate the renderer.
+    # The async views are compared against them in api.tests.views.test_async_views
+    @override_settings(ROOT_URLCONF='saude_drf.urls')
+    def test_golden_responses(self):
+        appointments = AppointmentFactory.create_batch(3, info='Informação ✓')
+        health_care_worker = HealthCareWorkerFactory(legal_name='Nome Legal \u2028', specialization='Clínica')
+
+        for url, data in (
+            (reverse('api:appointments-list'), None),
+            (reverse('api:appointments-list'), {'page_size': 2}),
+            (reverse('api:appointments-list'), {'profissional_uuid': 'not-a-uuid'}),
+            (reverse('api:appointments-detail', args=[appointments[0].uuid]), None),
+            (reverse('api:health-care-workers-list'), None),
+            (reverse('api:health-care-workers-detail', args=[health_care_worker.uuid]), None),
+            (
+                reverse('api:health-care-workers-agenda', args=[health_care_worker.uuid]),
+                {'de': '2137-01-01', 'ate': '2137-01-31'},
+            ),
+            (reverse('api:health-care-workers-detail', args=[uuid.uuid4()]), None),
+        ):
+            with self.subTest(url=url, data=data):
+                response = self.client.get(url, data)
+
+                self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
+                self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_golden_streamed_response(self):
+        AppointmentFactory.create_batch(3, info='Informação ✓')
+        url = reverse('api:appointments-list')
+
+        response = self.client.get(url, {'stream': 'true'})
+        expected_content = JSONRenderer().render(self.client.get(url).json())
+
+        self.assertEqual(get_streaming_content(response), expected_content)
+
+
+class ORJSONParserTestCase(TestCase):
+    def parse(self, parser_class, content, encoding='utf-8'):
+        try:
+            return parser_class().parse(BytesIO(content), parser_context={'encoding': encoding})
+        except ParseError as exc:
+            return exc.detail
+
+    def test_golden_bodies(self):
+        for content in (
+            b'{"profissional_uuid": "01234567-89ab-cdef-0123-456789abcdef", "data": "2137-01-01"}',
+            '{"info": "Informação ✓ \\u00e7"}'.encode(),
+            b'[1, 1.5, 1e400, -0.0, 18446744073709551616, true, null]',
+            b'"\\ud800"',
+            b'{"a": NaN}',
+            b'{"a": 1, "a": 2}',
+            b'\xef\xbb\xbf{}',
+            b'{"a": ',
+            b'\xff',
+        ):
+            with self.subTest(content=content):
+                self.assertEqual(self.parse(ORJSONParser, content), self.parse(JSONParser, content))
+
+    def test_other_encodings(self):
+        content = '{"info": "Informação"}'.encode('latin-1')
+
+        self.assertEqual(
+            self.parse(ORJSONParser, content, encoding='latin-1'),
+            self.parse(JSONParser, content, encoding='latin-1'),
+        )
+
+    def test_create_appointment(self):
+        health_care_worker = HealthCareWorkerFactory()
+
+        response = self.client.post(
+            reverse('api:appointments-list'),
+            {'profissional_uuid': str(health_care_worker.uuid), 'data': '2137-01-01', 'info': 'Informação'},
+            content_type='application/json',
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['info'], 'Informação')
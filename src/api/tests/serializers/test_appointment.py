@@ -2,14 +2,17 @@ import uuid
 from datetime import UTC, datetime
 
 import factory
+from django.db import connection
 from django.db.utils import IntegrityError
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
 
 from api.constants import (
     APPOINTMENT_DATE_ERROR_MESSAGE,
     UNIQUE_APPOINTMENT_DATE_HEALTH_CARE_WORKER_ERROR_MESSAGE,
 )
-from api.serializers import AppointmentSerializer
+from api.serializers import AppointmentSerializer, OptimisticAppointmentSerializer
 from api.serializers.appointment import MODEL_TO_SERIALIZER, SERIALIZER_TO_MODEL
 from api.tests.models.factories import AppointmentFactory, HealthCareWorkerFactory
 
@@ -181,3 +184,75 @@ class AppointmentSerializerTestCase(TestCase):
             appointment.uuid,
             uuid.UUID(serializer.data['uuid']),
         )
+
+
+class OptimisticAppointmentSerializerTestCase(TestCase):
+    def setUp(self):
+        self.existing_appointment = AppointmentFactory()
+        self.health_care_worker = self.existing_appointment.health_care_worker
+
+    def test_appointment_is_validated_without_querying_appointments(self):
+        serializer_data = {
+            'profissional_uuid': str(self.health_care_worker.uuid),
+            'data': self.existing_appointment.date.isoformat(),
+            'info': 'Conflicting appointment',
+        }
+
+        serializer = OptimisticAppointmentSerializer(data=serializer_data)
+        with CaptureQueriesContext(connection) as context:
+            self.assertTrue(serializer.is_valid())
+
+        # Only the health care worker lookup for profissional_uuid
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertNotIn('api_appointment', context.captured_queries[0]['sql'])
+
+    def test_appointment_cannot_be_created_for_existing_date_and_health_care_worker_combinatation(self):
+        serializer_data = {
+            'profissional_uuid': str(self.health_care_worker.uuid),
+            'data': self.existing_appointment.date.isoformat(),
+            'info': 'Conflicting appointment',
+        }
+
+        serializer = OptimisticAppointmentSerializer(data=serializer_data)
+        self.assertTrue(serializer.is_valid())
+
+        with self.assertRaises(serializers.ValidationError) as context:
+            serializer.save()
+
+        self.assertEqual(
+            context.exception.detail,
+            {
+                'non_field_errors': [
+                    UNIQUE_APPOINTMENT_DATE_HEALTH_CARE_WORKER_ERROR_MESSAGE,
+                ],
+            },
+        )
+        self.assertIsInstance(context.exception.__cause__, IntegrityError)
+
+    def test_appointment_cannot_be_updated_for_existing_date_and_health_care_worker_combinatation(self):
+        appointment = AppointmentFactory(health_care_worker=self.health_care_worker)
+
+        serializer = OptimisticAppointmentSerializer(
+            appointment,
+            data={
+                'data': self.existing_appointment.date.isoformat(),
+            },
+            partial=True,
+        )
+        self.assertTrue(serializer.is_valid())
+
+        with self.assertRaises(serializers.ValidationError) as context:
+            serializer.save()
+
+        self.assertEqual(
+            context.exception.detail,
+            {
+                'non_field_errors': [
+                    UNIQUE_APPOINTMENT_DATE_HEALTH_CARE_WORKER_ERROR_MESSAGE,
+                ],
+            },
+        )
+
+        # The surrounding transaction is still usable
+        appointment.refresh_from_db()
+        self.assertNotEqual(appointment.date, self.existing_appointment.date)
@@ -0,0 +1,74 @@
+from django.test import TestCase
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from api.models import Appointment, HealthCareWorker
+from api.serializers import AppointmentSerializer, HealthCareWorkerSerializer
+from api.serializers import appointment, health_care_worker
+from api.serializers.compiled import compile_representation
+from api.tests.models.factories import AppointmentFactory, HealthCareWorkerFactory
+
+
+class CompiledRepresentationTestCase(TestCase):
+    def setUp(self):
+        self.health_care_workers = [
+            HealthCareWorkerFactory(preferred_name=''),
+            HealthCareWorkerFactory(legal_name='João Ñandú "Ação" \\ 😀'),
+        ]
+        AppointmentFactory.create_batch(3, health_care_worker=self.health_care_workers[0])
+        AppointmentFactory(health_care_worker=self.health_care_workers[1], info='Informação\nem duas linhas')
+
+    def test_health_care_worker_lookups_match_field_name_mapping(self):
+        compiled = compile_representation(HealthCareWorkerSerializer())
+        lookups = health_care_worker.SERIALIZER_TO_MODEL | health_care_worker.OPTIONAL_SERIALIZER_TO_MODEL
+
+        self.assertEqual(compiled.field_names, tuple(HealthCareWorkerSerializer.Meta.fields))
+        self.assertEqual(compiled.lookups, tuple(lookups[field_name] for field_name in compiled.field_names))
+
+    def test_appointment_lookups_match_field_name_mapping(self):
+        compiled = compile_representation(AppointmentSerializer())
+
+        self.assertEqual(compiled.field_names, tuple(AppointmentSerializer.Meta.fields))
+        self.assertEqual(
+            compiled.lookups,
+            tuple(
+                appointment.SERIALIZER_TO_MODEL.get(field_name, 'health_care_worker__uuid')
+                for field_name in compiled.field_names
+            ),
+        )
+
+    def test_health_care_worker_output_is_byte_identical(self):
+        queryset = HealthCareWorker.objects.order_by('id')
+        compiled = compile_representation(HealthCareWorkerSerializer())
+
+        expected = JSONRenderer().render(HealthCareWorkerSerializer(queryset, many=True).data)
+        actual = JSONRenderer().render(compiled.to_representation_many(compiled.values_list(queryset)))
+
+        self.assertEqual(actual, expected)
+
+    def test_appointment_output_is_byte_identical(self):
+        queryset = Appointment.objects.order_by('id')
+        compiled = compile_representation(AppointmentSerializer())
+
+        expected = JSONRenderer().render(AppointmentSerializer(queryset, many=True).data)
+        actual = JSONRenderer().render(compiled.to_representation_many(compiled.values_list(queryset)))
+
+        self.assertEqual(actual, expected)
+
+        row = compiled.values_list(queryset).first()
+        self.assertEqual(
+            JSONRenderer().render(compiled.to_representation(row)),
+            JSONRenderer().render(AppointmentSerializer(queryset.first()).data),
+        )
+
+    def test_serializer_reading_the_whole_instance_is_not_compiled(self):
+        class WithMethodFieldSerializer(HealthCareWorkerSerializer):
+            iniciais = serializers.SerializerMethodField()
+
+            def get_iniciais(self, obj):
+                return obj.legal_name[:1]
+
+            class Meta(HealthCareWorkerSerializer.Meta):
+                fields = HealthCareWorkerSerializer.Meta.fields + ['iniciais']
+
+        self.assertIsNone(compile_representation(WithMethodFieldSerializer()))
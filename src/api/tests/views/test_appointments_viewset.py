@@ -1,14 +1,24 @@
+import time
 from datetime import UTC, date, datetime
+from unittest import mock
 
 import factory
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.http import http_date
 from rest_framework.test import APITestCase
 
 from api.constants import (
     APPOINTMENT_DATE_ERROR_MESSAGE,
     UNIQUE_APPOINTMENT_DATE_HEALTH_CARE_WORKER_ERROR_MESSAGE,
+    UNKNOWN_FIELDS_ERROR_MESSAGE,
 )
 from api.models import Appointment
+from api.serializers import OptimisticAppointmentSerializer
+from api.views import AppointmentsViewSet
 from api.tests.models.factories import AppointmentFactory, HealthCareWorkerFactory
 
 
@@ -17,6 +27,21 @@ INITIAL_APPOINTMENTS_COUNT = 3
 
 CONTENT_TYPE = 'content-type'
 APPLICATION_JSON = 'application/json'
+ETAG = 'etag'
+LAST_MODIFIED = 'last-modified'
+
+
+def get_streaming_content(response):
+    """
+    Return the whole content of a streaming response, also when an async view streams it, as with API_ASYNC_VIEWS.
+    """
+    if response.is_async:
+        async def join():
+            return b''.join([part async for part in response.streaming_content])
+
+        return async_to_sync(join)()
+
+    return b''.join(response.streaming_content)
 
 
 class AppointmentsViewSetTestCase(APITestCase):
@@ -51,6 +76,172 @@ class AppointmentsViewSetTestCase(APITestCase):
 
         self.assertEqual(response_data, expected_response_data)
 
+    def test_bulk_create_appointments(self):
+        other_hcw = HealthCareWorkerFactory()
+        request_data = [
+            {
+                'profissional_uuid': str(self.existing_hcw.uuid),
+                'data': '2137-11-07',
+                'info': 'First of the batch',
+            },
+            {
+                'profissional_uuid': str(other_hcw.uuid),
+                'data': '2137-11-07',
+                'info': 'Same day, another health care worker',
+            },
+            {
+                'profissional_uuid': str(other_hcw.uuid),
+                'data': '2137-11-08',
+                'info': 'Last of the batch',
+            },
+        ]
+
+        url = reverse("api:appointments-bulk")
+        response = self.client.post(url, request_data, format='json')
+        response_data = response.json()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.headers[CONTENT_TYPE], APPLICATION_JSON)
+        self.assertEqual(list(response_data), ['data'])
+        self.assertEqual(
+            [{key: value for key, value in item.items() if key != 'uuid'} for item in response_data['data']],
+            request_data,
+        )
+
+        created = Appointment.objects.in_bulk(
+            [item['uuid'] for item in response_data['data']],
+            field_name='uuid',
+        )
+        self.assertEqual(len(created), len(request_data))
+        self.assertEqual(Appointment.objects.count(), INITIAL_APPOINTMENTS_COUNT + len(request_data))
+
+    # Invalidating the cached responses of the health care workers reads their uuids too
+    @override_settings(API_CACHE_ENABLED=False)
+    def test_bulk_create_appointments_runs_a_constant_number_of_queries(self):
+        health_care_workers = HealthCareWorkerFactory.create_batch(5)
+
+        def build_request_data(count):
+            return [
+                {
+                    'profissional_uuid': str(health_care_workers[index % 5].uuid),
+                    'data': date(year=2137, month=1, day=1 + index // 5).isoformat(),
+                    'info': f'Appointment {index}',
+                }
+                for index in range(count)
+            ]
+
+        url = reverse("api:appointments-bulk")
+        for count in (2, 50):
+            request_data = build_request_data(count)
+            Appointment.objects.filter(date__year=2137).delete()
+
+            # Worker lookup, conflict check, insert, summaries update and the transaction savepoint handling
+            with self.assertNumQueries(6):
+                response = self.client.post(url, request_data, format='json')
+
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(len(response.json()['data']), count)
+
+    def test_fail_bulk_create_appointments_reports_errors_per_item(self):
+        conflicting_instance = self.existing_appointments[-1]
+        non_existing_hcw_uuid = '01234567-89ab-cdef-0123-456789abcdef'
+        request_data = [
+            {
+                'profissional_uuid': str(self.existing_hcw.uuid),
+                'data': '2137-11-07',
+                'info': 'Valid on its own',
+            },
+            {
+                'profissional_uuid': str(conflicting_instance.health_care_worker.uuid),
+                'data': conflicting_instance.date.isoformat(),
+                'info': 'Conflicts with an existing appointment',
+            },
+            {
+                'profissional_uuid': str(self.existing_hcw.uuid),
+                'data': '2010-11-12',
+                'info': 'In the past',
+            },
+            {
+                'profissional_uuid': non_existing_hcw_uuid,
+                'data': '2137-11-07',
+                'info': 'Unknown health care worker',
+            },
+            {
+                'profissional_uuid': str(self.existing_hcw.uuid),
+                'data': '2137-11-07',
+                'info': 'Conflicts with the first item of the batch',
+            },
+        ]
+        expected_response_data = {
+            'data': [
+                {},
+                {
+                    'non_field_errors': [
+                        UNIQUE_APPOINTMENT_DATE_HEALTH_CARE_WORKER_ERROR_MESSAGE,
+                    ],
+                },
+                {
+                    'data': [
+                        APPOINTMENT_DATE_ERROR_MESSAGE,
+                    ],
+                },
+                {
+                    'profissional_uuid': [
+                        f'Object with uuid={non_existing_hcw_uuid} does not exist.',
+                    ],
+                },
+                {
+                    'non_field_errors': [
+                        UNIQUE_APPOINTMENT_DATE_HEALTH_CARE_WORKER_ERROR_MESSAGE,
+                    ],
+                },
+            ],
+        }
+
+        url = reverse("api:appointments-bulk")
+        response = self.client.post(url, request_data, format='json')
+        response_data = response.json()
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.headers[CONTENT_TYPE], APPLICATION_JSON)
+        self.assertEqual(response_data, expected_response_data)
+        # Nothing is created when any of the items is invalid
+        self.assertEqual(Appointment.objects.count(), INITIAL_APPOINTMENTS_COUNT)
+
+    def test_fail_bulk_create_appointments_for_non_list_payload(self):
+        expected_response_data = {
+            'non_field_errors': [
+                'Expected a list of items but got type "dict".',
+            ],
+        }
+
+        url = reverse("api:appointments-bulk")
+        response = self.client.post(url, {'data': []}, format='json')
+        response_data = response.json()
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.headers[CONTENT_TYPE], APPLICATION_JSON)
+        self.assertEqual(response_data, expected_response_data)
+
+    def test_create_appointment_lets_the_database_check_conflicts(self):
+        request_data = {
+            'profissional_uuid': str(self.existing_hcw.uuid),
+            'data': '2137-11-07',
+            'info': 'No conflict check query before the insert',
+        }
+
+        url = reverse("api:appointments-list")
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(url, request_data, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        appointment_selects = [
+            query['sql']
+            for query in context.captured_queries
+            if query['sql'].startswith('SELECT') and 'api_appointment' in query['sql']
+        ]
+        self.assertEqual(appointment_selects, [])
+
     def test_fail_create_appointment_for_existing_date_and_health_care_worker(self):
         conflicting_instance = self.existing_appointments[-1]
         request_data = {
@@ -123,6 +314,328 @@ class AppointmentsViewSetTestCase(APITestCase):
         self.assertEqual(len(response_data['data']), 3)
         self.assertGreater(Appointment.objects.count(), 3)
 
+    def test_list_appointments_filtered_by_date_range(self):
+        AppointmentFactory.create_batch(
+            4,
+            date=factory.Iterator([date(2137, 1, 1), date(2137, 1, 2), date(2137, 1, 31), date(2137, 2, 1)]),
+        )
+
+        url = reverse("api:appointments-list")
+        response = self.client.get(
+            url,
+            data={
+                'data_inicio': '2137-01-02',
+                'data_fim': '2137-01-31',
+            },
+            format='json',
+        )
+        response_data = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['data'] for item in response_data['data']], ['2137-01-02', '2137-01-31'])
+
+    def test_list_appointments_filtered_by_many_profissional_uuids(self):
+        new_hcws = HealthCareWorkerFactory.create_batch(2)
+        AppointmentFactory.create_batch(2, health_care_worker=new_hcws[0])
+        AppointmentFactory(health_care_worker=new_hcws[1])
+
+        url = reverse("api:appointments-list")
+        response = self.client.get(
+            url,
+            data={
+                'profissional_uuid__in': ','.join(str(hcw.uuid) for hcw in new_hcws),
+            },
+            format='json',
+        )
+        response_data = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response_data['data']), 3)
+        self.assertEqual(
+            {item['profissional_uuid'] for item in response_data['data']},
+            {str(hcw.uuid) for hcw in new_hcws},
+        )
+
+    def test_fail_list_appointments_filtered_by_invalid_profissional_uuids(self):
+        url = reverse("api:appointments-list")
+        response = self.client.get(
+            url,
+            data={
+                'profissional_uuid__in': f'{self.existing_hcw.uuid},not-a-uuid',
+            },
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('profissional_uuid__in', response.json())
+
+    def test_list_appointments_filtered_by_especializacao(self):
+        new_hcw = HealthCareWorkerFactory(specialization='Especialização de teste')
+        AppointmentFactory.create_batch(2, health_care_worker=new_hcw)
+
+        url = reverse("api:appointments-list")
+        response = self.client.get(
+            url,
+            data={
+                'especializacao': 'Especialização de teste',
+            },
+            format='json',
+        )
+        response_data = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response_data['data']), 2)
+        self.assertEqual({item['profissional_uuid'] for item in response_data['data']}, {str(new_hcw.uuid)})
+
+    def test_list_appointments_not_modified(self):
+        url = reverse("api:appointments-list")
+        response = self.client.get(url, format='json')
+        etag = response.headers[ETAG]
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(LAST_MODIFIED, response.headers)
+
+        # Only the ETag aggregate runs, nothing is serialized
+        with self.assertNumQueries(1):
+            response = self.client.get(url, format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers[ETAG], etag)
+        self.assertEqual(response.content, b'')
+
+        # ETags depend on the filtered rows only
+        response = self.client.get(
+            url,
+            data={'profissional_uuid': str(self.existing_hcw.uuid)},
+            format='json',
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.existing_appointments[1].delete()
+
+        response = self.client.get(url, format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers[ETAG], etag)
+        self.assertEqual(len(response.json()['data']), INITIAL_APPOINTMENTS_COUNT - 1)
+
+    def test_list_appointments_etag_depends_on_the_representation(self):
+        url = reverse("api:appointments-list")
+        response = self.client.get(url, data={'page_size': 2}, format='json')
+        etag = response.headers[ETAG]
+        next_url = response.json()['next']
+
+        response = self.client.get(url, data={'page_size': 2}, format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # Other pages and fieldsets of the same rows are other representations
+        response = self.client.get(next_url, format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers[ETAG], etag)
+
+        response = self.client.get(url, data={'page_size': 2, 'fields': 'data'}, format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.json()['data'][0]), ['uuid', 'data'])
+
+        response = self.client.get(url, data={'page_size': 3}, format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_appointments_ignore_if_modified_since(self):
+        url = reverse("api:appointments-list")
+        if_modified_since = http_date(time.time() + 60)
+
+        # A deletion leaves the latest modified timestamp as it was, so only the ETag validates listings
+        self.existing_appointments[1].delete()
+
+        response = self.client.get(url, format='json', HTTP_IF_MODIFIED_SINCE=if_modified_since)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['data']), INITIAL_APPOINTMENTS_COUNT - 1)
+
+    def test_detail_appointment_not_modified_since(self):
+        chosen_instance = self.existing_appointments[0]
+        url = reverse("api:appointments-detail", args=[chosen_instance.uuid])
+        response = self.client.get(url, format='json')
+
+        response = self.client.get(url, format='json', HTTP_IF_MODIFIED_SINCE=response.headers[LAST_MODIFIED])
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(url, format='json', HTTP_IF_MODIFIED_SINCE='Thu, 01 Jan 1970 00:00:00 GMT')
+        self.assertEqual(response.status_code, 200)
+
+    def test_detail_appointment_not_modified(self):
+        chosen_instance = self.existing_appointments[0]
+        url = reverse("api:appointments-detail", args=[chosen_instance.uuid])
+        response = self.client.get(url, format='json')
+        etag = response.headers[ETAG]
+
+        with mock.patch.object(OptimisticAppointmentSerializer, 'to_representation') as to_representation:
+            with self.assertNumQueries(1):
+                response = self.client.get(url, format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        to_representation.assert_not_called()
+
+        self.client.patch(url, {'info': 'Nova informação'}, format='json')
+
+        response = self.client.get(url, format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers[ETAG], etag)
+        self.assertEqual(response.json()['info'], 'Nova informação')
+
+    def test_detail_appointment_etag_depends_on_the_fields(self):
+        chosen_instance = self.existing_appointments[0]
+        url = reverse("api:appointments-detail", args=[chosen_instance.uuid])
+        etag = self.client.get(url, format='json').headers[ETAG]
+
+        response = self.client.get(url, data={'fields': 'info'}, format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'uuid': str(chosen_instance.uuid), 'info': chosen_instance.info})
+
+        response = self.client.get(
+            url,
+            data={'fields': 'info'},
+            format='json',
+            HTTP_IF_NONE_MATCH=response.headers[ETAG],
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_list_appointments_runs_a_constant_number_of_queries(self):
+        url = reverse("api:appointments-list")
+
+        # The ETag aggregate and the rows themselves
+        with self.assertNumQueries(2):
+            response = self.client.get(url, format='json')
+        self.assertEqual(len(response.json()['data']), INITIAL_APPOINTMENTS_COUNT)
+
+        AppointmentFactory.create_batch(10)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(url, format='json')
+        self.assertEqual(len(response.json()['data']), INITIAL_APPOINTMENTS_COUNT + 10)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                url,
+                data={
+                    'profissional_uuid': str(self.existing_hcw.uuid),
+                },
+                format='json',
+            )
+        self.assertEqual(len(response.json()['data']), 1)
+
+    def test_list_appointments_streamed(self):
+        AppointmentFactory.create_batch(4)
+
+        url = reverse("api:appointments-list")
+        expected_content = self.client.get(url, format='json').content
+
+        # A small chunk size exercises the chunk boundaries
+        with mock.patch.object(AppointmentsViewSet, 'stream_chunk_size', 3):
+            response = self.client.get(url, data={'stream': 'true'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response.headers[CONTENT_TYPE], APPLICATION_JSON)
+        self.assertEqual(get_streaming_content(response), expected_content)
+
+    def test_list_appointments_streamed_without_rows(self):
+        url = reverse("api:appointments-list")
+        response = self.client.get(
+            url,
+            data={
+                'profissional_uuid': '01234567-89ab-cdef-0123-456789abcdef',
+                'stream': '1',
+            },
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_streaming_content(response), b'{"data":[]}')
+
+    async def test_list_appointments_streamed_under_asgi(self):
+        url = reverse("api:appointments-list")
+        expected_content = (await self.async_client.get(url)).content
+
+        with mock.patch.object(AppointmentsViewSet, 'stream_chunk_size', 2):
+            response = await self.async_client.get(url, data={'stream': 'true'})
+            content = b''.join([part async for part in response.streaming_content])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers[CONTENT_TYPE], APPLICATION_JSON)
+        self.assertEqual(content, expected_content)
+
+    def test_list_appointments_paginated(self):
+        AppointmentFactory.create_batch(4)
+        expected_uuids = [
+            str(uuid_)
+            for uuid_ in Appointment.objects.order_by('date', 'id').values_list('uuid', flat=True)
+        ]
+
+        url = reverse("api:appointments-list")
+        listed_uuids = []
+        next_url = f'{url}?page_size=3'
+        while next_url is not None:
+            response = self.client.get(next_url, format='json')
+            response_data = response.json()
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.headers[CONTENT_TYPE], APPLICATION_JSON)
+            self.assertEqual(list(response_data), ['data', 'next', 'previous'])
+            self.assertLessEqual(len(response_data['data']), 3)
+
+            listed_uuids.extend(item['uuid'] for item in response_data['data'])
+            next_url = response_data['next']
+
+        self.assertEqual(listed_uuids, expected_uuids)
+
+        # Going back from the last page returns the previous one
+        response = self.client.get(response_data['previous'], format='json')
+        response_data = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [item['uuid'] for item in response_data['data']],
+            expected_uuids[3:6],
+        )
+        self.assertIsNotNone(response_data['previous'])
+        self.assertIsNotNone(response_data['next'])
+
+    def test_list_appointments_paginated_and_filtered_by_profissional_uuid(self):
+        new_hcw = HealthCareWorkerFactory()
+        AppointmentFactory.create_batch(3, health_care_worker=new_hcw)
+
+        url = reverse("api:appointments-list")
+        response = self.client.get(
+            url,
+            data={
+                'profissional_uuid': str(new_hcw.uuid),
+                'page_size': 2,
+            },
+            format='json',
+        )
+        response_data = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response_data['data']), 2)
+        self.assertIsNone(response_data['previous'])
+
+        response = self.client.get(response_data['next'], format='json')
+        response_data = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response_data['data']), 1)
+        self.assertEqual(response_data['data'][0]['profissional_uuid'], str(new_hcw.uuid))
+        self.assertIsNone(response_data['next'])
+
+    def test_fail_list_appointments_for_invalid_cursor(self):
+        expected_response_data = {'detail': 'Invalid cursor'}
+
+        url = reverse("api:appointments-list")
+        response = self.client.get(url, data={'cursor': 'not-a-cursor'}, format='json')
+        response_data = response.json()
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.headers[CONTENT_TYPE], APPLICATION_JSON)
+        self.assertEqual(response_data, expected_response_data)
+
     def test_detail_appointment(self):
         chosen_instance = self.existing_appointments[INITIAL_APPOINTMENTS_COUNT-1]
         expected_response_data = {
@@ -140,6 +653,121 @@ class AppointmentsViewSetTestCase(APITestCase):
         self.assertEqual(response.headers[CONTENT_TYPE], APPLICATION_JSON)
         self.assertEqual(response_data, expected_response_data)
 
+    def test_detail_appointment_runs_a_single_query(self):
+        chosen_instance = self.existing_appointments[0]
+
+        url = reverse("api:appointments-detail", args=[chosen_instance.uuid])
+        with self.assertNumQueries(1):
+            response = self.client.get(url, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['profissional_uuid'], str(chosen_instance.health_care_worker.uuid))
+
+    def test_list_appointments_with_sparse_fieldsets(self):
+        url = reverse("api:appointments-list")
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, data={'fields': 'data'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertCountEqual(
+            response.json()['data'],
+            [
+                {'uuid': str(appointment.uuid), 'data': appointment.date.isoformat()}
+                for appointment in self.existing_appointments
+            ],
+        )
+        # Neither the other columns nor the health care workers are read
+        list_sql = context.captured_queries[-1]['sql']
+        self.assertNotIn('"info"', list_sql)
+        self.assertNotIn('JOIN', list_sql)
+
+        response = self.client.get(url, data={'omit': 'info,profissional_uuid', 'page_size': 2}, format='json')
+        response_data = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([list(item) for item in response_data['data']], [['uuid', 'data']] * 2)
+
+        # Pages keep the fields of the query string they are linked from
+        response = self.client.get(response_data['next'], format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([list(item) for item in response.json()['data']], [['uuid', 'data']])
+
+    def test_detail_appointment_with_sparse_fieldsets(self):
+        chosen_instance = self.existing_appointments[0]
+
+        url = reverse("api:appointments-detail", args=[chosen_instance.uuid])
+        with self.assertNumQueries(1):
+            response = self.client.get(url, data={'fields': 'profissional_uuid,info'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {
+                'uuid': str(chosen_instance.uuid),
+                'profissional_uuid': str(chosen_instance.health_care_worker.uuid),
+                'info': chosen_instance.info,
+            },
+        )
+
+    def test_fail_list_appointments_for_unknown_sparse_fieldsets(self):
+        url = reverse("api:appointments-list")
+        response = self.client.get(url, data={'fields': 'data,date', 'omit': 'id'}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'fields': [UNKNOWN_FIELDS_ERROR_MESSAGE.format(field_names='date')]})
+
+        response = self.client.get(url, data={'omit': 'id'}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'omit': [UNKNOWN_FIELDS_ERROR_MESSAGE.format(field_names='id')]})
+
+    def test_batch_get_appointments(self):
+        non_existing_instance_uuid = '01234567-89ab-cdef-0123-456789abcdef'
+        first, second, third = self.existing_appointments
+
+        url = reverse("api:appointments-batch-get")
+        with self.assertNumQueries(1):
+            response = self.client.post(
+                url,
+                {'uuids': [str(third.uuid), non_existing_instance_uuid, str(first.uuid), str(third.uuid)]},
+                format='json',
+            )
+        response_data = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers[CONTENT_TYPE], APPLICATION_JSON)
+        self.assertEqual(
+            response_data,
+            {
+                'data': [
+                    {
+                        'uuid': str(appointment.uuid),
+                        'profissional_uuid': str(appointment.health_care_worker.uuid),
+                        'data': appointment.date.isoformat(),
+                        'info': appointment.info,
+                    }
+                    for appointment in (third, first)
+                ],
+                'nao_encontrados': [non_existing_instance_uuid],
+            },
+        )
+
+    def test_fail_batch_get_appointments_for_invalid_uuids(self):
+        url = reverse("api:appointments-batch-get")
+
+        response = self.client.post(url, {'uuids': ['not-a-uuid']}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.json()), ['uuids'])
+
+        response = self.client.post(url, {'uuids': []}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        # At most BATCH_GET_MAX_LENGTH, even if repeated
+        response = self.client.post(url, {'uuids': [str(self.existing_appointments[0].uuid)] * 1001}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.json()), ['uuids'])
+
     def test_fail_detail_appointment_for_non_existing_instance(self):
         non_existing_instance_uuid = '01234567-89ab-cdef-0123-456789abcdef'
         expected_response_data = {'detail': 'Not found.'}
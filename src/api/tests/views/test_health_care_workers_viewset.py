@@ -1,11 +1,17 @@
-from datetime import UTC, date, datetime
+from datetime import UTC, date, datetime, timedelta
 
 import factory
+from django.conf import settings
+from django.core.cache import caches
+from django.test import override_settings
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APITestCase
 
+from api.cache import HEALTH_CARE_WORKERS_CACHE_NAMESPACE, get_api_cache, stats as cache_stats
+from api.constants import AGENDA_RANGE_ERROR_MESSAGE, UNKNOWN_FIELDS_ERROR_MESSAGE
 from api.models import HealthCareWorker
-from api.tests.models.factories import HealthCareWorkerFactory
+from api.tests.models.factories import AppointmentFactory, HealthCareWorkerFactory
 
 
 INITIAL_HCW_COUNT = 3
@@ -13,11 +19,16 @@ INITIAL_HCW_COUNT = 3
 
 CONTENT_TYPE = 'content-type'
 APPLICATION_JSON = 'application/json'
+X_CACHE = 'x-cache'
+ETAG = 'etag'
 
 
 class HealthCareWorkersViewSetTestCase(APITestCase):
     def setUp(self):
         self.existing_hcw = HealthCareWorkerFactory.create_batch(INITIAL_HCW_COUNT)
+        # Responses are cached with API_CACHE_ENABLED set, and invalidated once transactions commit
+        caches[settings.API_CACHE_ALIAS].clear()
+        self.addCleanup(caches[settings.API_CACHE_ALIAS].clear)
 
     def test_create_health_care_worker(self):
         # Adapted from
@@ -60,6 +71,31 @@ class HealthCareWorkersViewSetTestCase(APITestCase):
         self.assertEqual(list(response_data), ['data'])
         self.assertEqual(len(response_data['data']), len(self.existing_hcw))
 
+    def test_list_health_care_workers_paginated(self):
+        HealthCareWorkerFactory.create_batch(2)
+        expected_uuids = [
+            str(uuid_)
+            for uuid_ in HealthCareWorker.objects.order_by('id').values_list('uuid', flat=True)
+        ]
+
+        url = reverse("api:health-care-workers-list")
+        response = self.client.get(url, data={'page_size': 3}, format='json')
+        response_data = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers[CONTENT_TYPE], APPLICATION_JSON)
+        self.assertEqual(list(response_data), ['data', 'next', 'previous'])
+        self.assertEqual([item['uuid'] for item in response_data['data']], expected_uuids[:3])
+        self.assertIsNone(response_data['previous'])
+
+        response = self.client.get(response_data['next'], format='json')
+        response_data = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['uuid'] for item in response_data['data']], expected_uuids[3:])
+        self.assertIsNone(response_data['next'])
+        self.assertIsNotNone(response_data['previous'])
+
     def test_detail_health_care_worker(self):
         chosen_instance = self.existing_hcw[INITIAL_HCW_COUNT-1]
         expected_response_data = {
@@ -79,6 +115,62 @@ class HealthCareWorkersViewSetTestCase(APITestCase):
         self.assertEqual(response.headers[CONTENT_TYPE], APPLICATION_JSON)
         self.assertEqual(response_data, expected_response_data)
 
+    def test_detail_health_care_worker_with_sparse_fieldsets(self):
+        chosen_instance = self.existing_hcw[0]
+        url = reverse("api:health-care-workers-detail", args=[chosen_instance.uuid])
+
+        response = self.client.get(url, data={'fields': 'nome_legal,proxima_consulta'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {'uuid': str(chosen_instance.uuid), 'nome_legal': chosen_instance.legal_name, 'proxima_consulta': None},
+        )
+
+        response = self.client.get(
+            url,
+            data={'fields': 'nome_legal,nome_social', 'omit': 'nome_social,uuid'},
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, 200)
+        # uuid is never omitted
+        self.assertEqual(response.json(), {'uuid': str(chosen_instance.uuid), 'nome_legal': chosen_instance.legal_name})
+
+    def test_fail_list_health_care_workers_for_unknown_sparse_fieldsets(self):
+        url = reverse("api:health-care-workers-list")
+        response = self.client.get(url, data={'fields': 'legal_name,nome,nome_legal'}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(),
+            {'fields': [UNKNOWN_FIELDS_ERROR_MESSAGE.format(field_names='legal_name, nome')]},
+        )
+
+    def test_batch_get_health_care_workers(self):
+        non_existing_instance_uuid = '01234567-89ab-cdef-0123-456789abcdef'
+        uuids = [str(self.existing_hcw[2].uuid), non_existing_instance_uuid, str(self.existing_hcw[0].uuid)]
+
+        url = reverse("api:health-care-workers-batch-get")
+        with self.assertNumQueries(1):
+            response = self.client.post(url, {'uuids': uuids}, format='json')
+        response_data = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['uuid'] for item in response_data['data']], [uuids[0], uuids[2]])
+        self.assertEqual(response_data['data'][0]['nome_legal'], self.existing_hcw[2].legal_name)
+        self.assertEqual(response_data['nao_encontrados'], [non_existing_instance_uuid])
+
+    def test_detail_health_care_worker_not_modified(self):
+        url = reverse("api:health-care-workers-detail", args=[self.existing_hcw[0].uuid])
+        response = self.client.get(url, format='json')
+
+        response = self.client.get(url, format='json', HTTP_IF_NONE_MATCH=response.headers[ETAG])
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(url, format='json', HTTP_IF_NONE_MATCH='W/"stale"')
+        self.assertEqual(response.status_code, 200)
+
     def test_fail_detail_health_care_worker_for_non_existing_instance(self):
         non_existing_instance_uuid = '01234567-89ab-cdef-0123-456789abcdef'
         expected_response_data = {'detail': 'Not found.'}
@@ -91,6 +183,81 @@ class HealthCareWorkersViewSetTestCase(APITestCase):
         self.assertEqual(response.headers[CONTENT_TYPE], APPLICATION_JSON)
         self.assertEqual(response_data, expected_response_data)
 
+    def test_agenda_health_care_worker(self):
+        chosen_instance = self.existing_hcw[0]
+        AppointmentFactory.create_batch(
+            3,
+            health_care_worker=chosen_instance,
+            date=factory.Iterator([date(2136, 12, 31), date(2137, 1, 2), date(2137, 1, 4)]),
+        )
+        # Same dates for another worker must not show up
+        AppointmentFactory(health_care_worker=self.existing_hcw[1], date=date(2137, 1, 1))
+        expected_response_data = {
+            'de': '2137-01-01',
+            'ate': '2137-01-04',
+            'ocupadas': ['2137-01-02', '2137-01-04'],
+            'livres': ['2137-01-01', '2137-01-03'],
+        }
+
+        url = reverse("api:health-care-workers-agenda", args=[chosen_instance.uuid])
+        with self.assertNumQueries(1):
+            response = self.client.get(url, data={'de': '2137-01-01', 'ate': '2137-01-04'}, format='json')
+        response_data = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers[CONTENT_TYPE], APPLICATION_JSON)
+        self.assertEqual(response_data, expected_response_data)
+
+    def test_agenda_health_care_worker_without_appointments(self):
+        url = reverse("api:health-care-workers-agenda", args=[self.existing_hcw[0].uuid])
+        response = self.client.get(url, data={'de': '2137-01-01', 'ate': '2137-01-01'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['ocupadas'], [])
+        self.assertEqual(response.json()['livres'], ['2137-01-01'])
+
+    def test_agenda_health_care_worker_does_not_offer_today_or_past_days(self):
+        today = timezone.localdate()
+
+        url = reverse("api:health-care-workers-agenda", args=[self.existing_hcw[0].uuid])
+        response = self.client.get(
+            url,
+            data={'de': (today - timedelta(days=3)).isoformat(), 'ate': (today + timedelta(days=2)).isoformat()},
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()['livres'],
+            [(today + timedelta(days=1)).isoformat(), (today + timedelta(days=2)).isoformat()],
+        )
+
+    def test_fail_agenda_health_care_worker_for_invalid_range(self):
+        expected_response_data = {'non_field_errors': [AGENDA_RANGE_ERROR_MESSAGE]}
+
+        url = reverse("api:health-care-workers-agenda", args=[self.existing_hcw[0].uuid])
+        response = self.client.get(url, data={'de': '2137-01-02', 'ate': '2137-01-01'}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), expected_response_data)
+
+        response = self.client.get(url, data={'de': '2137-01-01', 'ate': '2139-01-01'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(url, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {'de', 'ate'})
+
+    def test_fail_agenda_health_care_worker_for_non_existing_instance(self):
+        non_existing_instance_uuid = '01234567-89ab-cdef-0123-456789abcdef'
+        expected_response_data = {'detail': 'Not found.'}
+
+        url = reverse("api:health-care-workers-agenda", args=[non_existing_instance_uuid])
+        response = self.client.get(url, data={'de': '2137-01-01', 'ate': '2137-01-04'}, format='json')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), expected_response_data)
+
     def test_full_update_health_care_worker(self):
         chosen_instance = self.existing_hcw[0]
         id_ = chosen_instance.id
@@ -228,3 +395,136 @@ class HealthCareWorkersViewSetTestCase(APITestCase):
         self.assertEqual(response.status_code, 404)
         self.assertEqual(response.headers[CONTENT_TYPE], APPLICATION_JSON)
         self.assertEqual(response_data, expected_response_data)
+
+
+@override_settings(API_CACHE_ENABLED=True)
+class HealthCareWorkersViewSetCacheTestCase(APITestCase):
+    def setUp(self):
+        self.existing_hcw = HealthCareWorkerFactory.create_batch(INITIAL_HCW_COUNT)
+        get_api_cache().clear()
+        self.addCleanup(get_api_cache().clear)
+        cache_stats.reset()
+
+    def test_detail_health_care_worker_is_cached(self):
+        chosen_instance = self.existing_hcw[0]
+        url = reverse("api:health-care-workers-detail", args=[chosen_instance.uuid])
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, format='json')
+        self.assertEqual(response.headers[X_CACHE], 'MISS')
+
+        with self.assertNumQueries(0):
+            cached_response = self.client.get(url, format='json')
+        self.assertEqual(cached_response.headers[X_CACHE], 'HIT')
+        self.assertEqual(cached_response.headers[CONTENT_TYPE], APPLICATION_JSON)
+        self.assertEqual(cached_response.json(), response.json())
+
+        self.assertEqual(
+            cache_stats.snapshot(),
+            {HEALTH_CARE_WORKERS_CACHE_NAMESPACE: {'hits': 1, 'misses': 1}},
+        )
+
+    def test_appointment_summaries_are_only_returned_when_asked_for(self):
+        chosen_instance = self.existing_hcw[0]
+        url = reverse("api:health-care-workers-detail", args=[chosen_instance.uuid])
+
+        self.assertNotIn('total_consultas', self.client.get(url, format='json').json())
+        self.assertNotIn('total_consultas', self.client.get(url, data={'omit': 'nome_social'}, format='json').json())
+
+        response = self.client.get(url, data={'fields': 'total_consultas,proxima_consulta'}, format='json')
+        self.assertEqual(
+            response.json(),
+            {'uuid': str(chosen_instance.uuid), 'total_consultas': 0, 'proxima_consulta': None},
+        )
+
+        response = self.client.get(
+            reverse("api:health-care-workers-list"),
+            data={'fields': 'nome_legal,total_consultas'},
+            format='json',
+        )
+        self.assertEqual(
+            {tuple(item) for item in response.json()['data']},
+            {('uuid', 'nome_legal', 'total_consultas')},
+        )
+
+    def test_detail_health_care_worker_with_sparse_fieldsets_is_not_cached(self):
+        url = reverse("api:health-care-workers-detail", args=[self.existing_hcw[0].uuid])
+        self.client.get(url, format='json')
+
+        response = self.client.get(url, data={'fields': 'nome_legal'}, format='json')
+
+        self.assertNotIn(X_CACHE, response.headers)
+        self.assertEqual(list(response.json()), ['uuid', 'nome_legal'])
+        self.assertEqual(list(self.client.get(url, format='json').json())[-1], 'especializacao')
+
+    def test_list_health_care_workers_is_cached_per_query(self):
+        url = reverse("api:health-care-workers-list")
+
+        response = self.client.get(url, format='json')
+        self.assertEqual(response.headers[X_CACHE], 'MISS')
+
+        response = self.client.get(url, data={'page_size': 2}, format='json')
+        self.assertEqual(response.headers[X_CACHE], 'MISS')
+        self.assertEqual(len(response.json()['data']), 2)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, data={'page_size': 2}, format='json')
+        self.assertEqual(response.headers[X_CACHE], 'HIT')
+        self.assertEqual(len(response.json()['data']), 2)
+
+    def test_cached_list_health_care_workers_not_modified(self):
+        url = reverse("api:health-care-workers-list")
+        etag = self.client.get(url, format='json').headers[ETAG]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers[ETAG], etag)
+        self.assertEqual(response.headers[X_CACHE], 'HIT')
+
+    def test_write_invalidates_detail_and_list(self):
+        chosen_instance = self.existing_hcw[0]
+        detail_url = reverse("api:health-care-workers-detail", args=[chosen_instance.uuid])
+        list_url = reverse("api:health-care-workers-list")
+        self.client.get(detail_url, format='json')
+        self.client.get(list_url, format='json')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(detail_url, {'pronomes': 'They/them'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(detail_url, format='json')
+        self.assertEqual(response.headers[X_CACHE], 'MISS')
+        self.assertEqual(response.json()['pronomes'], 'They/them')
+
+        response = self.client.get(list_url, format='json')
+        self.assertEqual(response.headers[X_CACHE], 'MISS')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            HealthCareWorkerFactory()
+
+        response = self.client.get(list_url, format='json')
+        self.assertEqual(response.headers[X_CACHE], 'MISS')
+        self.assertEqual(len(response.json()['data']), INITIAL_HCW_COUNT + 1)
+
+    def test_delete_invalidates_detail(self):
+        chosen_instance = self.existing_hcw[0]
+        url = reverse("api:health-care-workers-detail", args=[chosen_instance.uuid])
+        self.client.get(url, format='json')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(url, format='json')
+
+        response = self.client.get(url, format='json')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(API_CACHE_ENABLED=False)
+    def test_cache_is_optional(self):
+        url = reverse("api:health-care-workers-detail", args=[self.existing_hcw[0].uuid])
+
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                response = self.client.get(url, format='json')
+            self.assertNotIn(X_CACHE, response.headers)
+
+        self.assertEqual(cache_stats.snapshot(), {})
@@ -0,0 +1,135 @@
+import re
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, modify_settings, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import path, reverse
+
+from api import instrumentation
+from api.tests.models.factories import AppointmentFactory
+from saude_drf import urls
+
+
+SERVER_TIMING = 'server-timing'
+SERVER_TIMING_PATTERN = re.compile(
+    r'db;dur=(?P<db>[\d.]+);desc="(?P<queries>\d+) queries", '
+    r'serializer;dur=(?P<serializer>[\d.]+), '
+    r'render;dur=(?P<render>[\d.]+), '
+    r'total;dur=(?P<total>[\d.]+)'
+)
+
+ASYNC_URLCONF = 'saude_drf.urls_async'
+INSTRUMENTATION_MIDDLEWARE = 'api.instrumentation.InstrumentationMiddleware'
+
+# The routes of saude_drf.urls plus /metrics, which it only has with API_INSTRUMENTATION set
+urlpatterns = [
+    *urls.urlpatterns,
+    path('metrics', instrumentation.metrics_view, name='metrics'),
+]
+
+
+# Instrumented as with API_INSTRUMENTATION set, which is off by default.
+# Removed first, so it is not added twice when it is set
+@override_settings(ROOT_URLCONF=__name__)
+@modify_settings(MIDDLEWARE={'remove': INSTRUMENTATION_MIDDLEWARE, 'prepend': INSTRUMENTATION_MIDDLEWARE})
+class InstrumentationTestCase(TestCase):
+    def setUp(self):
+        self.appointments = AppointmentFactory.create_batch(3)
+        # Cached responses, with API_CACHE_ENABLED set, run no query
+        caches[settings.API_CACHE_ALIAS].clear()
+        self.addCleanup(caches[settings.API_CACHE_ALIAS].clear)
+
+        # Installed on new connections only with API_INSTRUMENTATION set, see api.signals
+        if instrumentation.record_query not in connection.execute_wrappers:
+            instrumentation.install_query_recorder(sender=None, connection=connection)
+            self.addCleanup(connection.execute_wrappers.remove, instrumentation.record_query)
+
+        instrumentation.route_metrics.reset()
+        self.addCleanup(instrumentation.route_metrics.reset)
+
+    def get_server_timing(self, response):
+        match = SERVER_TIMING_PATTERN.fullmatch(response.headers[SERVER_TIMING])
+        self.assertIsNotNone(match, response.headers[SERVER_TIMING])
+        return {name: float(value) for name, value in match.groupdict().items()}
+
+    def test_server_timing(self):
+        for url, data in (
+            (reverse('api:appointments-list'), None),
+            (reverse('api:appointments-list'), {'page_size': 2}),
+            (reverse('api:appointments-detail', args=[self.appointments[0].uuid]), None),
+            (reverse('api:health-care-workers-list'), None),
+            (
+                reverse('api:health-care-workers-agenda', args=[self.appointments[0].health_care_worker.uuid]),
+                {'de': '2137-01-01', 'ate': '2137-01-31'},
+            ),
+        ):
+            with self.subTest(url=url, data=data):
+                with CaptureQueriesContext(connection) as context:
+                    response = self.client.get(url, data)
+
+                self.assertEqual(response.status_code, 200)
+                server_timing = self.get_server_timing(response)
+                self.assertEqual(server_timing['queries'], len(context.captured_queries))
+                self.assertGreater(server_timing['db'], 0)
+                self.assertGreater(server_timing['serializer'], 0)
+                self.assertGreater(server_timing['render'], 0)
+                self.assertGreater(
+                    server_timing['total'],
+                    server_timing['db'] + server_timing['serializer'] + server_timing['render'],
+                )
+
+    @override_settings(ROOT_URLCONF=ASYNC_URLCONF)
+    async def test_server_timing_async_views(self):
+        response = await self.async_client.get(reverse('api:appointments-list'))
+
+        self.assertEqual(response.status_code, 200)
+        server_timing = self.get_server_timing(response)
+        self.assertGreater(server_timing['queries'], 0)
+        self.assertGreater(server_timing['serializer'], 0)
+        self.assertGreater(server_timing['render'], 0)
+
+    def test_metrics(self):
+        self.client.get(reverse('api:appointments-list'))
+        self.client.get(reverse('api:appointments-list'))
+        self.client.get(reverse('api:appointments-detail', args=[self.appointments[0].uuid]))
+        not_found_response = self.client.get('/not-a-route')
+
+        response = self.client.get(reverse('metrics'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['content-type'], instrumentation.PROMETHEUS_CONTENT_TYPE)
+        self.assertIn(SERVER_TIMING, not_found_response.headers)
+
+        content = response.content.decode()
+        self.assertIn('# TYPE api_requests_total counter\n', content)
+        self.assertIn('api_requests_total{route="api:appointments-list"} 2\n', content)
+        self.assertIn('api_requests_total{route="api:appointments-detail"} 1\n', content)
+        self.assertNotIn('not-a-route', content)
+        self.assertRegex(content, r'api_db_queries_total\{route="api:appointments-list"\} [1-9]\d*\n')
+        self.assertRegex(content, r'api_serializer_seconds_total\{route="api:appointments-list"\} [\d.e-]+\n')
+        self.assertIn('api_request_duration_seconds_bucket{route="api:appointments-list",le="+Inf"} 2\n', content)
+        self.assertIn('api_request_duration_seconds_count{route="api:appointments-list"} 2\n', content)
+
+    def test_metrics_pool_stats(self):
+        pool_stats = {'default': {'pool_size': 4, 'requests_waiting': 0, 'requests_num': 12}}
+
+        with mock.patch('api.instrumentation.get_pool_stats', return_value=pool_stats):
+            content = self.client.get(reverse('metrics')).content.decode()
+
+        self.assertIn('# TYPE api_database_pool_size gauge\napi_database_pool_size{alias="default"} 4\n', content)
+        self.assertIn('api_database_pool_requests_waiting{alias="default"} 0\n', content)
+        self.assertIn(
+            '# TYPE api_database_pool_requests_num_total counter\n'
+            'api_database_pool_requests_num_total{alias="default"} 12\n',
+            content,
+        )
+
+    def test_queries_outside_requests_are_not_recorded(self):
+        self.assertIn(instrumentation.record_query, connection.execute_wrappers)
+
+        AppointmentFactory()
+
+        self.assertEqual(instrumentation.route_metrics.snapshot(), {})
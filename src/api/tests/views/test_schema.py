@@ -0,0 +1,78 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock, skipUnless
+
+import yaml
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from api.schema import SchemaArtifactSwaggerView, generate_schema
+
+
+CONTENT_TYPE = 'content-type'
+ETAG = 'etag'
+OPENAPI_JSON = 'application/vnd.oai.openapi+json'
+
+
+@skipUnless(settings.SETTINGS_PROFILE == 'full', 'The schema is only served in the full settings profile')
+class SchemaViewsTestCase(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.schema_path = Path(directory.name) / 'schema.yaml'
+
+        settings_override = override_settings(API_SCHEMA_PATH=self.schema_path)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        page_patch = mock.patch.object(SchemaArtifactSwaggerView, 'page', None)
+        page_patch.start()
+        self.addCleanup(page_patch.stop)
+
+    def test_missing_schema_is_generated(self):
+        response = self.client.get(reverse('schema'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers[CONTENT_TYPE], 'application/vnd.oai.openapi; charset=utf-8')
+        self.assertEqual(response.content, generate_schema())
+        self.assertEqual(self.schema_path.read_bytes(), response.content)
+
+    def test_schema_is_served_from_the_generated_file(self):
+        call_command('generate_schema', stdout=mock.Mock())
+        content = self.schema_path.read_bytes()
+
+        with mock.patch('api.schema.generate_schema', side_effect=AssertionError):
+            yaml_response = self.client.get(reverse('schema'))
+            json_response = self.client.get(reverse('schema'), HTTP_ACCEPT=OPENAPI_JSON)
+
+        self.assertEqual(yaml_response.content, content)
+        self.assertEqual(json_response.headers[CONTENT_TYPE], OPENAPI_JSON)
+        self.assertEqual(json.loads(json_response.content), yaml.safe_load(content))
+        self.assertNotEqual(yaml_response.headers[ETAG], json_response.headers[ETAG])
+
+    def test_schema_not_modified(self):
+        etag = self.client.get(reverse('schema')).headers[ETAG]
+        self.assertFalse(etag.startswith('W/'))
+
+        response = self.client.get(reverse('schema'), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response.headers[ETAG], etag)
+
+    def test_swagger_ui(self):
+        url = reverse('swagger-ui')
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, f'<script src="{url}?script="></script>', html=True)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response.headers[ETAG])
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(url, {'script': ''})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, reverse('schema'))
@@ -0,0 +1,5 @@
+from api.async_views import with_async_routes
+from api.urls import app_name, router  # noqa: F401
+
+
+urlpatterns = with_async_routes(router.urls)
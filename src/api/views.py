@@ -1,10 +1,29 @@
-from django.db import IntegrityError, transaction
-from rest_framework import status, viewsets
+from django.db import transaction
+from django.http import Http404
+from drf_spectacular.utils import extend_schema, extend_schema_view
+from rest_framework import permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
+from api import cache, conditional, summaries
+from api.agenda import get_agenda
+from api.constants import UNKNOWN_FIELDS_ERROR_MESSAGE
 from api.filtersets import AppointmentsFilterSet
 from api.models import Appointment, HealthCareWorker
-from api.serializers import AppointmentSerializer, HealthCareWorkerSerializer
+from api.pagination import AppointmentsPagination, HealthCareWorkersPagination
+from api.serializers import (
+    AgendaQuerySerializer,
+    AgendaSerializer,
+    AppointmentBatchGetSerializer,
+    AppointmentBulkItemSerializer,
+    BatchGetSerializer,
+    HealthCareWorkerBatchGetSerializer,
+    HealthCareWorkerSerializer,
+    OptimisticAppointmentSerializer,
+)
+from api.serializers.compiled import compile_representation
+from api.streaming import DEFAULT_CHUNK_SIZE, iter_rendered_list, streaming_json_response
 
 
 class ListAsDictModelMixin:
@@ -12,7 +31,13 @@ class ListAsDictModelMixin:
     List a queryset with dict-like response.
 
     Based on https://github.com/stickfigure/blog/wiki/How-to-(and-how-not-to)-design-REST-APIs#rule-4-dont-return-arrays-as-top-level-responses
+
+    Unpaginated listings can also be streamed with `?stream=true`,
+    keeping memory usage flat regardless of how many rows are returned.
     """
+    stream_query_param = 'stream'
+    stream_chunk_size = DEFAULT_CHUNK_SIZE
+
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
 
@@ -21,25 +46,324 @@ class ListAsDictModelMixin:
             serializer = self.get_serializer(page, many=True)
             return self.get_paginated_response(serializer.data)
 
-        serializer = self.get_serializer(queryset, many=True)
+        compiled = self.get_compiled_representation()
+
+        if self.should_stream(request):
+            return self.stream_list(request, queryset, compiled)
+
+        if compiled is not None:
+            data = compiled.to_representation_many(compiled.values_list(queryset))
+        else:
+            data = self.get_serializer(queryset, many=True).data
 
         as_dict = {
-            'data': serializer.data,
+            'data': data,
         }
 
         return Response(as_dict)
 
+    def get_compiled_representation(self):
+        """
+        Return the `values_list()` read path for the serializer, if it can be compiled.
+        """
+        return compile_representation(self.get_serializer())
+
+    def should_stream(self, request):
+        value = request.query_params.get(self.stream_query_param, '')
+        return value.lower() in ('1', 'true')
+
+    def stream_list(self, request, queryset, compiled=None):
+        # Rows are read after the response is returned, so the database is chosen while handling the request
+        queryset = queryset.using(queryset.db)
+        renderer = request.accepted_renderer
+        renderer_context = self.get_renderer_context()
+
+        if compiled is not None:
+            queryset = compiled.values_list(queryset)
+            serialize = compiled.to_representation_many
+        else:
+            def serialize(chunk):
+                return self.get_serializer(chunk, many=True).data
+
+        def render(data):
+            return renderer.render(data, request.accepted_media_type, renderer_context)
+
+        content = iter_rendered_list(queryset, serialize, render, chunk_size=self.stream_chunk_size)
+        return streaming_json_response(request._request, content)
+
+
+class CachedResponseMixin:
+    """
+    Cache `list` and `retrieve` response data when `settings.API_CACHE_ENABLED` is set,
+    keyed by lookup value or by query string and invalidated by the signals in api.signals.
+    """
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        api_cache = cache.get_api_cache()
+        if api_cache is None or self.should_stream(request):
+            return super().list(request, *args, **kwargs)
+
+        key = cache.get_list_key(api_cache, self.cache_namespace, request)
+        return self.get_cached_response(api_cache, key, super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        api_cache = cache.get_api_cache()
+        # Detail entries hold every field, sparse fieldsets are only cached by list entries
+        if api_cache is None or self.get_field_names() is not None:
+            return super().retrieve(request, *args, **kwargs)
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        key = cache.get_detail_key(self.cache_namespace, kwargs[lookup_url_kwarg])
+        return self.get_cached_response(api_cache, key, super().retrieve, request, *args, **kwargs)
+
+    def get_cached_response(self, api_cache, key, view, request, *args, **kwargs):
+        entry = api_cache.get(key)
+
+        if entry is not None:
+            cache.stats.record(self.cache_namespace, cache.HIT)
+            # Conditional requests are answered from the cached validators too
+            data, etag, last_modified = entry
+            response = conditional.get_not_modified_response(request, etag, last_modified)
+            if response is None:
+                response = Response(data)
+            conditional.set_validators(response, etag, last_modified)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        cache.stats.record(self.cache_namespace, cache.MISS)
+        response = view(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            api_cache.set(key, (response.data, *conditional.get_response_validators(response)))
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class ConditionalResponseMixin:
+    """
+    ETag headers for `list` and `retrieve`, plus Last-Modified for `retrieve`, from the `modified` timestamps.
+
+    Requests with If-None-Match or If-Modified-Since are answered with 304 before anything is serialized.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        etag = conditional.get_queryset_etag(queryset, conditional.get_variant(request))
+
+        response = conditional.get_not_modified_response(request, etag, None)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+
+        conditional.set_validators(response, etag, None)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, last_modified = conditional.get_instance_validators(instance, conditional.get_variant(request))
+
+        response = conditional.get_not_modified_response(request, etag, last_modified)
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+
+        conditional.set_validators(response, etag, last_modified)
+        return response
+
+
+class EagerLoadingMixin:
+    """
+    Let the serializer plan the queryset it is going to read from.
+
+    Read-only requests get the serializer projection, while writes keep every column loaded
+    so that saving an instance does not skip deferred fields such as `modified`.
+
+    Reads can also be narrowed to sparse fieldsets, naming serializer fields with `?fields=`
+    and `?omit=`, which leaves the other columns out of the query as well as out of the response.
+    Optional serializer fields are only returned when named in `?fields=`.
+    """
+    fields_query_param = 'fields'
+    omit_query_param = 'omit'
+    # Always returned, as it identifies the instance
+    required_field_names = ('uuid',)
 
-class HealthCareWorkersViewSet(ListAsDictModelMixin, viewsets.ModelViewSet):
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        if self.request.method in permissions.SAFE_METHODS:
+            queryset = self.get_serializer_class().setup_eager_loading(queryset, self.get_field_names())
+
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        field_names = self.get_field_names()
+        if field_names is None and not getattr(self, 'swagger_fake_view', False):
+            # The schema documents the optional fields too
+            field_names = self.get_serializer_class().get_default_field_names()
+        if field_names is not None:
+            kwargs.setdefault('fields', field_names)
+
+        return super().get_serializer(*args, **kwargs)
+
+    def get_field_names(self):
+        """
+        Return the serializer fields asked for by `?fields=` and `?omit=`, or `None` for all of them.
+        """
+        query_params = self.request.query_params
+        if self.request.method not in permissions.SAFE_METHODS or not (
+            self.fields_query_param in query_params or self.omit_query_param in query_params
+        ):
+            return None
+
+        serializer_class = self.get_serializer_class()
+        available = serializer_class.Meta.fields
+        # Optional fields are only returned when named in `?fields=`
+        field_names = (
+            self.parse_field_names(self.fields_query_param, available)
+            or serializer_class.get_default_field_names()
+        )
+        omitted = self.parse_field_names(self.omit_query_param, available)
+
+        return [
+            field_name
+            for field_name in available
+            if field_name in self.required_field_names or (field_name in field_names and field_name not in omitted)
+        ]
+
+    def parse_field_names(self, query_param, available):
+        field_names = {
+            field_name.strip()
+            for value in self.request.query_params.getlist(query_param)
+            for field_name in value.split(',')
+            if field_name.strip()
+        }
+
+        unknown = sorted(field_names.difference(available))
+        if unknown:
+            raise ValidationError({
+                query_param: [UNKNOWN_FIELDS_ERROR_MESSAGE.format(field_names=', '.join(unknown))],
+            })
+
+        return field_names
+
+
+class BatchGetModelMixin:
+    """
+    `batch-get` action, retrieving many instances by uuid with a single query.
+    """
+
+    @extend_schema(request=BatchGetSerializer)
+    @action(detail=False, methods=['post'], url_path='batch-get')
+    def batch_get(self, request, *args, **kwargs):
+        """
+        Instances of the given `uuids`, in the order they were asked for, read with a single query.
+
+        Repeated UUIDs are returned once, and UUIDs without an instance are listed in `nao_encontrados`.
+        """
+        serializer = BatchGetSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        uuids = list(dict.fromkeys(serializer.validated_data['uuids']))
+
+        queryset = self.get_serializer_class().setup_eager_loading(self.get_queryset())
+        instances = {instance.uuid: instance for instance in queryset.filter(uuid__in=uuids)}
+
+        as_dict = {
+            'data': self.get_serializer([instances[uuid] for uuid in uuids if uuid in instances], many=True).data,
+            'nao_encontrados': [str(uuid) for uuid in uuids if uuid not in instances],
+        }
+
+        return Response(as_dict)
+
+
+@extend_schema_view(batch_get=extend_schema(responses={200: HealthCareWorkerBatchGetSerializer}))
+class HealthCareWorkersViewSet(
+    CachedResponseMixin,
+    ConditionalResponseMixin,
+    BatchGetModelMixin,
+    ListAsDictModelMixin,
+    EagerLoadingMixin,
+    viewsets.ModelViewSet,
+):
+    """
+    Health care workers, identified by `uuid`.
+    """
     queryset = HealthCareWorker.objects.all()
+    cache_namespace = cache.HEALTH_CARE_WORKERS_CACHE_NAMESPACE
     serializer_class = HealthCareWorkerSerializer
+    pagination_class = HealthCareWorkersPagination
     lookup_field = 'uuid'
     lookup_value_converter = 'uuid'
 
+    @extend_schema(
+        parameters=[AgendaQuerySerializer],
+        responses={200: AgendaSerializer},
+    )
+    @action(detail=True, methods=['get'])
+    def agenda(self, request, *args, **kwargs):
+        """
+        Booked and free dates of a health care worker between `de` and `ate`, inclusive.
+        """
+        query_serializer = AgendaQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+
+        agenda = get_agenda(
+            kwargs[self.lookup_field],
+            query_serializer.validated_data['de'],
+            query_serializer.validated_data['ate'],
+        )
+        if agenda is None:
+            raise Http404
+
+        return Response(AgendaSerializer(agenda).data)
+
 
-class AppointmentsViewSet(ListAsDictModelMixin, viewsets.ModelViewSet):
-    queryset = Appointment.objects.all()
-    serializer_class = AppointmentSerializer
+@extend_schema_view(batch_get=extend_schema(responses={200: AppointmentBatchGetSerializer}))
+class AppointmentsViewSet(
+    ConditionalResponseMixin,
+    BatchGetModelMixin,
+    ListAsDictModelMixin,
+    EagerLoadingMixin,
+    viewsets.ModelViewSet,
+):
+    """
+    Appointments of health care workers, identified by `uuid` and ordered by date.
+    """
+    queryset = Appointment.objects.select_related('health_care_worker')
+    serializer_class = OptimisticAppointmentSerializer
+    pagination_class = AppointmentsPagination
     lookup_field = 'uuid'
     lookup_value_converter = 'uuid'
     filterset_class = AppointmentsFilterSet
+    bulk_create_max_length = 5000
+
+    @extend_schema(
+        request=AppointmentBulkItemSerializer(many=True),
+        responses={201: OptimisticAppointmentSerializer(many=True)},
+    )
+    @action(detail=False, methods=['post'])
+    def bulk(self, request, *args, **kwargs):
+        serializer = AppointmentBulkItemSerializer(
+            data=request.data,
+            many=True,
+            max_length=self.bulk_create_max_length,
+        )
+        if not serializer.is_valid():
+            errors = serializer.errors
+            if isinstance(errors, list):
+                # Per item errors, in the same order as the request
+                errors = {
+                    'data': errors,
+                }
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        appointments = serializer.save()
+
+        as_dict = {
+            'data': self.get_serializer(appointments, many=True).data,
+        }
+
+        return Response(as_dict, status=status.HTTP_201_CREATED)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            summaries.remove_appointment(instance.health_care_worker_id, instance.date)
+            summaries.invalidate_cache([instance.health_care_worker_id])
@@ -0,0 +1,131 @@
+"""
+PostgreSQL backend whose connections come from a `psycopg_pool.ConnectionPool`.
+
+Every process keeps one pool per database alias, shared by all of its threads. Closing a Django
+connection returns it to the pool instead of disconnecting, so the number of Postgres connections is
+bound by the pool `max_size` however many threads or ASGI requests there are, and requests beyond it
+wait up to the pool `timeout` for a free connection.
+
+The pool is configured through `OPTIONS['pool']`, a dict of `ConnectionPool` arguments such as
+`min_size`, `max_size` and `timeout`. `CONN_MAX_AGE` must be 0, as the pool keeps connections open,
+and `CONN_HEALTH_CHECKS` checks connections when they are taken from the pool.
+"""
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base
+from django.utils.asyncio import async_unsafe
+from psycopg import IsolationLevel
+from psycopg_pool import ConnectionPool
+
+from .creation import DatabaseCreation
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool_stats():
+    """
+    Return the statistics of the open pools of this process, by database alias.
+
+    See https://www.psycopg.org/psycopg3/docs/advanced/pool.html#pool-stats for the keys.
+    """
+    with _pools_lock:
+        pools = dict(_pools)
+
+    return {alias: pool.get_stats() for alias, pool in pools.items()}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def __init__(self, settings_dict, alias=DEFAULT_DB_ALIAS):
+        super().__init__(settings_dict, alias)
+        self.connection_pool = None
+        if self.settings_dict['CONN_MAX_AGE'] != 0:
+            raise ImproperlyConfigured('Pooled connections require CONN_MAX_AGE = 0.')
+
+    @property
+    def pool_options(self):
+        # Maintenance connections to the "postgres" database, e.g. creating the test database, are not pooled
+        if self.alias == NO_DB_ALIAS:
+            return None
+        return self.settings_dict['OPTIONS'].get('pool', {})
+
+    @property
+    def pool(self):
+        pool_options = self.pool_options
+        if pool_options is None:
+            return None
+
+        with _pools_lock:
+            pool = _pools.get(self.alias)
+            if pool is None:
+                connect_kwargs = self.get_connection_params()
+                # Connections are handed out in autocommit mode, Django sets it again on connect
+                connect_kwargs['autocommit'] = True
+                pool = ConnectionPool(
+                    kwargs=connect_kwargs,
+                    name=self.alias,
+                    open=False,
+                    check=ConnectionPool.check_connection if self.settings_dict['CONN_HEALTH_CHECKS'] else None,
+                    **pool_options,
+                )
+                _pools[self.alias] = pool
+
+        return pool
+
+    def close_pool(self):
+        """
+        Close the pool of this alias, if any, so the next connection opens a new one.
+        """
+        with _pools_lock:
+            pool = _pools.pop(self.alias, None)
+
+        if pool is not None:
+            pool.close()
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop('pool', None)
+        return conn_params
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+
+        # Same isolation level handling as the base get_new_connection
+        isolation_level = self.settings_dict['OPTIONS'].get('isolation_level')
+        try:
+            self.isolation_level = IsolationLevel(
+                IsolationLevel.READ_COMMITTED if isolation_level is None else isolation_level,
+            )
+        except ValueError:
+            raise ImproperlyConfigured(
+                f'Invalid transaction isolation level {isolation_level} '
+                f'specified. Use one of the psycopg.IsolationLevel values.'
+            )
+
+        # Opening is a no-op once the pool is open
+        pool.open()
+        connection = pool.getconn()
+        # Returned to the pool it came from, even if the pool of the alias was replaced meanwhile
+        self.connection_pool = pool
+        if isolation_level is not None:
+            connection.isolation_level = self.isolation_level
+        return connection
+
+    def _close(self):
+        if self.connection is None or self.connection_pool is None:
+            return super()._close()
+
+        with self.wrap_database_errors:
+            # The pool rolls back an open transaction before handing the connection out again
+            self.connection_pool.putconn(self.connection)
+            self.connection = None
+            self.connection_pool = None
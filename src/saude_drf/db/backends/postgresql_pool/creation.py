@@ -0,0 +1,23 @@
+from django.db import connections
+from django.db.backends.postgresql import creation
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    # Pooled connections are bound to a database name, so the pool is closed
+    # when the test database replaces it and before the test database is dropped,
+    # along with the pools of its test mirrors
+    def _create_test_db(self, verbosity, autoclobber, keepdb=False):
+        self.connection.close_pool()
+        return super()._create_test_db(verbosity, autoclobber, keepdb)
+
+    def set_as_test_mirror(self, primary_settings_dict):
+        self.connection.close_pool()
+        super().set_as_test_mirror(primary_settings_dict)
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        for alias in connections:
+            if connections.settings[alias]['TEST']['MIRROR'] == self.connection.alias:
+                connections[alias].close()
+                connections[alias].close_pool()
+        self.connection.close_pool()
+        return super()._destroy_test_db(test_database_name, verbosity)
@@ -0,0 +1,113 @@
+"""
+Read replica routing, enabled by `settings.DATABASE_REPLICAS`.
+
+`ReplicaMiddleware` picks the database the reads of each request go to, and `ReplicaRouter` routes them there:
+
+- `GET`, `HEAD` and `OPTIONS` requests read from one of the replicas, the same one for the whole request
+- any other request, and the requests of a client for `settings.DATABASE_REPLICA_PIN_SECONDS` after it,
+  read from the primary, so a client always reads its own writes however far behind the replicas are
+- reads inside a transaction of the primary stay on it, as only it sees the uncommitted writes
+
+Writes always go to the primary, and so do the reads outside of requests, e.g. of management commands.
+The client is pinned with a cookie holding the time the pin expires, which needs no session.
+"""
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+PIN_COOKIE = 'primary_pin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Database alias the reads of the current request go to
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def is_pinned(request):
+    try:
+        return float(request.COOKIES[PIN_COOKIE]) > time.time()
+    except (KeyError, ValueError):
+        return False
+
+
+def get_read_alias(request):
+    if request.method not in SAFE_METHODS or is_pinned(request):
+        return DEFAULT_DB_ALIAS
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+class ReplicaMiddleware:
+    """
+    Route the reads of each request with `ReplicaRouter`, and pin clients to the primary after their writes.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        token = _read_alias.set(get_read_alias(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        token = _read_alias.set(get_read_alias(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+
+        return self.finish(request, response)
+
+    def finish(self, request, response):
+        if request.method not in SAFE_METHODS:
+            pin_seconds = settings.DATABASE_REPLICA_PIN_SECONDS
+            response.set_cookie(
+                PIN_COOKIE,
+                f'{time.time() + pin_seconds:.3f}',
+                max_age=pin_seconds,
+                httponly=True,
+                samesite='Lax',
+            )
+
+        return response
+
+
+class ReplicaRouter:
+    """
+    Database router sending the reads chosen by `ReplicaMiddleware` to the replicas, and everything else
+    to the primary. The replicas mirror the primary, so they are never migrated.
+    """
+    def db_for_read(self, model, **hints):
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -10,9 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 
 from . import __version__ as VERSION
 
@@ -38,6 +40,14 @@ ALLOWED_HOSTS = [
 ]
 
 
+# "full" also serves the Swagger UI and the OpenAPI schema, "api" only the JSON API under /api/,
+# without the apps and middleware it never uses
+SETTINGS_PROFILE = os.environ.get('SETTINGS_PROFILE', 'full').lower()
+
+if SETTINGS_PROFILE not in ('full', 'api'):
+    raise ImproperlyConfigured(f"Unknown SETTINGS_PROFILE {SETTINGS_PROFILE!r}, use 'full' or 'api'")
+
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -64,10 +74,10 @@ MIDDLEWARE = [
 
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'api.renderers.ORJSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'api.parsers.ORJSONParser',
     ],
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -84,7 +94,14 @@ SPECTACULAR_SETTINGS = {
     'SWAGGER_UI_FAVICON_HREF': 'SIDECAR',
 }
 
-ROOT_URLCONF = 'saude_drf.urls'
+# Schema served by /schema/, generated by the generate_schema command or on the first request if missing.
+# Named after the version, so a new release never serves the schema of a previous one
+API_SCHEMA_PATH = Path(os.environ.get('API_SCHEMA_PATH', BASE_DIR / 'openapi' / f'schema-{VERSION}.yaml'))
+
+# Serve the API list, retrieve and create routes with the async views of api.async_views, under ASGI only
+API_ASYNC_VIEWS = os.environ.get('API_ASYNC_VIEWS', '').lower() in ('1', 'true')
+
+ROOT_URLCONF = 'saude_drf.urls_async' if API_ASYNC_VIEWS else 'saude_drf.urls'
 
 TEMPLATES = [
     {
@@ -102,19 +119,113 @@ TEMPLATES = [
     },
 ]
 
+if SETTINGS_PROFILE == 'api':
+    # The token-free JSON API needs no sessions, cookies, messages, static files or credentials,
+    # and only rendering its documentation needs the templates and static files of the sidecar
+    INSTALLED_APPS = [
+        app
+        for app in INSTALLED_APPS
+        if app not in (
+            'django.contrib.sessions',
+            'django.contrib.messages',
+            'django.contrib.staticfiles',
+            'drf_spectacular_sidecar',
+        )
+    ]
+    MIDDLEWARE = [
+        'django.middleware.security.SecurityMiddleware',
+        'django.middleware.common.CommonMiddleware',
+    ]
+    REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES'] = []
+    TEMPLATES[0]['OPTIONS']['context_processors'].remove('django.contrib.messages.context_processors.messages')
+
+# Per route query counts and timings, as Server-Timing headers and Prometheus metrics under /metrics,
+# see api.instrumentation. Off unless asked for, as both are served to anyone who can reach the API
+API_INSTRUMENTATION = os.environ.get('API_INSTRUMENTATION', '').lower() in ('1', 'true')
+
+if API_INSTRUMENTATION:
+    MIDDLEWARE.insert(0, 'api.instrumentation.InstrumentationMiddleware')
+
 WSGI_APPLICATION = 'saude_drf.wsgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    'default': dj_database_url.config(
-        conn_max_age=600,
-        conn_health_checks=True,
-    ),
+# Connections from a per process pool shared by all threads, see saude_drf.db.backends.postgresql_pool
+DATABASE_POOL = os.environ.get('DATABASE_POOL', '').lower() in ('1', 'true')
+
+if DATABASE_POOL:
+    DATABASES = {
+        'default': dj_database_url.config(
+            engine='saude_drf.db.backends.postgresql_pool',
+            # Closing a connection returns it to the pool
+            conn_max_age=0,
+            # A check query whenever a connection is taken from the pool
+            conn_health_checks=os.environ.get('DATABASE_POOL_CHECK', '').lower() in ('1', 'true'),
+        ),
+    }
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        'min_size': int(os.environ.get('DATABASE_POOL_MIN_SIZE', 2)),
+        'max_size': int(os.environ.get('DATABASE_POOL_MAX_SIZE', 10)),
+        'timeout': float(os.environ.get('DATABASE_POOL_TIMEOUT', 30)),
+    }
+else:
+    DATABASES = {
+        'default': dj_database_url.config(
+            # Persistent connections are per thread, so under ASGI set it to 0 or use DATABASE_POOL
+            conn_max_age=int(os.environ.get('DATABASE_CONN_MAX_AGE', 600)),
+            conn_health_checks=True,
+        ),
+    }
+
+# Read replicas of the default database, as comma separated database URLs, see saude_drf.db.replicas.
+# Tests run against the test database of the default one, as replicas only see committed writes
+DATABASE_REPLICAS = []
+
+for number, url in enumerate(filter(None, os.environ.get('DATABASE_REPLICA_URLS', '').split(','))):
+    replica = dj_database_url.parse(
+        url.strip(),
+        engine=DATABASES['default']['ENGINE'],
+        conn_max_age=DATABASES['default']['CONN_MAX_AGE'],
+        conn_health_checks=DATABASES['default']['CONN_HEALTH_CHECKS'],
+        test_options={'MIRROR': 'default'},
+    )
+    replica['OPTIONS'] = {**DATABASES['default'].get('OPTIONS', {}), **replica.get('OPTIONS', {})}
+    DATABASES[f'replica{number}'] = replica
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+# Seconds a client reads from the primary after a write, longer than the replication lag
+DATABASE_REPLICA_PIN_SECONDS = int(os.environ.get('DATABASE_REPLICA_PIN_SECONDS', 5))
+
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ['saude_drf.db.replicas.ReplicaRouter']
+    # Before the middleware that may read, e.g. the session one
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.middleware.security.SecurityMiddleware'),
+        'saude_drf.db.replicas.ReplicaMiddleware',
+    )
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # LocMemCache is per process, use FileBasedCache to share entries and invalidations between processes
+    'api': {
+        'BACKEND': os.environ.get('API_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('API_CACHE_LOCATION', 'api'),
+        'TIMEOUT': int(os.environ.get('API_CACHE_TIMEOUT', 300)),
+    },
 }
 
+# Response cache in front of the health care workers list and retrieve, see api.cache
+API_CACHE_ENABLED = os.environ.get('API_CACHE_ENABLED', '').lower() in ('1', 'true')
+API_CACHE_ALIAS = 'api'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
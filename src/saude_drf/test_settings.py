@@ -0,0 +1,18 @@
+"""
+Test settings, as in `python manage.py test --settings=saude_drf.test_settings`: the default settings plus
+a second test database standing in for a read replica, so replica routing runs end to end
+without `DATABASE_REPLICA_URLS`, see api.tests.database.test_replicas.
+"""
+from copy import deepcopy
+
+from saude_drf.settings import *  # noqa: F401,F403
+from saude_drf.settings import DATABASES
+
+
+# Unlike the mirrors of DATABASE_REPLICA_URLS, a database of its own, so reads show which database they went to.
+# Not one of DATABASE_REPLICAS, so only the tests that route reads to it do so
+DATABASES = deepcopy(DATABASES)
+DATABASES['replica_test'] = {
+    **deepcopy(DATABASES['default']),
+    'TEST': {'NAME': f"test_{DATABASES['default']['NAME']}_replica"},
+}
@@ -1,5 +1,8 @@
+from django.conf import settings
 from django.urls import path, include
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+
+from api.instrumentation import metrics_view
+from api.schema import SchemaArtifactSwaggerView, SchemaArtifactView
 
 
 api_path = path(
@@ -9,7 +12,15 @@ api_path = path(
 
 
 urlpatterns = [
-    path('', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
-    path('schema/', SpectacularAPIView.as_view(), name='schema'),
     api_path,
 ]
+
+if settings.API_INSTRUMENTATION:
+    urlpatterns.append(path('metrics', metrics_view, name='metrics'))
+
+if settings.SETTINGS_PROFILE == 'full':
+    urlpatterns = [
+        path('', SchemaArtifactSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+        path('schema/', SchemaArtifactView.as_view(), name='schema'),
+        *urlpatterns,
+    ]
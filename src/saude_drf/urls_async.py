@@ -0,0 +1,21 @@
+"""
+URL configuration serving the API list, retrieve and create routes with async views.
+
+Used as ROOT_URLCONF when API_ASYNC_VIEWS is set, see api.async_views.
+"""
+
+from django.urls import path, include
+
+from .urls import api_path, urlpatterns as sync_urlpatterns
+
+
+api_async_path = path(
+    "api/",
+    include('api.urls_async', namespace='api'),
+)
+
+
+urlpatterns = [
+    api_async_path if pattern is api_path else pattern
+    for pattern in sync_urlpatterns
+]